@@ -0,0 +1,4 @@
+import { JsonPartCarrier } from "../ts/types/botTypes";
+
+declare const carriers: { [partName: string]: JsonPartCarrier[] };
+export default carriers;
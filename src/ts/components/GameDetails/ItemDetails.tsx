@@ -983,7 +983,6 @@ export default function ItemDetails({
     showWikiLink?: boolean;
 }) {
     const botData = useBotData();
-    const bots = botData.getAllBotsSorted();
     const spoilers = useSpoilers();
     showBots = showBots && useShowBotsWithPart();
 
@@ -1083,27 +1082,9 @@ export default function ItemDetails({
     let botDetails: ReactNode | undefined;
     if (showBots) {
         // Find all bots that use the item
-        const botsWithItem: Bot[] = bots.filter((bot) => {
-            if (!canShowSpoiler(bot.spoiler, spoilers)) {
-                return false;
-            }
-
-            for (const botItem of bot.armamentData.concat(bot.componentData)) {
-                if (botItem.name == item.name) {
-                    return true;
-                }
-
-                for (const itemOption of bot.armamentOptionData.concat(bot.componentOptionData)) {
-                    for (const botItem of itemOption) {
-                        if (botItem.name == item.name) {
-                            return true;
-                        }
-                    }
-                }
-            }
-
-            return false;
-        });
+        const botsWithItem: Bot[] = botData
+            .getBotsWithPart(item.name)
+            .filter((bot) => canShowSpoiler(bot.spoiler, spoilers));
 
         if (botsWithItem.length > 0) {
             botDetails = (
@@ -33,6 +33,8 @@ export type BotResistances = Partial<Record<DamageType, number>>;
 export type ItemOption = {
     name: string;
     number?: number;
+    // Percent chance of the bot having this choice, if known
+    chance?: number;
 };
 
 export type BotPart = {
@@ -40,6 +42,7 @@ export type BotPart = {
     number: number;
     coverage: number;
     integrity: number;
+    chance?: number;
 };
 
 export type BotLocation = {
@@ -114,6 +117,12 @@ export type Bot = {
     volleyTime: number | undefined;
 };
 
+export type JsonPartCarrier = {
+    Bot: string;
+    Number: number;
+    Optional: boolean;
+};
+
 export type JsonBotExtraData = {
     Categories: BotCategory[];
     Locations?: BotLocation[];
@@ -153,8 +162,17 @@ export type JsonBot = {
     Traits?: string[];
     "Armament String"?: string;
     Armament?: Array<string | ItemOption[]>;
+    "Armament Data"?: BotPart[];
+    "Armament Option Data"?: BotPart[][];
     "Components String"?: string;
     Components?: Array<string | ItemOption[]>;
+    "Components Data"?: BotPart[];
+    "Components Option Data"?: BotPart[][];
+    "Core Coverage": number | null;
+    "Total Coverage": number | null;
+    "Expected Part Coverage": number;
+    "Expected Mass": number;
+    "Weapon Chances": { [weaponName: string]: number };
     Analysis?: string;
     Resistances: BotResistances;
     "Fabrication Count"?: string;
@@ -522,69 +522,74 @@ export type JsonItem = {
     Name: string;
     "Full Name": string;
     Type: ItemType;
-    Rating: string;
-    Size: string;
-    Integrity: string;
-    "No Repairs"?: string;
+    Rating: number;
+    "Rating Category": ItemRatingCategory;
+    "Rating String": string;
+    Size: number;
+    Integrity: number;
+    "No Repairs"?: boolean;
     Description?: string;
     Index: number;
     "Supporter Attribution"?: string;
-    "Hackable Schematic"?: string;
-    Studyable?: string;
-    Mass?: string;
-    Coverage?: string;
-    "Heat Generation"?: string;
-    "Energy Generation"?: string;
-    "Energy Storage"?: string;
+    "Hackable Schematic"?: boolean;
+    Studyable?: boolean;
+    Mass?: number;
+    Coverage?: number;
+    "Heat Generation"?: number;
+    "Energy Generation"?: number;
+    "Energy Storage"?: number;
     "Fabrication Number"?: string;
     "Fabrication Time"?: string;
     "Fabrication Components"?: string;
-    Category?: string;
-    "Power Stability"?: string;
+    "Power Stability"?: number;
     Effect?: string;
-    "Time/Move"?: string;
-    Drag?: string;
-    "Energy/Move"?: string;
-    "Heat/Move"?: string;
-    Support?: string;
-    Penalty?: string;
+    "Time/Move"?: number;
+    Drag?: number;
+    "Energy/Move"?: number;
+    "Heat/Move"?: number;
+    Support?: number;
+    Penalty?: number;
     Special?: string;
     Burnout?: string;
-    "Energy Upkeep"?: string;
-    "Mod/Extra"?: string;
-    "Matter Upkeep"?: string;
+    "Energy Upkeep"?: number;
+    "Mod/Extra"?: number;
+    "Matter Upkeep"?: number;
     "Special Trait"?: string;
-    Range?: string;
-    "Shot Energy"?: string;
-    "Shot Heat"?: string;
-    "Projectile Count"?: string;
+    Range?: number;
+    "Shot Energy"?: number;
+    "Shot Heat"?: number;
+    "Projectile Count"?: number;
     Damage?: string;
-    "Damage Min"?: string;
-    "Damage Max"?: string;
+    "Damage Min"?: number;
+    "Damage Max"?: number;
     "Damage Type"?: DamageType;
     Spectrum?: Spectrum;
-    Arc?: string;
-    Disruption?: string;
-    Salvage?: string;
+    Arc?: number;
+    Disruption?: number;
+    Salvage?: number;
     Critical?: string;
-    Targeting?: string;
+    "Critical Chance"?: number;
+    "Critical Type"?: Critical;
+    Targeting?: number;
     Penetration?: string;
-    Delay?: string;
+    "Penetration Chances"?: number[];
+    Delay?: number;
     "Heat Transfer"?: HeatTransfer;
-    "Overload Stability"?: string;
-    "Explosion Radius"?: string;
+    "Overload Stability"?: number;
+    "Explosion Radius"?: number;
     "Explosion Damage"?: string;
-    "Explosion Damage Min"?: string;
-    "Explosion Damage Max"?: string;
-    Falloff?: string;
-    Chunks?: string;
+    "Explosion Damage Min"?: number;
+    "Explosion Damage Max"?: number;
+    Falloff?: number;
+    "Chunks Min"?: number;
+    "Chunks Max"?: number;
     "Explosion Type"?: DamageType;
     "Explosion Heat Transfer"?: HeatTransfer;
     Waypoints?: string;
     "Explosion Spectrum"?: Spectrum;
-    "Explosion Disruption"?: string;
-    "Explosion Salvage"?: string;
-    "Shot Matter"?: string;
-    Recoil?: string;
+    "Explosion Disruption"?: number;
+    "Explosion Salvage"?: number;
+    "Shot Matter"?: number;
+    Recoil?: number;
     Life?: string;
 };
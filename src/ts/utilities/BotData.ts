@@ -1,6 +1,7 @@
 import botExtraData from "../../json/bot_extra_data.json";
 import lore from "../../json/lore.json";
-import { Bot, BotCategory, BotPart, ItemOption, JsonBot, JsonBotExtraData } from "../types/botTypes";
+import partCarriers from "../../json/part_carriers.json";
+import { Bot, BotCategory, ItemOption, JsonBot, JsonBotExtraData } from "../types/botTypes";
 import {
     Actuator,
     ActuatorArray,
@@ -36,7 +37,6 @@ import {
 } from "../types/itemTypes";
 import { ItemData } from "./ItemData";
 import {
-    ceilToMultiple,
     getBotImageNames,
     hasActiveSpecialProperty,
     loadImage,
@@ -51,89 +51,13 @@ export class BotData {
     constructor(bots: JsonBot[], itemData: ItemData) {
         // Create bots
         Object.keys(bots).forEach((key) => {
-            function sumItemCoverage(sum: number, data: string | ItemOption[]) {
-                if (typeof data === "string") {
-                    // Item name, just parse coverage
-                    return (itemData.getItem(data).coverage as number) + sum;
-                } else {
-                    // Option, return largest sum of items
-                    let largest = 0;
-                    data.forEach((optionData) => {
-                        if (optionData.name === "None") {
-                            return;
-                        }
-
-                        const number = optionData.number ?? 1;
-                        const item = itemData.getItem(optionData.name);
-                        const optionCoverage = (item.coverage as number) * number;
-                        largest = Math.max(largest, optionCoverage);
-                    });
-
-                    return largest + sum;
-                }
-            }
-
             const bot = (bots as any as { [key: string]: JsonBot })[key];
             const botName = bot.Name;
-            const itemCoverage =
-                (bot.Armament?.reduce(sumItemCoverage, 0) ?? 0) + (bot.Components?.reduce(sumItemCoverage, 0) ?? 0);
-
-            let roughCoreCoverage = (100.0 / (100.0 - parseInt(bot["Core Exposure %"]))) * itemCoverage - itemCoverage;
-            if (isNaN(roughCoreCoverage)) {
-                roughCoreCoverage = 1;
-            }
-            const estimatedCoreCoverage = ceilToMultiple(roughCoreCoverage, 10);
-            const totalCoverage = estimatedCoreCoverage + itemCoverage;
-
-            function addPartData(data: string | ItemOption[], partData: BotPart[], partOptionData: BotPart[][]) {
-                if (typeof data === "string") {
-                    const itemName = data;
-                    // Item name, add to part data
-                    const result = partData.find((p) => p.name === data);
-
-                    if (result === undefined) {
-                        const item = itemData.getItem(itemName);
-                        partData.push({
-                            name: itemName,
-                            number: 1,
-                            coverage: Math.floor((100.0 * (item.coverage as number)) / totalCoverage),
-                            integrity: item.integrity,
-                        });
-                    } else {
-                        result.number += 1;
-                    }
-                } else {
-                    // Option, add all options
-                    const options: BotPart[] = [];
-                    data.forEach((optionData) => {
-                        const itemName = optionData.name;
-
-                        let coverage = 0;
-                        const item = itemData.getItem(itemName);
-
-                        if (itemName !== "None") {
-                            coverage = Math.floor((100.0 * (item.coverage as number)) / totalCoverage);
-                        }
 
-                        options.push({
-                            name: itemName,
-                            number: optionData.number ?? 1,
-                            coverage: coverage,
-                            integrity: item.integrity,
-                        });
-                    });
-                    partOptionData.push(options);
-                }
-            }
-
-            // Add armament and component data
-            const armamentData: BotPart[] = [];
-            const armamentOptionData: BotPart[][] = [];
-            bot.Armament?.forEach((data) => addPartData(data, armamentData, armamentOptionData));
-
-            const componentData: BotPart[] = [];
-            const componentOptionData: BotPart[][] = [];
-            bot.Components?.forEach((data) => addPartData(data, componentData, componentOptionData));
+            // Coverage and part tables are calculated by bot_csv_convert, a
+            // fully exposed core is written as null
+            const coreCoverage = bot["Core Coverage"] ?? Infinity;
+            const totalCoverage = bot["Total Coverage"] ?? Infinity;
 
             let extraData: JsonBotExtraData | undefined = undefined;
             if (!(botName in botExtraData)) {
@@ -303,16 +227,16 @@ export class BotData {
 
             const newBot: Bot = {
                 armament: bot.Armament ?? [],
-                armamentData: armamentData,
-                armamentOptionData: armamentOptionData,
+                armamentData: bot["Armament Data"] ?? [],
+                armamentOptionData: bot["Armament Option Data"] ?? [],
                 armamentString: bot["Armament String"] ?? "",
                 categories: extraData?.Categories ?? [],
                 class: bot.Class,
-                componentData: componentData,
-                componentOptionData: componentOptionData,
+                componentData: bot["Components Data"] ?? [],
+                componentOptionData: bot["Components Option Data"] ?? [],
                 components: bot.Components ?? [],
                 componentsString: bot["Components String"] ?? "",
-                coreCoverage: roughCoreCoverage,
+                coreCoverage: coreCoverage,
                 coreExposure: parseIntOrDefault(bot["Core Exposure %"], 0),
                 coreIntegrity: parseInt(bot["Core Integrity"]),
                 damagePerTurn: damagePerTurn,
@@ -588,6 +512,12 @@ export class BotData {
         return botNames.map((botName) => this.botData[botName]);
     }
 
+    // Gets every bot that carries a part, either always or as a choice of
+    // an option group, sorted by name
+    public getBotsWithPart(partName: string) {
+        return (partCarriers[partName] ?? []).map((carrier) => this.getBot(carrier.Bot));
+    }
+
     public getBot(botName: string) {
         if (botName in this.botData) {
             return this.botData[botName];
@@ -65,9 +65,6 @@ import {
     getItemSpriteImageNames,
     getNoPrefixName,
     loadImage,
-    parseFloatOrUndefined,
-    parseIntOrDefault,
-    parseIntOrUndefined,
     stringSort,
 } from "./common";
 import { specialItemProperties } from "./specialItemProperties";
@@ -85,17 +82,15 @@ export class ItemData {
             const itemName = item.Name;
             let newItem: Item | undefined;
 
-            let category: ItemRatingCategory = item.Category as ItemRatingCategory;
-            let rating = parseIntOrUndefined(item.Rating) ?? 1;
-            if (category == "Alien") {
+            const category: ItemRatingCategory = item["Rating Category"];
+            let rating = item.Rating;
+            if (category === "Alien") {
                 rating += 0.75;
             } else if (category === "Prototype") {
                 rating += 0.5;
-            } else {
-                category = "None";
             }
 
-            const ratingString = item.Rating;
+            const ratingString = item["Rating String"];
             const fabrication: FabricationStats | undefined =
                 item["Fabrication Number"] === undefined
                     ? undefined
@@ -113,12 +108,12 @@ export class ItemData {
                 categories = (itemCategories as { [key: string]: ItemCategory[] })[itemName];
             }
 
-            const coverage = parseIntOrUndefined(item.Coverage) ?? 0;
-            const hackable = !!(parseIntOrUndefined(item["Hackable Schematic"]) ?? false);
-            const integrity = parseIntOrUndefined(item.Integrity) ?? 0;
-            const mass = parseIntOrUndefined(item.Mass);
+            const coverage = item.Coverage ?? 0;
+            const hackable = item["Hackable Schematic"] ?? false;
+            const integrity = item.Integrity;
+            const mass = item.Mass;
             const noPrefixName = getNoPrefixName(itemName);
-            const size = parseIntOrUndefined(item.Size) ?? 1;
+            const size = item.Size;
             const specialProperty = specialItemProperties[itemName];
             const spoiler: Spoiler = categories.includes("Redacted")
                 ? "Redacted"
@@ -135,7 +130,7 @@ export class ItemData {
                         coverage: undefined,
                         hackable: hackable,
                         integrity: integrity,
-                        noRepairs: item["No Repairs"] === "1",
+                        noRepairs: item["No Repairs"] ?? false,
                         mass: undefined,
                         name: item.Name,
                         fabrication: fabrication,
@@ -153,40 +148,25 @@ export class ItemData {
                         specialTrait: item["Special Trait"],
                         specialProperty: specialProperty,
                         spoiler: spoiler,
-                        studyable: parseIntOrDefault(item["Studyable"], 0) === 1,
+                        studyable: item.Studyable ?? false,
                     };
                     newItem = otherItem;
                     break;
                 }
 
                 case "Power": {
-                    let minChunks: number | undefined = undefined;
-                    let maxChunks: number | undefined = undefined;
-
-                    if (item["Chunks"] !== undefined) {
-                        if (item["Chunks"].includes("-")) {
-                            const split = item["Chunks"].split("-");
-
-                            minChunks = parseInt(split[0]);
-                            maxChunks = parseInt(split[1]);
-                        } else {
-                            minChunks = parseInt(item["Chunks"]);
-                            maxChunks = minChunks;
-                        }
-                    }
-
                     const powerItem: PowerItem = {
                         slot: "Power",
                         supporterAttribution: item["Supporter Attribution"],
                         ratingCategory: category,
                         coverage: coverage,
-                        energyGeneration: parseIntOrDefault(item["Energy Generation"], 0),
-                        energyStorage: parseIntOrUndefined(item["Energy Storage"]),
+                        energyGeneration: item["Energy Generation"] ?? 0,
+                        energyStorage: item["Energy Storage"],
                         hackable: hackable,
-                        heatGeneration: parseIntOrUndefined(item["Heat Generation"]),
-                        matterUpkeep: parseIntOrUndefined(item["Matter Upkeep"]),
+                        heatGeneration: item["Heat Generation"],
+                        matterUpkeep: item["Matter Upkeep"],
                         integrity: integrity,
-                        noRepairs: item["No Repairs"] === "1",
+                        noRepairs: item["No Repairs"] ?? false,
                         mass: mass,
                         name: item.Name,
                         fullName: item["Full Name"],
@@ -200,26 +180,23 @@ export class ItemData {
                         categories: categories,
                         effect: item.Effect,
                         fabrication: fabrication,
-                        powerStability:
-                            item["Power Stability"] == null
-                                ? undefined
-                                : parseIntOrUndefined(item["Power Stability"].slice(0, -1)),
-                        explosionRadius: parseIntOrDefault(item["Explosion Radius"], 0),
+                        powerStability: item["Power Stability"],
+                        explosionRadius: item["Explosion Radius"] ?? 0,
                         explosionDamage: item["Explosion Damage"],
-                        explosionDamageMax: parseIntOrDefault(item["Explosion Damage Max"], 0),
-                        explosionDamageMin: parseIntOrDefault(item["Explosion Damage Min"], 0),
-                        explosionDisruption: parseIntOrDefault(item["Explosion Disruption"], 0),
+                        explosionDamageMax: item["Explosion Damage Max"] ?? 0,
+                        explosionDamageMin: item["Explosion Damage Min"] ?? 0,
+                        explosionDisruption: item["Explosion Disruption"] ?? 0,
                         explosionHeatTransfer: item["Explosion Heat Transfer"],
-                        explosionSalvage: parseIntOrDefault(item["Explosion Salvage"], 0),
+                        explosionSalvage: item["Explosion Salvage"] ?? 0,
                         explosionSpectrum: item["Explosion Spectrum"],
                         explosionType: item["Explosion Type"],
-                        minChunks: minChunks,
-                        maxChunks: maxChunks,
+                        minChunks: item["Chunks Min"],
+                        maxChunks: item["Chunks Max"],
                         specialTrait: item["Special Trait"],
                         index: index,
                         specialProperty: specialProperty,
                         spoiler: spoiler,
-                        studyable: parseIntOrDefault(item["Studyable"], 0) === 1,
+                        studyable: item.Studyable ?? false,
                     };
                     newItem = powerItem;
                     break;
@@ -237,20 +214,20 @@ export class ItemData {
                         supporterAttribution: item["Supporter Attribution"],
                         ratingCategory: category,
                         coverage: coverage,
-                        energyPerMove: parseFloatOrUndefined(item["Energy/Move"]),
+                        energyPerMove: item["Energy/Move"],
                         hackable: hackable,
                         integrity: integrity,
-                        noRepairs: item["No Repairs"] === "1",
+                        noRepairs: item["No Repairs"] ?? false,
                         name: item.Name,
                         fullName: item["Full Name"],
                         mass: mass,
                         noPrefixName: noPrefixName,
-                        penalty: parseInt(item.Penalty as string),
+                        penalty: item.Penalty as number,
                         rating: rating,
                         ratingString: ratingString,
                         size: size,
-                        support: parseInt(item.Support as string),
-                        timePerMove: parseInt(item["Time/Move"] as string),
+                        support: item.Support as number,
+                        timePerMove: item["Time/Move"] as number,
                         type: item.Type,
                         typeIndex: ItemData.getItemTypeIndex(item.Type),
                         fabrication: fabrication,
@@ -258,12 +235,12 @@ export class ItemData {
                         description: item.Description,
                         categories: categories,
                         effect: item.Effect,
-                        drag: parseIntOrUndefined(item.Drag),
-                        energyUpkeep: parseFloatOrUndefined(item["Energy Upkeep"]),
-                        heatGeneration: parseIntOrUndefined(item["Heat Generation"]),
-                        heatPerMove: parseIntOrUndefined(item["Heat/Move"]),
-                        matterUpkeep: parseIntOrUndefined(item["Matter Upkeep"]),
-                        modPerExtra: parseIntOrUndefined(item["Mod/Extra"]),
+                        drag: item.Drag,
+                        energyUpkeep: item["Energy Upkeep"],
+                        heatGeneration: item["Heat Generation"],
+                        heatPerMove: item["Heat/Move"],
+                        matterUpkeep: item["Matter Upkeep"],
+                        modPerExtra: item["Mod/Extra"],
                         siege: siege,
                         specialTrait: item["Special Trait"],
                         special: item.Special,
@@ -271,7 +248,7 @@ export class ItemData {
                         index: index,
                         specialProperty: specialProperty,
                         spoiler: spoiler,
-                        studyable: parseIntOrDefault(item["Studyable"], 0) === 1,
+                        studyable: item.Studyable ?? false,
                     };
                     newItem = propItem;
                     break;
@@ -285,7 +262,7 @@ export class ItemData {
                         coverage: coverage,
                         hackable: hackable,
                         integrity: integrity,
-                        noRepairs: item["No Repairs"] === "1",
+                        noRepairs: item["No Repairs"] ?? false,
                         name: item.Name,
                         fullName: item["Full Name"],
                         noPrefixName: noPrefixName,
@@ -298,34 +275,22 @@ export class ItemData {
                         description: item.Description,
                         effect: item.Effect,
                         categories: categories,
-                        energyUpkeep: parseIntOrUndefined(item["Energy Upkeep"]),
-                        heatGeneration: parseIntOrUndefined(item["Heat Generation"]),
-                        matterUpkeep: parseIntOrUndefined(item["Matter Upkeep"]),
-                        mass: parseIntOrUndefined(item.Mass) ?? 0,
+                        energyUpkeep: item["Energy Upkeep"],
+                        heatGeneration: item["Heat Generation"],
+                        matterUpkeep: item["Matter Upkeep"],
+                        mass: item.Mass ?? 0,
                         specialTrait: item["Special Trait"],
                         index: index,
                         specialProperty: specialProperty,
                         spoiler: spoiler,
-                        studyable: parseIntOrDefault(item["Studyable"], 0) === 1,
+                        studyable: item.Studyable ?? false,
                     };
                     newItem = utilItem;
                     break;
                 }
 
                 case "Weapon": {
-                    let critical: number | undefined;
-                    let criticalType: Critical | undefined;
-                    if (item.Critical !== undefined) {
-                        const result = /(\d*)% (\w*)/.exec(item.Critical);
-                        if (result === null) {
-                            critical = undefined;
-                            criticalType = undefined;
-                        } else {
-                            critical = parseInt(result[1]);
-                            criticalType = result[2] as Critical;
-                        }
-                    }
-
+                    const criticalType = item["Critical Type"];
                     let criticalIndex: CriticalIndex = CriticalNoneIndex;
                     switch (criticalType) {
                         case Critical.Blast:
@@ -377,31 +342,6 @@ export class ItemData {
                             break;
                     }
 
-                    let minChunks: number | undefined = undefined;
-                    let maxChunks: number | undefined = undefined;
-
-                    if (item["Chunks"] !== undefined) {
-                        if (item["Chunks"].includes("-")) {
-                            const split = item["Chunks"].split("-");
-
-                            minChunks = parseInt(split[0]);
-                            maxChunks = parseInt(split[1]);
-                        } else {
-                            minChunks = parseInt(item["Chunks"]);
-                            maxChunks = minChunks;
-                        }
-                    }
-
-                    const penetrationChances: number[] = [];
-                    const penetrationSplit = item.Penetration?.split("/");
-                    for (const percent of penetrationSplit ?? []) {
-                        if (percent === "Unlimited") {
-                            penetrationChances.push(100);
-                        } else {
-                            penetrationChances.push(parseIntOrDefault(percent, 0));
-                        }
-                    }
-
                     const weaponItem: WeaponItem = {
                         slot: "Weapon",
                         supporterAttribution: item["Supporter Attribution"],
@@ -409,7 +349,7 @@ export class ItemData {
                         coverage: coverage,
                         hackable: hackable,
                         integrity: integrity,
-                        noRepairs: item["No Repairs"] === "1",
+                        noRepairs: item["No Repairs"] ?? false,
                         name: item.Name,
                         fullName: item["Full Name"],
                         noPrefixName: noPrefixName,
@@ -422,63 +362,60 @@ export class ItemData {
                         description: item.Description,
                         effect: item.Effect,
                         categories: categories,
-                        mass: parseIntOrUndefined(item.Mass) ?? 0,
+                        mass: item.Mass ?? 0,
                         specialTrait: item["Special Trait"],
-                        critical: critical,
+                        critical: item["Critical Chance"],
                         criticalIndex: criticalIndex,
                         criticalType: criticalType,
                         criticalString: item.Critical,
-                        delay: parseIntOrUndefined(item.Delay),
+                        delay: item.Delay,
                         explosionHeatTransfer: item["Explosion Heat Transfer"],
                         explosionType: item["Explosion Type"],
                         penetration: item.Penetration,
-                        penetrationChances: penetrationChances,
-                        projectileCount: parseIntOrUndefined(item["Projectile Count"]) ?? 1,
-                        range: parseInt(item.Range as string),
-                        shotEnergy: parseIntOrUndefined(item["Shot Energy"]),
-                        shotHeat: parseIntOrUndefined(item["Shot Heat"]),
-                        targeting: parseIntOrUndefined(item.Targeting),
+                        penetrationChances: item["Penetration Chances"] ?? [],
+                        projectileCount: item["Projectile Count"] ?? 1,
+                        range: item.Range as number,
+                        shotEnergy: item["Shot Energy"],
+                        shotHeat: item["Shot Heat"],
+                        targeting: item.Targeting,
                         damage:
                             item["Damage"] === undefined
                                 ? item["Damage Min"] !== undefined
                                     ? `${item["Damage Min"]}-${item["Damage Max"]}`
                                     : undefined
                                 : item["Damage"],
-                        damageMin: parseIntOrUndefined(item["Damage Min"]),
-                        damageMax: parseIntOrUndefined(item["Damage Max"]),
+                        damageMin: item["Damage Min"],
+                        damageMax: item["Damage Max"],
                         damageType: item["Damage Type"],
-                        disruption: parseIntOrUndefined(item.Disruption),
+                        disruption: item.Disruption,
                         explosionDamage:
                             item["Explosion Damage"] === undefined
                                 ? item["Explosion Damage Max"] !== undefined
                                     ? `${item["Explosion Damage Min"]}-${item["Explosion Damage Max"]}`
                                     : undefined
                                 : item["Explosion Damage"],
-                        explosionDamageMin: parseIntOrUndefined(item["Explosion Damage Min"]),
-                        explosionDamageMax: parseIntOrUndefined(item["Explosion Damage Max"]),
-                        explosionDisruption: parseIntOrUndefined(item["Explosion Disruption"]),
-                        explosionRadius: parseIntOrUndefined(item["Explosion Radius"]),
-                        explosionSalvage: parseIntOrUndefined(item["Explosion Salvage"]),
+                        explosionDamageMin: item["Explosion Damage Min"],
+                        explosionDamageMax: item["Explosion Damage Max"],
+                        explosionDisruption: item["Explosion Disruption"],
+                        explosionRadius: item["Explosion Radius"],
+                        explosionSalvage: item["Explosion Salvage"],
                         explosionSpectrum: item["Explosion Spectrum"],
-                        minChunks: minChunks,
-                        maxChunks: maxChunks,
-                        falloff: parseIntOrUndefined(item.Falloff),
+                        minChunks: item["Chunks Min"],
+                        maxChunks: item["Chunks Max"],
+                        falloff: item.Falloff,
                         heatTransfer: item["Heat Transfer"],
                         life: item.Life,
-                        overloadStability:
-                            item["Overload Stability"] == null
-                                ? undefined
-                                : parseIntOrUndefined(item["Overload Stability"].slice(0, -1)),
-                        recoil: parseIntOrUndefined(item.Recoil),
-                        salvage: parseIntOrUndefined(item.Salvage),
-                        shotMatter: parseIntOrUndefined(item["Shot Matter"]),
+                        overloadStability: item["Overload Stability"],
+                        recoil: item.Recoil,
+                        salvage: item.Salvage,
+                        shotMatter: item["Shot Matter"],
                         spectrum: item.Spectrum,
                         waypoints: item.Waypoints,
-                        arc: parseIntOrUndefined(item.Arc),
+                        arc: item.Arc,
                         index: index,
                         specialProperty: specialProperty,
                         spoiler: spoiler,
-                        studyable: parseIntOrDefault(item["Studyable"], 0) === 1,
+                        studyable: item.Studyable ?? false,
                     };
                     newItem = weaponItem;
                     break;
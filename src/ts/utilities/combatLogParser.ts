@@ -791,11 +791,11 @@ function tryGetUnknownPart(partName: string, bot: JsonBot) {
 
                 let ratingMatch: boolean;
                 if (isAlien) {
-                    ratingMatch = part.Rating.includes("**");
+                    ratingMatch = part["Rating Category"] === "Alien";
                 } else if (isProto) {
-                    ratingMatch = part.Rating.includes("*");
+                    ratingMatch = part["Rating Category"] !== "None";
                 } else {
-                    ratingMatch = !part.Rating.includes("*");
+                    ratingMatch = part["Rating Category"] === "None";
                 }
 
                 if (part.Type === unknownResult[2] && ratingMatch) {
@@ -0,0 +1,231 @@
+#!/usr/bin/env py
+# Times and memory profiles the converters and wiki sync scripts against
+# synthetic inputs at several scales
+#
+# For each scale the inputs are generated with synthetic_data.py into a
+# scratch copy of the repository layout, and every script is copied next to
+# them and run as its own process so it reads and writes the scratch files
+# through its usual paths. Each run gets a fresh copy of its inputs. Wall time
+# is measured on plain runs, then one more run is profiled (see profiling.py)
+# for its traced Python allocation peak and, where the platform reports it,
+# its peak RSS. Time and traced peak are compared against a saved baseline,
+# and anything that got slower or bigger than the tolerance allows is
+# reported as a regression.
+#
+# Times depend on the machine, so the baseline is per machine. It's saved to
+# the gitignored .benchmark_baseline.json and only compared against runs on
+# the machine that saved it.
+import argparse
+from collections import namedtuple
+import glob
+import json
+import os
+from os import path
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from profiling import profile_env_var
+from synthetic_data import scales
+
+utils_dir = path.dirname(path.realpath(__file__))
+synthetic_data_path = path.join(utils_dir, 'synthetic_data.py')
+baseline_path = path.join(utils_dir, '.benchmark_baseline.json')
+
+# A script run along with the scratch files it modifies, which are restored
+# from the generated copy before every run
+Case = namedtuple('Case', ['name', 'script', 'args', 'modified_files'])
+
+wiki_files = ['src/json/wiki.json', 'utils/wiki.csv']
+
+CASES = [
+    Case('part_csv_convert', 'part_csv_convert.py', [], []),
+    Case('bot_csv_convert', 'bot_csv_convert.py', [], []),
+    Case('lore_csv_convert', 'lore_csv_convert.py', [], []),
+    Case('update_wiki_json', 'update_wiki_json.py', [], wiki_files),
+    Case('update_wiki_csv_from_json', 'update_wiki_csv_from_json.py', [], wiki_files),
+    Case('update_wiki_json_from_csv', 'update_wiki_json_from_csv.py', [], wiki_files),
+    Case('combat_log_analyzer', 'combat_log_analyzer.py', ['../logs', '--processes', '1', '--output', 'stats.json'],
+         []),
+]
+
+Result = namedtuple('Result', ['seconds', 'traced_peak_kb', 'peak_rss_kb'])
+
+
+# Runs a script in its own process, returning its wall time. With a profile
+# path the script writes its profile there as JSON.
+def run_script(root, case: Case, profile_path=None):
+    env = dict(os.environ)
+    env.pop(profile_env_var, None)
+    if profile_path is not None:
+        env[profile_env_var] = profile_path
+
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, case.script] + case.args, cwd=path.join(root, 'utils'), env=env,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    seconds = time.perf_counter() - start
+
+    if process.returncode != 0:
+        raise Exception('{} failed:\n{}'.format(case.name, process.stderr.decode()))
+
+    return seconds
+
+
+# Runs a script with profiling on, returning its traced peak and its peak RSS,
+# which is None where the platform doesn't report it
+def profile_script(root, case: Case):
+    profile_path = path.join(root, 'profile.json')
+    run_script(root, case, profile_path)
+
+    with open(profile_path) as f:
+        profile = json.load(f)
+
+    return profile['Traced Peak KB'], profile['Peak RSS KB']
+
+
+def format_memory(kb):
+    return '-' if kb is None else '{:.1f}'.format(kb / 1024)
+
+
+def restore_files(root, pristine_root, file_names):
+    for file_name in file_names:
+        shutil.copyfile(path.join(pristine_root, file_name), path.join(root, file_name))
+
+
+# Generates the inputs of one scale and runs every case against them, keeping
+# the fastest time over the repeats
+def run_scale(scratch_dir, scale, case_names, repeat, seed, logs):
+    root = path.join(scratch_dir, '{}x'.format(scale))
+    pristine_root = path.join(scratch_dir, '{}x_pristine'.format(scale))
+
+    # Generate in another process, a child's peak RSS starts at its parent's
+    # on some platforms so this one has to stay small
+    subprocess.run([sys.executable, synthetic_data_path, pristine_root, '--scale', str(scale), '--seed', str(seed),
+                    '--logs', str(logs * scale)], check=True)
+    shutil.copytree(pristine_root, root)
+
+    for script_path in glob.glob(path.join(utils_dir, '*.py')):
+        shutil.copy(script_path, path.join(root, 'utils'))
+
+    # The wiki scripts read items.json and bots.json and the log analyzer
+    # resolves names against them, so convert once up front at this scale
+    for case in CASES[:2]:
+        run_script(root, case)
+
+    for file_name in ['src/json/items.json', 'src/json/bots.json']:
+        shutil.copyfile(path.join(root, file_name), path.join(pristine_root, file_name))
+
+    results = {}
+    for case in CASES:
+        if case_names is not None and case.name not in case_names:
+            continue
+
+        runs = []
+        for _ in range(repeat):
+            restore_files(root, pristine_root, case.modified_files)
+            runs.append(run_script(root, case))
+
+        restore_files(root, pristine_root, case.modified_files)
+        (traced_peak_kb, peak_rss_kb) = profile_script(root, case)
+
+        result = Result(min(runs), traced_peak_kb, peak_rss_kb)
+        results[case.name] = result
+        print('{:<28} {:>4}x {:>9.2f}s {:>9} MB traced {:>9} MB RSS'.format(
+            case.name, scale, result.seconds, format_memory(result.traced_peak_kb), format_memory(result.peak_rss_kb)))
+
+    return results
+
+
+def load_baseline():
+    try:
+        with open(baseline_path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+# Prints each result next to its baseline, returning the number of results
+# that regressed past the tolerance
+def compare_baseline(results, baseline, tolerance):
+    regressions = 0
+
+    print()
+    print('{:<28} {:>5} {:>10} {:>10} {:>8} {:>12} {:>10} {:>8}'.format(
+        'Case', 'Scale', 'Time (s)', 'Base (s)', 'Change', 'Traced (MB)', 'Base (MB)', 'Change'))
+
+    for (scale, scale_results) in results.items():
+        for (case_name, result) in scale_results.items():
+            base = baseline.get(scale, {}).get(case_name)
+            if base is None or 'Traced Peak KB' not in base:
+                continue
+
+            time_change = result.seconds / base['Seconds'] - 1
+            traced_change = result.traced_peak_kb / base['Traced Peak KB'] - 1
+            regressed = time_change > tolerance or traced_change > tolerance
+            regressions += regressed
+
+            print('{:<28} {:>5} {:>10.2f} {:>10.2f} {:>+7.0%} {:>12.1f} {:>10.1f} {:>+7.0%}{}'.format(
+                case_name, scale, result.seconds, base['Seconds'], time_change, result.traced_peak_kb / 1024,
+                base['Traced Peak KB'] / 1024, traced_change, '  REGRESSION' if regressed else ''))
+
+    return regressions
+
+
+def main(bench_scales, case_names, repeat, seed, logs, tolerance, save_baseline, keep):
+    scratch_dir = tempfile.mkdtemp(prefix='cog_benchmark_')
+    results = {}
+
+    try:
+        for scale in bench_scales:
+            results['{}x'.format(scale)] = run_scale(scratch_dir, scale, case_names, repeat, seed, logs)
+    finally:
+        if keep:
+            print('Kept scratch files in {}'.format(scratch_dir))
+        else:
+            shutil.rmtree(scratch_dir)
+
+    baseline = load_baseline()
+    regressions = 0
+
+    if baseline is not None:
+        regressions = compare_baseline(results, baseline, tolerance)
+
+    if save_baseline:
+        baseline = baseline or {}
+        for (scale, scale_results) in results.items():
+            for (case_name, result) in scale_results.items():
+                baseline.setdefault(scale, {})[case_name] = {
+                    'Seconds': round(result.seconds, 4),
+                    'Traced Peak KB': result.traced_peak_kb,
+                    'Peak RSS KB': result.peak_rss_kb,
+                }
+
+        with open(baseline_path, 'w') as f:
+            json.dump(baseline, f, indent=4)
+
+        print('Saved baseline to {}'.format(baseline_path))
+
+    if regressions > 0:
+        print('{} regressions over {:.0%}'.format(regressions, tolerance))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='Utils benchmark')
+    parser.add_argument('--scales', type=int, nargs='+', default=scales,
+                        help='Multiples of the real data size to benchmark')
+    parser.add_argument('--cases', nargs='+', choices=[case.name for case in CASES],
+                        help='Only run the given scripts')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of runs of each script, the fastest is kept')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed of the generated inputs')
+    parser.add_argument('--logs', type=int, default=10, help='Number of combat logs generated per unit of scale')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Fraction a time or traced peak can grow over the baseline before it is a regression')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Save these results as this machine\'s baseline that future runs are compared against')
+    parser.add_argument('--keep', action='store_true', help='Keep the generated scratch files')
+    args = parser.parse_args()
+
+    main(args.scales, args.cases, args.repeat, args.seed, args.logs, args.tolerance, args.save_baseline, args.keep)
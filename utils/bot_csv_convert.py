@@ -1,16 +1,22 @@
 #!/usr/bin/env py
 
+import argparse
 from collections import defaultdict
-import csv
-import json
-from io import StringIO
+import math
 from os import path
 import re
 
+from csv_convert import (ColumnProjection, add_output_args, get_output_path, print_format_report, read_csv, read_json,
+                         write_json)
+from profiling import profiler
+
 input_path = path.join(path.dirname(path.realpath(__file__)), 'robots_export.csv')
 # input_path_b15 = path.join(path.dirname(path.realpath(__file__)), 'robots_export_b15.csv')
 output_path = path.join(path.dirname(path.realpath(__file__)), '..', 'src', 'json', 'bots.json')
 # output_path_b15 = path.join(path.dirname(path.realpath(__file__)), '..', 'src', 'json', 'bots_b15.json')
+items_path = path.join(path.dirname(path.realpath(__file__)), '..', 'src', 'json', 'items.json')
+part_carriers_output_path = path.join(path.dirname(path.realpath(__file__)), '..', 'src', 'json',
+                                      'part_carriers.json')
 
 categories = [
     'Name',
@@ -135,14 +141,6 @@ resistances = [
     'Thermal',
 ]
 
-def get_value(row, name):
-    val = row[index_lookup[name]]
-
-    if val == '':
-        return None
-    else:
-        return val
-
 def get_parts(part_strings):
     parts = []
     for string in part_strings:
@@ -150,16 +148,19 @@ def get_parts(part_strings):
         if len(options) > 1:
             option_list = []
             for option in options:
+                option_values = {}
                 match = re.match('(\d+)x (.*)', option)
                 if match is not None:
-                    option_list.append({'name': match.group(2), 'number': int(match.group(1))})
-                else:
-                    match = re.match('(.*) \(\d*%\)', option)
-                    if match is not None:
-                        # For now just strip the percentage, maybe will add in later
-                        option_list.append({'name': match.group(1)})
-                    else:
-                        option_list.append({'name': option})
+                    option = match.group(2)
+                    option_values['number'] = int(match.group(1))
+
+                # Some choices come with the percent chance of the bot having them
+                match = re.match('(.*) \((\d+)%\)', option)
+                if match is not None:
+                    option = match.group(1)
+                    option_values['chance'] = int(match.group(2))
+
+                option_list.append({'name': option, **option_values})
             parts.append(option_list)
         else:
             part = options[0]
@@ -172,35 +173,174 @@ def get_parts(part_strings):
 
     return parts
 
-index_lookup = {}
-all_values = []
+# Gets the coverage of a part, or of the largest choice of an option group
+def get_item_coverage(part, items):
+    if isinstance(part, str):
+        return items[part].get('Coverage', 0)
+
+    return max([items[option['name']].get('Coverage', 0) * option.get('number', 1)
+                for option in part if option['name'] != 'None'], default=0)
+
+# Roughly estimates the core coverage of a bot from its core exposure and the
+# coverage of its parts. A fully exposed core leaves no coverage for parts.
+def get_core_coverage(core_exposure, item_coverage):
+    try:
+        core_exposure = int(core_exposure)
+    except (TypeError, ValueError):
+        return 1
+
+    if core_exposure >= 100:
+        return math.inf if item_coverage > 0 else 1
+
+    return 100.0 / (100.0 - core_exposure) * item_coverage - item_coverage
+
+def get_part_row(name, number, items, total_coverage):
+    if name == 'None':
+        return {'name': name, 'number': number, 'coverage': 0, 'integrity': 0}
+
+    item = items[name]
+    coverage = 0 if total_coverage == 0 else math.floor(100.0 * item.get('Coverage', 0) / total_coverage)
+    return {'name': name, 'number': number, 'coverage': coverage, 'integrity': item['Integrity']}
+
+# Resolves a list of parts into a table of single parts, with repeated parts
+# counted once, and a table of the choices of each option group
+def get_part_data(parts, items, total_coverage):
+    part_data = {}
+    option_data = []
+
+    for part in parts:
+        if isinstance(part, str):
+            if part in part_data:
+                part_data[part]['number'] += 1
+            else:
+                part_data[part] = get_part_row(part, 1, items, total_coverage)
+        else:
+            options = []
+            for option in part:
+                options.append(get_part_row(option['name'], option.get('number', 1), items, total_coverage))
+                if 'chance' in option:
+                    options[-1]['chance'] = option['chance']
+
+            option_data.append(options)
+
+    return (list(part_data.values()), option_data)
+
+# Adds the coverage of the core and of every part of a bot, so the site
+# doesn't have to look up every part of every bot when it loads
+def add_part_data(values, items):
+    parts = values.get('Armament', []) + values.get('Components', [])
+    for part in parts:
+        for name in [part] if isinstance(part, str) else [option['name'] for option in part]:
+            if name != 'None' and name not in items:
+                raise Exception('Unknown part {} on {}'.format(name, values['Name']))
+
+    item_coverage = sum(get_item_coverage(part, items) for part in parts)
+    core_coverage = get_core_coverage(values.get('Core Exposure %'), item_coverage)
+    if math.isfinite(core_coverage):
+        total_coverage = math.ceil(core_coverage / 10) * 10 + item_coverage
+    else:
+        total_coverage = math.inf
+
+    # JSON has no infinity, null stands in for it
+    values['Core Coverage'] = core_coverage if math.isfinite(core_coverage) else None
+    values['Total Coverage'] = total_coverage if math.isfinite(total_coverage) else None
+
+    for category_name in ['Armament', 'Components']:
+        if category_name in values:
+            (part_data, option_data) = get_part_data(values[category_name], items, total_coverage)
+            values[category_name + ' Data'] = part_data
+            values[category_name + ' Option Data'] = option_data
+
+# Builds an index of the bots carrying each part, in bot name order, with one
+# entry per bot. The number is the most of the part the bot can carry between
+# its fixed parts and the choices of its option groups, and the part is only
+# optional if the bot never carries it as a fixed part.
+def get_part_carriers(all_values):
+    part_carriers = {}
+
+    for values in sorted(all_values, key=lambda values: values['Name']):
+        part_counts = {}
+        option_counts = {}
+
+        for part in values.get('Armament', []) + values.get('Components', []):
+            if isinstance(part, str):
+                part_counts[part] = part_counts.get(part, 0) + 1
+            else:
+                # Only one choice of a group is carried, so a group adds the
+                # most of the part any of its choices has
+                group_counts = {}
+                for option in part:
+                    if option['name'] != 'None':
+                        group_counts[option['name']] = max(group_counts.get(option['name'], 0), option.get('number', 1))
+
+                for (part_name, number) in group_counts.items():
+                    option_counts[part_name] = option_counts.get(part_name, 0) + number
+
+        for part_name in dict.fromkeys(list(part_counts) + list(option_counts)):
+            part_carriers.setdefault(part_name, []).append({
+                'Bot': values['Name'],
+                'Number': part_counts.get(part_name, 0) + option_counts.get(part_name, 0),
+                'Optional': part_name not in part_counts,
+            })
+
+    return part_carriers
+
+# Gets the chance of each choice of an option group from 0 to 1. Choices
+# without a chance in the export split whatever chance is left evenly.
+def get_option_chances(options):
+    known_chance = sum(option['chance'] for option in options if 'chance' in option)
+    unknown_count = sum(1 for option in options if 'chance' not in option)
+    unknown_chance = max(0, 100 - known_chance) / unknown_count if unknown_count > 0 else 0
+
+    return [option.get('chance', unknown_chance) / 100 for option in options]
+
+# Adds the expected coverage of a bot's parts, the expected mass of its
+# components (like the mass shown on the site, armament isn't counted) and
+# the percent chance of each weapon being carried, weighing every choice of
+# an option group by its chance
+def add_expected_stats(values, items):
+    part_coverage = 0
+    mass = 0
+    weapon_miss_chances = {}
+
+    for category_name in ['Armament', 'Components']:
+        for part in values.get(category_name, []):
+            if isinstance(part, str):
+                choices = [(part, 1, 1)]
+            else:
+                choices = [(option['name'], option.get('number', 1), chance)
+                           for (option, chance) in zip(part, get_option_chances(part)) if option['name'] != 'None']
 
-def process_csv(input_path, output_path):
-    index_lookup.clear()
-    all_values.clear()
+            for (name, number, chance) in choices:
+                item = items[name]
+                part_coverage += chance * number * item.get('Coverage', 0)
 
-    name_replacements_indices = defaultdict(lambda: 0)
+                if category_name == 'Components':
+                    mass += chance * number * item.get('Mass', 0)
+
+                if item['Slot'] == 'Weapon':
+                    weapon_miss_chances[name] = weapon_miss_chances.get(name, 1) * (1 - chance)
 
-    with open(input_path) as f:
-        string = f.read()
+    values['Expected Part Coverage'] = round(part_coverage, 2)
+    values['Expected Mass'] = round(mass, 2)
+    values['Weapon Chances'] = {name: round(100 * (1 - miss_chance), 2)
+                                for (name, miss_chance) in weapon_miss_chances.items()}
 
-    csv.register_dialect('cog', 'excel', escapechar='\\')
-    reader = csv.reader(StringIO(string), csv.get_dialect('cog'))
+def process_csv(input_path, output_path, output_format='pretty', part_carriers_output_path=None):
+    all_values = []
+    all_names = set()
+    items = {item['Name']: item for item in read_json(get_output_path(items_path, output_format))}
 
-    header = next(reader)
+    name_replacements_indices = defaultdict(lambda: 0)
 
-    # Update the index lookup based on the header row
-    for category_name in categories:
-        index_lookup[category_name] = header.index(category_name)
+    rows = read_csv(input_path)
+    header = next(rows)
 
-    for row in reader:
-        values = {}
+    # Resolve the columns against the header row once
+    projection = ColumnProjection(header, categories)
 
-        for category_name in categories:
-            # Get values from rows
-            val = get_value(row, category_name)
-            if val is not None:
-                values[category_name] = val
+    for row in profiler.loop_stage('transform', rows):
+        values = projection.get_values(row)
 
         if values['Name'] in skip_bots:
             continue
@@ -251,9 +391,11 @@ def process_csv(input_path, output_path):
         if values['Name'] in class_replacements:
             values['Class'] = class_replacements[values['Name']]
 
-        if values['Name'] in all_values:
+        if values['Name'] in all_names:
             raise Exception('Duplicate name {}'.format(values['Name']))
 
+        all_names.add(values['Name'])
+
         if values['Name'] in overload_speeds:
             values['Overload Speed'] = overload_speeds[values['Name']]
             values['Overload Speed %'] = overload_speed_percentages[values['Name']]
@@ -263,10 +405,31 @@ def process_csv(input_path, output_path):
             values['Short Name'] = match[1]
             values['Ally Name'] = match[2]
 
+        add_part_data(values, items)
+        add_expected_stats(values, items)
+
         all_values.append(values)
 
-    with open(output_path, 'w') as f:
-        json.dump(all_values, f, indent=4)
+    profiler.count('rows', len(all_values))
+
+    write_json(all_values, get_output_path(output_path, output_format), output_format)
+
+    if part_carriers_output_path is not None:
+        # The site imports the index as is, so it's always written in the
+        # checked in format
+        write_json(get_part_carriers(all_values), part_carriers_output_path)
+
+    return all_values
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='Bot CSV converter')
+    add_output_args(parser)
+    args = parser.parse_args()
+    profiler.start('bot_csv_convert', args.profile)
+
+    values = process_csv(input_path, output_path, args.format, part_carriers_output_path)
+    # process_csv(input_path_b15, output_path_b15)
+
+    if args.report:
+        print_format_report(values)
 
-process_csv(input_path, output_path)
-# process_csv(input_path_b15, output_path_b15)
\ No newline at end of file
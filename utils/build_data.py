@@ -0,0 +1,147 @@
+#!/usr/bin/env py
+# Rebuilds the items/bots/lore JSON from the exports, skipping converters
+# whose inputs haven't changed since the last build. Bots are built after
+# items since their part tables are joined against items.json. The references
+# between the datasets are validated after every build.
+import argparse
+from collections import namedtuple
+import hashlib
+import json
+from os import path
+import sys
+
+import bot_csv_convert
+from csv_convert import OUTPUT_FORMATS, get_output_path
+import lore_csv_convert
+import part_csv_convert
+from profiling import add_profile_args, profiler
+import validate_data
+
+cache_path = path.join(path.dirname(path.realpath(__file__)), '.build_cache.json')
+csv_convert_path = path.join(path.dirname(path.realpath(__file__)), 'csv_convert.py')
+sharded_manifest_path = path.join(part_csv_convert.sharded_output_path, 'manifest.json')
+
+# The inputs, outputs and run functions take the build options, since the
+# options change which files are written. Only the listed options are part of
+# a converter's hash.
+Converter = namedtuple('Converter', ['name', 'module', 'config_tables', 'options', 'inputs', 'outputs', 'run'])
+
+CONVERTERS = [
+    Converter(
+        'items',
+        part_csv_convert,
+        ['categories', 'slot_categories', 'defaults', 'int_columns', 'float_columns', 'percent_columns',
+         'bool_columns', 'expansions', 'quote_fixes'],
+        ['format', 'sharded'],
+        lambda options: [part_csv_convert.input_path],
+        lambda options: [get_output_path(part_csv_convert.output_path, options['format']),
+                         part_csv_convert.all_parts_output_path,
+                         *([sharded_manifest_path] if options['sharded'] else [])],
+        lambda options: part_csv_convert.process_csv(
+            part_csv_convert.input_path, part_csv_convert.output_path, part_csv_convert.all_parts_output_path,
+            options['format'], part_csv_convert.sharded_output_path if options['sharded'] else None),
+    ),
+    Converter(
+        'bots',
+        bot_csv_convert,
+        ['categories', 'overload_speeds', 'overload_speed_percentages', 'name_replacements',
+         'class_replacements', 'skip_bots', 'resistances'],
+        ['format'],
+        lambda options: [bot_csv_convert.input_path, get_output_path(bot_csv_convert.items_path, options['format'])],
+        lambda options: [get_output_path(bot_csv_convert.output_path, options['format']),
+                         bot_csv_convert.part_carriers_output_path],
+        lambda options: bot_csv_convert.process_csv(
+            bot_csv_convert.input_path, bot_csv_convert.output_path, options['format'],
+            bot_csv_convert.part_carriers_output_path),
+    ),
+    Converter(
+        'lore',
+        lore_csv_convert,
+        ['categories', 'additional_content'],
+        ['format'],
+        lambda options: [lore_csv_convert.input_path],
+        lambda options: [get_output_path(lore_csv_convert.output_path, options['format'])],
+        lambda options: lore_csv_convert.process_csv(
+            lore_csv_convert.input_path, lore_csv_convert.output_path, options['format']),
+    ),
+]
+
+
+def hash_file(file_path, hash):
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(1 << 16):
+            hash.update(chunk)
+
+
+# Hashes everything that determines a converter's output: the input exports,
+# the converter's config tables, the conversion code itself and the options
+# it uses
+def get_converter_hash(converter: Converter, options):
+    converter_options = {name: options[name] for name in converter.options}
+    hash = hashlib.sha256(json.dumps(converter_options, sort_keys=True).encode())
+
+    for input_path in converter.inputs(options):
+        hash_file(input_path, hash)
+
+    tables = {name: getattr(converter.module, name) for name in converter.config_tables}
+    hash.update(json.dumps(tables, sort_keys=True, default=sorted).encode())
+
+    hash_file(converter.module.__file__, hash)
+    hash_file(csv_convert_path, hash)
+
+    return hash.hexdigest()
+
+
+def load_cache():
+    try:
+        with open(cache_path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def main(force, only, options, validate):
+    cache = load_cache()
+    cache_updated = False
+
+    for converter in CONVERTERS:
+        if only is not None and converter.name not in only:
+            continue
+
+        converter_hash = get_converter_hash(converter, options)
+        outputs_exist = all(path.exists(output_path) for output_path in converter.outputs(options))
+
+        if not force and outputs_exist and cache.get(converter.name) == converter_hash:
+            print('{} is up to date'.format(converter.name))
+            continue
+
+        print('Converting {}'.format(converter.name))
+        converter.run(options)
+
+        cache[converter.name] = converter_hash
+        cache_updated = True
+
+    if cache_updated:
+        with open(cache_path, 'w') as f:
+            json.dump(cache, f, indent=4)
+
+    if validate and validate_data.main(options['format']) > 0:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='Data build')
+    parser.add_argument('--force', action='store_true', help='Run every converter even if its inputs are unchanged')
+    parser.add_argument('--only', nargs='+', choices=[converter.name for converter in CONVERTERS],
+                        help='Only build the given outputs')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS.keys(), default='pretty',
+                        help='JSON output format, columnar output is written to separate .columnar.json files')
+    parser.add_argument('--sharded', action='store_true',
+                        help='Also write parts split into per slot and category shards with a manifest')
+    parser.add_argument('--skip-validation', action='store_true',
+                        help="Don't check the references between the datasets after building")
+    add_profile_args(parser)
+    args = parser.parse_args()
+    profiler.start('build_data', args.profile)
+
+    main(args.force, args.only, {'format': args.format, 'sharded': args.sharded}, not args.skip_validation)
@@ -0,0 +1,228 @@
+#!/usr/bin/env py
+# Monte Carlo driver for combat_sim.py that spreads fights over processes
+#
+# Each matchup is simulated in batches of fights. Batch N of matchup M always
+# draws from the RNG stream spawned for (seed, M, N), so results only depend
+# on the seed and batch settings and not on the number of processes or the
+# order batches finish in. Batches are run in rounds and a matchup stops once
+# the confidence interval of its mean volleys to kill is tight enough.
+# Batches are reduced to histograms as they come back so memory doesn't grow
+# with the number of fights.
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import json
+import math
+import os
+
+import numpy as np
+
+from combat_sim import get_target, get_weapon, load_bots, load_items, max_volleys, simulate_combat
+
+# Two-sided z score of each supported confidence level
+z_scores = {
+    90: 1.645,
+    95: 1.960,
+    99: 2.576,
+}
+
+percentiles = [50, 90, 99]
+
+
+# Streaming aggregate of kill times
+class KillStats:
+    def __init__(self):
+        self.volley_counts = np.zeros(0, dtype=np.int64)
+        self.turn_counts = np.zeros(0, dtype=np.int64)
+        self.fights = 0
+        self.failures = 0
+        self.volley_sum = 0
+        self.volley_square_sum = 0
+        self.tu_sum = 0
+
+    @staticmethod
+    def from_fights(volleys, tus):
+        stats = KillStats()
+        killed = volleys > 0
+
+        stats.volley_counts = np.bincount(volleys[killed])
+        stats.turn_counts = np.bincount(tus[killed] // 100)
+        stats.fights = len(volleys)
+        stats.failures = len(volleys) - int(np.count_nonzero(killed))
+        stats.volley_sum = int(volleys[killed].sum())
+        stats.volley_square_sum = int((volleys[killed] ** 2).sum())
+        stats.tu_sum = int(tus[killed].sum())
+
+        return stats
+
+    def merge(self, other):
+        def add_counts(counts, other_counts):
+            if len(counts) < len(other_counts):
+                counts = np.pad(counts, (0, len(other_counts) - len(counts)))
+            counts[:len(other_counts)] += other_counts
+            return counts
+
+        self.volley_counts = add_counts(self.volley_counts, other.volley_counts)
+        self.turn_counts = add_counts(self.turn_counts, other.turn_counts)
+        self.fights += other.fights
+        self.failures += other.failures
+        self.volley_sum += other.volley_sum
+        self.volley_square_sum += other.volley_square_sum
+        self.tu_sum += other.tu_sum
+
+    @property
+    def kills(self):
+        return self.fights - self.failures
+
+    @property
+    def mean_volleys(self):
+        return self.volley_sum / self.kills if self.kills > 0 else math.nan
+
+    @property
+    def mean_tus(self):
+        return self.tu_sum / self.kills if self.kills > 0 else math.nan
+
+    # Half width of the confidence interval of the mean volleys to kill
+    def confidence_half_width(self, confidence):
+        if self.kills < 2:
+            return math.inf
+
+        variance = (self.volley_square_sum - self.volley_sum ** 2 / self.kills) / (self.kills - 1)
+        return z_scores[confidence] * math.sqrt(max(variance, 0) / self.kills)
+
+    # Gets percentiles of a histogram by its cumulative counts
+    @staticmethod
+    def get_percentiles(counts):
+        cumulative = np.cumsum(counts)
+        if len(cumulative) == 0 or cumulative[-1] == 0:
+            return {percentile: None for percentile in percentiles}
+
+        return {percentile: int(np.searchsorted(cumulative, cumulative[-1] * percentile / 100))
+                for percentile in percentiles}
+
+    def to_json(self, confidence):
+        return {
+            'Fights': self.fights,
+            'Failures': self.failures,
+            'Mean Volleys': self.mean_volleys,
+            'Mean TUs': self.mean_tus,
+            'Confidence Half Width': self.confidence_half_width(confidence),
+            'Volley Percentiles': self.get_percentiles(self.volley_counts),
+            'Turn Percentiles': self.get_percentiles(self.turn_counts),
+            'Volley Histogram': self.volley_counts.tolist(),
+        }
+
+
+def run_batch(batch):
+    (target, weapons, batch_size, seed_sequence, volley_limit) = batch
+    rng = np.random.default_rng(seed_sequence)
+    (volleys, tus) = simulate_combat(target, weapons, batch_size, rng, volley_limit=volley_limit)
+    return KillStats.from_fights(volleys, tus)
+
+
+# Checks if a matchup has enough fights to stop, either by hitting the
+# maximum or by its confidence interval being within the tolerance
+def is_done(stats, min_fights, max_fights, tolerance, confidence):
+    if stats.fights >= max_fights:
+        return True
+
+    if stats.fights < min_fights:
+        return False
+
+    if stats.kills == 0:
+        # Nothing is dying, more fights won't change that
+        return True
+
+    return stats.confidence_half_width(confidence) <= tolerance * stats.mean_volleys
+
+
+# Runs every matchup until it's done, one round of batches at a time
+def run_matchups(matchups, seed, executor, batch_size, round_batches, min_fights, max_fights, tolerance,
+                 confidence, volley_limit):
+    results = [KillStats() for _ in matchups]
+    batch_indices = [0] * len(matchups)
+    running = list(range(len(matchups)))
+
+    while len(running) > 0:
+        batches = []
+        for matchup_index in running:
+            (target, weapons) = matchups[matchup_index]
+            for _ in range(round_batches):
+                seed_sequence = np.random.SeedSequence(seed, spawn_key=(matchup_index, batch_indices[matchup_index]))
+                batches.append((matchup_index, (target, weapons, batch_size, seed_sequence, volley_limit)))
+                batch_indices[matchup_index] += 1
+
+        batch_map = executor.map if executor is not None else map
+        for ((matchup_index, _), stats) in zip(batches, batch_map(run_batch, [batch for (_, batch) in batches])):
+            results[matchup_index].merge(stats)
+
+        running = [matchup_index for matchup_index in running
+                   if not is_done(results[matchup_index], min_fights, max_fights, tolerance, confidence)]
+
+    return results
+
+
+def main(bot_names, weapon_names, seed, processes, batch_size, round_batches, min_fights, max_fights, tolerance,
+         confidence, volley_limit, output_path):
+    items = load_items()
+    bots = load_bots()
+
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+        print('Using seed {}'.format(seed))
+
+    weapons = [get_weapon(items[name]) for name in weapon_names]
+    matchups = [(get_target(bots[name], items), weapons) for name in bot_names or bots]
+
+    if processes <= 1:
+        results = run_matchups(matchups, seed, None, batch_size, round_batches, min_fights, max_fights, tolerance,
+                               confidence, volley_limit)
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = run_matchups(matchups, seed, executor, batch_size, round_batches, min_fights, max_fights,
+                                   tolerance, confidence, volley_limit)
+
+    for ((target, _), stats) in zip(matchups, results):
+        if stats.kills == 0:
+            print('{}: no kills in {} fights'.format(target.name, stats.fights))
+            continue
+
+        volley_percentiles = stats.get_percentiles(stats.volley_counts)
+        print('{}: {:.2f} ±{:.2f} volleys ({:.0f} TUs) over {} fights, median {}, 90% {}, 99% {}'.format(
+            target.name, stats.mean_volleys, stats.confidence_half_width(confidence), stats.mean_tus, stats.fights,
+            *volley_percentiles.values()))
+
+    if output_path is not None:
+        output = {
+            'Seed': seed,
+            'Weapons': weapon_names,
+            'Bots': {target.name: stats.to_json(confidence) for ((target, _), stats) in zip(matchups, results)},
+        }
+
+        with open(output_path, 'w') as f:
+            json.dump(output, f, indent=4)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='Combat Monte Carlo driver')
+    parser.add_argument('--bots', nargs='+', help='Bots to fight, defaults to every bot')
+    parser.add_argument('--weapons', nargs='+', required=True, help='Weapons fired every volley')
+    parser.add_argument('--seed', type=int, help='Root random seed, a random one is picked and printed if not given')
+    parser.add_argument('--processes', type=int, default=os.cpu_count(),
+                        help='Number of worker processes, 1 runs everything in this process')
+    parser.add_argument('--batch-size', type=int, default=10000, help='Number of fights in each batch')
+    parser.add_argument('--round-batches', type=int, default=4,
+                        help='Number of batches of each matchup run before checking whether it can stop')
+    parser.add_argument('--min-fights', type=int, default=20000,
+                        help='Number of fights to run before a matchup can stop early')
+    parser.add_argument('--max-fights', type=int, default=1000000, help='Maximum number of fights per matchup')
+    parser.add_argument('--tolerance', type=float, default=0.005,
+                        help='Stop once the confidence interval is within this fraction of the mean volleys')
+    parser.add_argument('--confidence', type=int, choices=z_scores.keys(), default=95,
+                        help='Confidence level of the interval in percent')
+    parser.add_argument('--max-volleys', type=int, default=max_volleys,
+                        help='Number of volleys after which a fight is given up on')
+    parser.add_argument('--output', help='Write the aggregates of every matchup as JSON to this path')
+    args = parser.parse_args()
+
+    main(args.bots, args.weapons, args.seed, args.processes, args.batch_size, args.round_batches, args.min_fights,
+         args.max_fights, args.tolerance, args.confidence, args.max_volleys, args.output)
@@ -0,0 +1,566 @@
+#!/usr/bin/env py
+# Streams Cogmind combat logs and aggregates damage and kill statistics
+#
+# A Python counterpart of parseCombatLog in combatLogParser.ts for running
+# over large collections of logs. Lines are read one at a time and
+# classified with a single combined pattern, names are resolved through
+# indexes of bots.json and items.json built once per process, and each log
+# is reduced to counters so files can be spread across processes and merged.
+import argparse
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import json
+import os
+from os import path
+import re
+
+from profiling import add_profile_args, profiler
+
+json_dir = path.join(path.dirname(path.realpath(__file__)), '..', 'src', 'json')
+
+# Match 1: Turn number
+# Match 2: Indentation
+# Match 3: Remainder of line
+# Match 4: Repeat count (optional)
+line_start_regex = re.compile(r'^(\d*)_( *)(.*?)(?: <x(\d*|\*)>)?$')
+
+# Every kind of line, in the order the nested parsing in combatLogParser.ts
+# tries them (damage and destroyed lines under an attack come first). At the
+# top level the TS tries attack, ??? and explosion lines before damage and
+# destroyed ones, but no log line matches more than one of these so a single
+# order serves both. Python tries the alternatives left to right so the
+# first kind to match the whole line wins, just like trying each regex in turn.
+line_regex = re.compile('^(?:{})$'.format('|'.join('(?P<{}>{})'.format(kind, pattern) for (kind, pattern) in [
+    ('damage', r'(?P<damage_target>.*) (?P<damage_kind>overflow dmg|damaged): (?P<damage_value>\d*)'
+               r'(?: \(Crit: (?P<damage_critical>.*)\))?'),
+    ('destroyed', r'(?P<destroyed_target>.*) destroyed(?: \(Crit: (?P<destroyed_critical>.*)\))?'),
+    ('detonated', r'(?P<detonated_target>.*) detonated'),
+    ('explosion', r'(?P<explosion_source>.*) explodes'),
+    ('attack', r'(?:(?P<attack_bot>[^:]*): )?(?P<attack_weapon>.*?) (?:follow-up )?(?P<attack_sneak>sneak attack )?'
+               r'\((?:[^=)]*=)?(?P<attack_accuracy>\d+)%\) (?:(?P<attack_hit>\d*)/(?P<attack_total>\d*) )?'
+               r'(?P<attack_result>\w*)'),
+    ('question', r'\?\?\?'),
+    ('ignored', '|'.join([
+        r'Base Hit%: .*',
+        r'.* system corrupted',
+        r'.* (?:hacks|fails to hack) .*',
+        r'.* repels hacking attempt',
+        r'.* melted|.* instant meltdown',
+        r'Suffered critical hit: Meltdown \(\+.*\)',
+        r'.* (?:blasted off|knocked off|severed)',
+        r'Damage insufficient to overcome .*',
+        r'Deflected by .*',
+        r'.* disabled \(Disruption\)',
+        r'Gunslinging -> .*',
+        r'Intercepted by .*',
+        r'.* (?:breached|damaged|disabled)',
+        r'.* penetrates .*|Penetrated by .*',
+        r'.* prevented disruption',
+        r'Redirected by .*',
+        r'.* prevented critical effect',
+        r'.* short circuited',
+        r'.* triggered(?: by .*)?',
+    ])),
+])))
+
+bot_destroyed_regex = re.compile(r'^(.*) destroyed$')
+bot_melted_regex = re.compile(r'^(.*) melted|(.*) instant meltdown$')
+
+ally_name_regex = re.compile(r'^(\w*) .*$')
+derelict_regex = re.compile(r'^\w{2}-\w{3}\((\w)\)$')
+protovariant_regex = re.compile(r'^P(\w)-\w{10}$')
+unknown_part_regex = re.compile(
+    r'(Unknown|Prototype|Alien) (Engine|Power Core|Reactor|Flight Unit|Hover Unit|Leg|Treads|Wheel|Armor|Device|'
+    r'Hackware|Storage|Processor|Ballistic Cannon|Ballistic Gun|Energy Cannon|Energy Gun|Impact Weapon|Launcher|'
+    r'Piercing Weapon|Slashing Weapon|Special Ranged Weapon|Special Weapon)')
+
+# For any multi-tier derelict there is no way to know which specific kind is
+# being referenced, same table as combatLogParser.ts
+derelict_classes = {
+    'u': 'Artisan',
+    'T': 'Borebot',
+    'Y': 'Bouncer',
+    'l': 'Butcher (5)',
+    'O': 'Cobbler',
+    'k': 'Decomposer',
+    'q': 'Demented',
+    'D': 'Dragon',
+    'E': 'Elite (4)',
+    'i': 'Fireman (5)',
+    'F': 'Furnace',
+    'h': 'Guerrilla (5)',
+    'H': 'Hydra',
+    'x': 'Infiltrator (6)',
+    'K': 'Knight',
+    'B': 'Marauder (6)',
+    'd': 'Martyr (5)',
+    'M': 'Mutant (5)',
+    'r': 'Packrat',
+    't': 'Parasite',
+    'S': 'Samaritan',
+    'b': 'Savage (5)',
+    'j': 'Scrapper (3)',
+    'R': 'Subdweller',
+    'm': 'Surgeon (4)',
+    'f': 'Thief',
+    'g': 'Thug (5)',
+    'c': 'Scientist',
+    'L': 'Troll',
+    's': 'Wasp (5)',
+    'p': 'Wizard (5)',
+    'A': 'Z-Courier',
+    'Z': 'Z-Heavy (5)',
+    'o': 'Z-Technician',
+    'z': 'Zionite',
+}
+
+special_bot_regexes = [
+    ('Assembled (4)', re.compile(r'^as-\d+$')),
+    ('Assembler', re.compile(r'^AS-\d+$')),
+    ('Enhanced Q-Series', re.compile(r'^EQ-\d{3}$')),
+    ('Golem', re.compile(r'^AG-\d+$')),
+    ('Lugger', re.compile(r'^Lugger \d{3}$')),
+    ('Q-Series', re.compile(r'^Q\d{3}-\w$')),
+    ('Scrapoid (3)', re.compile(r'^\w{5}-D')),
+    ('Scraphulk (6)', re.compile(r'^\w{5}-K')),
+    ('V-Series', re.compile(r'^V\d{3}-\w$')),
+    ('Warlord (Command)', re.compile(r'^ZY-L1N$')),
+    ('Z-Experimental (8)', re.compile(r'^Z-Ex$')),
+    ('Z-Imprinter', re.compile(r'^Z-Im$')),
+]
+
+ignorable_targets = set(['Door', 'Earth', 'Reinforced Barrier', 'Wall'])
+
+
+# Bot and item lookups, loaded once per process
+class NameIndex:
+    def __init__(self):
+        with open(path.join(json_dir, 'bots.json'), encoding='utf-8') as f:
+            bots = json.load(f)
+        with open(path.join(json_dir, 'items.json'), encoding='utf-8') as f:
+            items = json.load(f)
+
+        self.bots_by_name = {bot['Name']: bot for bot in bots}
+        self.bots_by_short_name = {bot['Short Name']: bot for bot in bots if 'Short Name' in bot}
+        self.bots_by_ally_name = {bot['Ally Name']: bot for bot in bots if 'Ally Name' in bot}
+        self.items_by_name = {item['Name']: item for item in items}
+
+        # Names repeat constantly throughout logs so cache every lookup
+        self.get_bot = lru_cache(maxsize=None)(self.get_bot)
+        self.split_bot_and_part = lru_cache(maxsize=None)(self.split_bot_and_part)
+
+    def is_known_item(self, name):
+        return name in self.items_by_name
+
+    # Gets a bot from any of the names it can appear under in a log
+    def get_bot(self, bot_name):
+        bot = self.bots_by_short_name.get(bot_name) or self.bots_by_name.get(bot_name)
+        if bot is not None:
+            return bot
+
+        match = ally_name_regex.match(bot_name)
+        if match is not None and match[1] in self.bots_by_ally_name:
+            return self.bots_by_ally_name[match[1]]
+
+        match = derelict_regex.match(bot_name)
+        if match is not None:
+            return self.bots_by_name.get(derelict_classes.get(match[1]))
+
+        match = protovariant_regex.match(bot_name)
+        if match is not None:
+            return self.bots_by_name.get('Protovariant ' + match[1])
+
+        for (name, regex) in special_bot_regexes:
+            if regex.match(bot_name) is not None:
+                return self.bots_by_name.get(name)
+
+        return None
+
+    # Tries to work out an unknown part from the bot's loadout, only works if
+    # one part of the right type and rating category is possible
+    def get_unknown_part(self, part_name, bot):
+        match = unknown_part_regex.search(part_name)
+        if match is None:
+            return None
+
+        matching_parts = set()
+        for component in bot.get('Components', []) + bot.get('Armament', []):
+            if not isinstance(component, str) or component not in self.items_by_name:
+                continue
+
+            part = self.items_by_name[component]
+            if match[1] == 'Alien':
+                rating_match = part['Rating Category'] == 'Alien'
+            elif match[1] == 'Prototype':
+                rating_match = part['Rating Category'] != 'None'
+            else:
+                rating_match = part['Rating Category'] == 'None'
+
+            if part['Type'] == match[2] and rating_match:
+                matching_parts.add(part['Name'])
+
+        if len(matching_parts) == 1:
+            return matching_parts.pop()
+
+        return None
+
+    # Splits a target into its bot and part. There's no explicit separator so
+    # first try to find a known bot name at the start, then a known part at
+    # the end.
+    def split_bot_and_part(self, target):
+        split = target.split(' ')
+
+        for i in range(1, len(split) + 1):
+            bot = self.get_bot(' '.join(split[:i]))
+            if bot is None:
+                continue
+
+            part_name = ' '.join(split[i:])
+            if part_name == 'core' or part_name == '':
+                part_name = 'Core'
+
+            part_name = part_name.removesuffix('+')
+            return bot['Name'], self.get_unknown_part(part_name, bot) or part_name
+
+        for i in range(1, len(split)):
+            part_name = ' '.join(split[i:]).removesuffix('+')
+            if self.is_known_item(part_name) or part_name == 'core' or part_name == 'Core':
+                return ' '.join(split[:i]), 'Core' if part_name == 'core' else part_name
+
+        return 'Unknown', 'Unknown'
+
+
+# Joins lines that wrapped onto the next one back together
+def join_wrapped_lines(raw_lines):
+    pending = None
+
+    for raw_line in raw_lines:
+        if pending is not None and raw_line.startswith(' '):
+            yield pending + ' ' + raw_line.strip()
+            pending = None
+        else:
+            if pending is not None:
+                yield pending
+            pending = raw_line.strip()
+
+    if pending is not None:
+        yield pending
+
+
+# Yields the turn, indent and text of every log line, repeating lines with an
+# <xN> count. Lines are held back by one so unrecognized text can be added
+# onto the line before it.
+def read_log_lines(raw_lines):
+    last = None
+
+    for line in join_wrapped_lines(raw_lines):
+        match = line_start_regex.match(line)
+
+        if match is None:
+            if last is not None and len(line) > 0:
+                last[2] += ' ' + line
+            continue
+
+        if last is not None:
+            for _ in range(last[3]):
+                yield last[0], last[1], last[2]
+
+        count = 1 if match[4] is None else int(match[4]) if match[4].isdigit() else 1
+        last = [int(match[1] or 0), len(match[2]), match[3], count]
+
+    if last is not None:
+        for _ in range(last[3]):
+            yield last[0], last[1], last[2]
+
+
+def create_damage_entry(entity, part, critical=None, damage=None, overflow=False, destroyed=False):
+    return {
+        'Entity': entity,
+        'Part': part,
+        'Critical': critical,
+        'Damage': damage,
+        'Overflow': overflow,
+        'Destroyed': destroyed,
+    }
+
+
+def create_log_entry(turn):
+    return {
+        'Turn': turn,
+        'Source': 'Unknown',
+        'Weapon': 'Unknown',
+        'Accuracy': None,
+        'Sneak Attack': False,
+        'Projectiles Hit': 0,
+        'Projectiles Total': 0,
+        'Damage': [],
+    }
+
+
+def ignore_target(target):
+    return target.endswith('Trap') or target in ignorable_targets
+
+
+# Parses a stream of log lines into log entries, following the same rules as
+# ParserState in combatLogParser.ts
+class LogParser:
+    def __init__(self, names: NameIndex, lines):
+        self.names = names
+        self.lines = iter(lines)
+        self.lookahead = deque()
+
+    def peek_line(self):
+        if len(self.lookahead) == 0:
+            line = next(self.lines, None)
+            if line is None:
+                return None
+
+            (turn, indent, text) = line
+            self.lookahead.append((turn, indent, text, line_regex.match(text)))
+
+        return self.lookahead[0]
+
+    def next_line(self):
+        line = self.peek_line()
+        if line is not None:
+            self.lookahead.popleft()
+
+        return line
+
+    def parse_entries(self):
+        while (line := self.next_line()) is not None:
+            (turn, _, _, match) = line
+            entry = create_log_entry(turn)
+            kind = match.lastgroup if match is not None else None
+
+            if kind in ('attack', 'question', 'explosion'):
+                self.parse_source(entry, line)
+                yield entry
+            elif kind in ('damage', 'destroyed'):
+                # Damage from an unknown source
+                self.parse_damage(entry, line)
+                entry['Projectiles Hit'] = 1
+                entry['Projectiles Total'] = 1
+                yield entry
+
+    # Parses an attack or explosion and everything nested under it
+    def parse_source(self, entry, line):
+        (_, indent, _, match) = line
+        kind = match.lastgroup
+
+        if kind == 'explosion':
+            entry['Source'] = match['explosion_source']
+            entry['Weapon'] = 'Explosion'
+        elif kind == 'question':
+            entry['Projectiles Hit'] = 1
+            entry['Projectiles Total'] = 1
+        else:
+            bot = None
+            if match['attack_bot'] is not None:
+                bot = self.names.get_bot(match['attack_bot'])
+                entry['Source'] = 'Unknown' if bot is None else bot['Name']
+            else:
+                entry['Source'] = 'Cogmind'
+
+            entry['Weapon'] = match['attack_weapon'].removesuffix('+')
+            if bot is not None:
+                entry['Weapon'] = self.names.get_unknown_part(entry['Weapon'], bot) or entry['Weapon']
+
+            entry['Sneak Attack'] = match['attack_sneak'] is not None
+            entry['Accuracy'] = int(match['attack_accuracy'])
+
+            if match['attack_hit'] is not None and match['attack_total'] is not None:
+                entry['Projectiles Hit'] = int(match['attack_hit'] or 0)
+                entry['Projectiles Total'] = int(match['attack_total'] or 0)
+            else:
+                entry['Projectiles Hit'] = 1 if match['attack_result'] == 'Hit' else 0
+                entry['Projectiles Total'] = 1
+
+        while (next_line := self.peek_line()) is not None and next_line[1] > indent:
+            nested_line = self.next_line()
+            nested_match = nested_line[3]
+            nested_kind = nested_match.lastgroup if nested_match is not None else None
+
+            if nested_kind in ('damage', 'destroyed'):
+                self.parse_damage(entry, nested_line)
+            elif nested_kind == 'detonated':
+                (bot_name, part_name) = self.names.split_bot_and_part(nested_match['detonated_target'])
+                entry['Damage'].append(create_damage_entry(bot_name, part_name, destroyed=True))
+            elif nested_kind in ('explosion', 'attack', 'question'):
+                # Nested sources add their damage onto the outer entry
+                self.parse_source(entry, nested_line)
+
+    def get_target(self, target, allow_studied):
+        names = self.names
+
+        if names.is_known_item(target) or target.lower() == 'core':
+            return 'Cogmind', 'Core' if target.lower() == 'core' else target
+        elif allow_studied and target.endswith('+') and names.is_known_item(target[:-1]):
+            return 'Cogmind', target[:-1]
+
+        return names.split_bot_and_part(target)
+
+    # Parses a damaged or destroyed target line
+    def parse_damage(self, entry, line):
+        (_, indent, _, match) = line
+
+        if match.lastgroup == 'destroyed':
+            target = match['destroyed_target']
+            if not ignore_target(target):
+                (bot_name, part_name) = self.get_target(target, False)
+                entry['Damage'].append(create_damage_entry(bot_name, part_name, match['destroyed_critical'],
+                                                           destroyed=True))
+            return
+
+        target = match['damage_target']
+        if ignore_target(target):
+            return
+
+        (bot_name, part_name) = self.get_target(target, True)
+        damage_entry = create_damage_entry(bot_name, part_name, match['damage_critical'],
+                                           int(match['damage_value'] or 0), match['damage_kind'] == 'overflow dmg')
+        entry['Damage'].append(damage_entry)
+
+        # Check if the bot was destroyed as a result of this damage
+        next_line = self.peek_line()
+        if next_line is None or next_line[1] < indent:
+            return
+
+        destroyed = bot_destroyed_regex.match(next_line[2]) is not None
+        melted = bot_melted_regex.match(next_line[2]) is not None
+
+        if part_name == 'Core' and (destroyed or melted):
+            self.next_line()
+            damage_entry['Destroyed'] = True
+        elif melted:
+            # Meltdown from a hit elsewhere, count it as the core being
+            # destroyed
+            self.next_line()
+            entry['Damage'].append(create_damage_entry(bot_name, 'Core', destroyed=True))
+        elif destroyed:
+            # Unrelated damage following this one destroyed the bot
+            self.parse_damage(entry, self.next_line())
+
+
+# Damage and kill counters, every counter can be summed across logs
+class LogStats:
+    def __init__(self):
+        self.logs = 0
+        self.counters = defaultdict(Counter)
+
+    def add_entry(self, entry, names: NameIndex):
+        counters = self.counters
+        source = entry['Source']
+
+        if source == 'Cogmind':
+            counters['Shots'][entry['Weapon']] += entry['Projectiles Total']
+            counters['Hits'][entry['Weapon']] += entry['Projectiles Hit']
+
+        for damage_entry in entry['Damage']:
+            damage = damage_entry['Damage'] or 0
+            entity = damage_entry['Entity']
+
+            if entity == 'Cogmind':
+                counters['Damage Taken By Source'][source] += damage
+                counters['Damage Taken By Weapon'][entry['Weapon']] += damage
+                counters['Damage Taken By Part'][damage_entry['Part']] += damage
+            elif source == 'Cogmind':
+                bot = names.bots_by_name.get(entity)
+                counters['Damage Dealt By Bot'][entity] += damage
+                counters['Damage Dealt By Class'][bot['Class'] if bot is not None else 'Unknown'] += damage
+                counters['Damage Dealt By Weapon'][entry['Weapon']] += damage
+                counters['Damage Dealt By Part'][damage_entry['Part']] += damage
+                counters['Damage Dealt By Critical'][damage_entry['Critical'] or 'None'] += damage
+
+            if damage_entry['Destroyed'] and damage_entry['Part'] == 'Core' and entity != 'Cogmind':
+                counters['Kills'][entity] += 1
+                if source == 'Cogmind':
+                    counters['Kills By Weapon'][entry['Weapon']] += 1
+            elif damage_entry['Destroyed'] and entity == 'Cogmind':
+                counters['Parts Lost'][damage_entry['Part']] += 1
+
+    def merge(self, other):
+        self.logs += other.logs
+        for (name, counter) in other.counters.items():
+            self.counters[name].update(counter)
+
+    def to_json(self):
+        stats = {'Logs': self.logs}
+        for (name, counter) in sorted(self.counters.items()):
+            stats[name] = dict(counter.most_common())
+
+        return stats
+
+
+names = None
+
+
+def get_names():
+    global names
+    if names is None:
+        names = NameIndex()
+
+    return names
+
+
+def analyze_log(log_path):
+    names = get_names()
+    stats = LogStats()
+    stats.logs = 1
+
+    with open(log_path, encoding='utf-8', errors='replace') as f:
+        for entry in LogParser(names, read_log_lines(f)).parse_entries():
+            stats.add_entry(entry, names)
+
+    return stats
+
+
+# Gets every log file from the given files and directories
+def get_log_paths(input_paths):
+    for input_path in input_paths:
+        if path.isdir(input_path):
+            for (dir_path, _, file_names) in os.walk(input_path):
+                for file_name in sorted(file_names):
+                    if file_name.endswith('.txt') or file_name.endswith('.log'):
+                        yield path.join(dir_path, file_name)
+        else:
+            yield input_path
+
+
+def main(input_paths, processes, output_path):
+    log_paths = list(get_log_paths(input_paths))
+    stats = LogStats()
+
+    if processes <= 1:
+        for log_path in log_paths:
+            stats.merge(analyze_log(log_path))
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            for log_stats in executor.map(analyze_log, log_paths, chunksize=max(1, len(log_paths) // (processes * 4))):
+                stats.merge(log_stats)
+
+    profiler.count('logs', stats.logs)
+    output = stats.to_json()
+
+    if output_path is None:
+        print(json.dumps(output, indent=4))
+    else:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=4)
+
+        kills = sum(stats.counters['Kills'].values())
+        print('Analyzed {} logs with {} kills'.format(stats.logs, kills))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='Combat log analyzer')
+    parser.add_argument('logs', nargs='+', help='Combat log files or directories of .txt/.log files')
+    parser.add_argument('--processes', type=int, default=os.cpu_count(),
+                        help='Number of worker processes, 1 analyzes every log in this process')
+    parser.add_argument('--output', help='Write the statistics to this path instead of printing them')
+    add_profile_args(parser)
+    args = parser.parse_args()
+    profiler.start('combat_log_analyzer', args.profile)
+
+    main(args.logs, args.processes, args.output)
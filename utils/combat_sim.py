@@ -0,0 +1,496 @@
+#!/usr/bin/env py
+# Headless batch combat simulator built from items.json and bots.json
+#
+# Follows the ranged combat model of simulateCombat in simulatorCalcs.ts but
+# runs many fights of one loadout against one bot at once. Each fight's part
+# integrity, core integrity and TUs are rows of NumPy arrays and every
+# accuracy, damage, critical and coverage roll is made for all fights still
+# running in a single call.
+#
+# Only the parts of the model that apply to a plain ranged fight against a
+# standing bot are covered: accuracy, recoil, resistances, explosion chunks,
+# coverage/core exposure hit rolls, overflow damage, core and part
+# regeneration (including destroyed parts coming back every 10 turns) and the
+# Destroy, Smash, Meltdown, Intensify, Impale, Sever and Sunder criticals.
+# Heat, corruption, disruption, shielding and other special bot parts, melee
+# and the remaining criticals aren't simulated.
+import argparse
+from collections import namedtuple
+import json
+import math
+from os import path
+import re
+
+import numpy as np
+
+json_dir = path.join(path.dirname(path.realpath(__file__)), '..', 'src', 'json')
+items_path = path.join(json_dir, 'items.json')
+bots_path = path.join(json_dir, 'bots.json')
+
+# Same constants as simulatorCalcs.ts
+max_volleys = 100000
+min_accuracy = 10
+max_ranged_accuracy = 95
+initial_ranged_accuracy = 60
+size_accuracy = {
+    'Huge': 30,
+    'Large': 10,
+    'Medium': 0,
+    'Small': -10,
+    'Tiny': -30,
+}
+volley_times = {
+    1: 200,
+    2: 300,
+    3: 325,
+    4: 350,
+    5: 375,
+    6: 400,
+}
+
+# Accuracy bonus for the first, second and all later actions when the
+# attacker hasn't moved for 2 actions, the simulator's default
+action_accuracy = [10, 10, 10]
+
+core_regen_regex = re.compile(r'Core Regeneration \((\d*)\)')
+part_regen_regex = re.compile(r'Part Regeneration \((\d*)\)')
+
+Weapon = namedtuple('Weapon', [
+    'name', 'base_accuracy', 'recoil', 'delay', 'projectiles', 'damage_min', 'damage_max', 'damage_type',
+    'explosion_min', 'explosion_max', 'explosion_type', 'chunks_min', 'chunks_max', 'critical', 'critical_type',
+    'guided', 'overflow',
+])
+
+Target = namedtuple('Target', [
+    'name', 'parts', 'integrity', 'coverage', 'sizes', 'protection', 'core_integrity', 'core_weight',
+    'resistances', 'immunities', 'size', 'evasion', 'core_regen', 'part_regen',
+])
+
+
+def load_json(file_path):
+    with open(file_path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_items():
+    return {item['Name']: item for item in load_json(items_path)}
+
+
+def load_bots():
+    return {bot['Name']: bot for bot in load_json(bots_path)}
+
+
+def parse_int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def get_weapon(item):
+    return Weapon(
+        name=item['Name'],
+        base_accuracy=item.get('Targeting', 0),
+        recoil=item.get('Recoil', 0),
+        delay=item.get('Delay', 0),
+        projectiles=item.get('Projectile Count', 1),
+        damage_min=item.get('Damage Min', 0),
+        damage_max=item.get('Damage Max', 0),
+        damage_type=item.get('Damage Type'),
+        explosion_min=item.get('Explosion Damage Min', 0),
+        explosion_max=item.get('Explosion Damage Max', 0),
+        explosion_type=item.get('Explosion Type'),
+        chunks_min=item.get('Chunks Min', 1),
+        chunks_max=item.get('Chunks Max', 1),
+        critical=item.get('Critical Chance', 0),
+        critical_type=item.get('Critical Type'),
+        guided='Waypoints' in item,
+        overflow='Gun' not in item['Type'],
+    )
+
+
+# Gets the parts a bot is simulated with, like SimulatorPage.tsx this uses
+# the first choice of every option group and groups repeated parts together
+def get_bot_parts(bot):
+    parts = {}
+    for part_list in ['Components', 'Armament']:
+        for part in bot.get(part_list, []):
+            if isinstance(part, str):
+                parts[part] = parts.get(part, 0) + 1
+
+    option_parts = []
+    for part_list in ['Components', 'Armament']:
+        for part in bot.get(part_list, []):
+            if not isinstance(part, str) and part[0]['name'] != 'None':
+                option_parts.append((part[0]['name'], part[0].get('number', 1)))
+
+    return [name for (name, number) in list(parts.items()) + option_parts for _ in range(number)]
+
+
+# Gets the item coverage of a bot the way BotData.ts does, option groups
+# count as their largest option
+def get_item_coverage(bot, items):
+    coverage = 0
+    for part in bot.get('Armament', []) + bot.get('Components', []):
+        if isinstance(part, str):
+            coverage += items[part].get('Coverage', 0)
+        else:
+            coverage += max([items[option['name']].get('Coverage', 0) * option.get('number', 1)
+                             for option in part if option['name'] != 'None'], default=0)
+
+    return coverage
+
+
+def get_trait_value(bot, regex):
+    for trait in bot.get('Traits', []):
+        match = regex.search(trait)
+        if match is not None:
+            return int(match[1])
+
+    return 0
+
+
+def get_target(bot, items):
+    parts = get_bot_parts(bot)
+    item_coverage = get_item_coverage(bot, items)
+
+    core_exposure = parse_int(bot.get('Core Exposure %'))
+    if core_exposure < 100:
+        core_coverage = (100.0 / (100.0 - core_exposure)) * item_coverage - item_coverage
+    else:
+        core_coverage = 1
+    estimated_core_coverage = math.ceil(core_coverage / 10) * 10
+    coverage = np.array([items[part].get('Coverage', 0) for part in parts], dtype=np.int64)
+
+    # Flying and hovering bots are harder to hit unless overweight
+    propulsion_type = None
+    support = 0
+    mass = 0
+    for part in bot.get('Components', []):
+        item = items[part if isinstance(part, str) else part[0]['name']]
+        mass += item.get('Mass', 0)
+        if item['Slot'] == 'Propulsion':
+            propulsion_type = propulsion_type or item['Type']
+            if item['Type'] == propulsion_type:
+                support += item.get('Support', 0)
+
+    evasion = 0
+    if support > 0 and mass <= support:
+        evasion = {'Hover Unit': 5, 'Flight Unit': 10}.get(propulsion_type, 0)
+
+    return Target(
+        name=bot['Name'],
+        parts=parts,
+        integrity=np.array([items[part].get('Integrity', 0) for part in parts], dtype=np.int64),
+        coverage=coverage,
+        sizes=np.array([items[part].get('Size', 1) for part in parts], dtype=np.int64),
+        protection=np.array([items[part]['Type'] == 'Protection' for part in parts], dtype=bool),
+        core_integrity=parse_int(bot['Core Integrity']),
+        # The bot's total coverage counts the largest choice of each option
+        # group while the simulated bot has the first, any difference stays
+        # with the core
+        core_weight=estimated_core_coverage + item_coverage - int(coverage.sum()),
+        resistances={damage_type: parse_int(value) for (damage_type, value) in bot.get('Resistances', {}).items()},
+        immunities=set(bot.get('Immunities', [])),
+        size=bot['Size Class'],
+        evasion=evasion,
+        core_regen=get_trait_value(bot, core_regen_regex),
+        part_regen=get_trait_value(bot, part_regen_regex),
+    )
+
+
+def get_volley_time(weapons):
+    volley_time = volley_times.get(len(weapons), 400) + sum(weapon.delay for weapon in weapons)
+    return max(25, volley_time)
+
+
+# Gets the accuracy of each weapon for the first, second and all later
+# actions of a fight
+def get_accuracies(weapons, target, distance):
+    total_recoil = sum(weapon.recoil for weapon in weapons)
+    base_accuracy = initial_ranged_accuracy + size_accuracy[target.size] - target.evasion
+    if distance < 6:
+        base_accuracy += (6 - max(distance, 1)) * 3
+
+    accuracies = []
+    for weapon in weapons:
+        if weapon.guided:
+            accuracies.append([100] * len(action_accuracy))
+            continue
+
+        accuracy = base_accuracy + weapon.base_accuracy - (total_recoil - weapon.recoil)
+        accuracies.append([min(max_ranged_accuracy, max(min_accuracy, accuracy + bonus))
+                           for bonus in action_accuracy])
+
+    return accuracies
+
+
+class CombatSimulation:
+    def __init__(self, target: Target, weapons: list[Weapon], num_fights, rng, distance=6):
+        self.target = target
+        self.weapons = weapons
+        self.rng = rng
+        self.accuracies = get_accuracies(weapons, target, distance)
+        self.volley_time = get_volley_time(weapons)
+
+        self.integrity = np.tile(target.integrity, (num_fights, 1))
+        self.core = np.full(num_fights, target.core_integrity, dtype=np.int64)
+        self.tus = np.zeros(num_fights, dtype=np.int64)
+
+    def resist(self, damage, damage_type):
+        if damage_type in self.target.resistances:
+            return np.trunc(damage * (1 - self.target.resistances[damage_type] / 100)).astype(np.int64)
+
+        return damage
+
+    # Rolls the part hit in each fight, -1 for a core hit
+    def roll_hit_parts(self, fights, damage_type, is_overflow, core_bonus):
+        target = self.target
+        alive = self.integrity[fights] > 0
+        part_index = np.full(len(fights), -1)
+        rolling = np.ones(len(fights), dtype=bool)
+
+        if damage_type == 'Impact':
+            # Impact damage targets the core and parts relative to their slots
+            weights = alive * target.sizes
+            return self.pick_parts(weights, weights.sum(axis=1) + 1)
+
+        if is_overflow:
+            # Overflow goes to a random armor piece based on coverage if
+            # there's any left, otherwise it uses regular coverage
+            weights = alive * (target.coverage * target.protection)
+            has_protection = weights.sum(axis=1) > 0
+            part_index[has_protection] = self.pick_parts(weights[has_protection],
+                                                         weights[has_protection].sum(axis=1) + 1)
+            rolling = part_index == -1
+
+        weights = alive[rolling] * target.coverage
+        total_coverage = weights.sum(axis=1) + target.core_weight
+
+        if damage_type == 'Piercing':
+            core_bonus += 8
+
+        if core_bonus > 0:
+            # Boost the core's share of the coverage, capped at 99.9%. The
+            # share is the core's rounded weight, the same value that's in
+            # the total.
+            core_percentage = np.minimum(target.core_weight / np.maximum(total_coverage, 1) + core_bonus / 100, 0.999)
+            total_coverage = total_coverage - target.core_weight + total_coverage * core_percentage
+
+        part_index[rolling] = self.pick_parts(weights, total_coverage)
+        return part_index
+
+    # Picks a part in each row by subtracting weights from a random roll
+    # below the total, falling through to the core (-1) if none are hit
+    def pick_parts(self, weights, totals):
+        if weights.shape[1] == 0:
+            # Bots without parts can only be hit in the core
+            return np.full(len(weights), -1)
+
+        rolls = np.floor(self.rng.random(len(weights)) * totals)
+        hits = np.cumsum(weights, axis=1) > rolls[:, None]
+        return np.where(hits.any(axis=1), hits.argmax(axis=1), -1)
+
+    # Applies damage chunks to the given fights, following any overflow
+    def apply_damage(self, fights, damage, damage_type, critical, critical_type, can_overflow, core_bonus=0):
+        is_overflow = False
+
+        while len(fights) > 0:
+            part_index = self.roll_hit_parts(fights, damage_type, is_overflow, core_bonus)
+            (fights, damage) = self.apply_damage_to_parts(fights, part_index, damage, critical, critical_type,
+                                                          can_overflow)
+
+            # Overflow damage can't crit
+            is_overflow = True
+            can_overflow = True
+            core_bonus = 0
+            critical = np.zeros(len(fights), dtype=bool)
+
+    # Applies damage to the hit part or core of each fight, returning the
+    # fights and damage of any overflow
+    def apply_damage_to_parts(self, fights, part_index, damage, critical, critical_type, can_overflow):
+        target = self.target
+
+        if 'Criticals' in target.immunities:
+            critical = np.zeros(len(fights), dtype=bool)
+
+        if critical_type == 'Meltdown' and 'Meltdown' not in target.immunities:
+            self.core[fights[critical]] = 0
+            keep = ~critical
+            (fights, part_index, damage, critical) = (fights[keep], part_index[keep], damage[keep], critical[keep])
+        elif critical_type in ('Intensify', 'Impale'):
+            damage = np.where(critical, damage * 2, damage)
+            if critical_type == 'Impale':
+                self.tus[fights[critical]] += 100
+
+        destroy = critical & (critical_type in ('Destroy', 'Smash'))
+        remove = critical & (critical_type in ('Sever', 'Sunder')) & ('Dismemberment' not in target.immunities)
+
+        # Core hits
+        core_hit = part_index == -1
+        core_fights = fights[core_hit]
+        core_destroy = destroy[core_hit] & ('Coring' not in target.immunities)
+        self.core[core_fights] = np.where(core_destroy, 0, self.core[core_fights] - damage[core_hit])
+
+        # Part hits, protection can't be instantly destroyed but takes 20%
+        # more damage instead
+        part_hit = ~core_hit
+        fights = fights[part_hit]
+        part_index = part_index[part_hit]
+        damage = damage[part_hit]
+        destroy = destroy[part_hit]
+        remove = remove[part_hit]
+
+        protection = target.protection[part_index]
+        damage = np.where(destroy & protection, np.trunc(1.2 * damage).astype(np.int64), damage)
+        destroy &= ~protection
+
+        integrity = self.integrity[fights, part_index]
+        destroyed = (integrity <= damage) | destroy
+        overflow_damage = np.where(destroy & (critical_type == 'Smash'), damage, damage - integrity)
+
+        # Sever/sunder remove single slot parts that weren't destroyed
+        removed = remove & ~destroyed & (target.sizes[part_index] == 1)
+        self.integrity[fights, part_index] = np.where(destroyed | removed, 0, integrity - damage)
+
+        overflow = destroyed & ~protection & (overflow_damage > 0) & can_overflow
+        return fights[overflow], overflow_damage[overflow]
+
+    def fire_weapon(self, fights, weapon: Weapon, accuracy):
+        for _ in range(weapon.projectiles):
+            fights = fights[self.core[fights] > 0]
+            hits = fights[self.rng.integers(0, 100, len(fights)) < accuracy]
+
+            if weapon.damage_type is not None and len(hits) > 0:
+                damage = self.rng.integers(weapon.damage_min, weapon.damage_max + 1, len(hits))
+                damage = self.resist(damage, weapon.damage_type)
+                critical = (self.rng.integers(0, 100, len(hits)) < weapon.critical) & (weapon.critical > 0)
+
+                positive = damage > 0
+                self.apply_damage(hits[positive], damage[positive], weapon.damage_type, critical[positive],
+                                  weapon.critical_type, weapon.overflow)
+
+                hits = hits[self.core[hits] > 0]
+
+            if weapon.explosion_type is not None and len(hits) > 0:
+                # Explosions are split into a random number of chunks with
+                # the remainder discarded, each rolling its own hit part
+                damage = self.rng.integers(weapon.explosion_min, weapon.explosion_max + 1, len(hits))
+                damage = self.resist(damage, weapon.explosion_type)
+                num_chunks = self.rng.integers(weapon.chunks_min, weapon.chunks_max + 1, len(hits))
+                chunk_damage = damage // num_chunks
+
+                for chunk in range(weapon.chunks_max):
+                    chunk_hits = (chunk < num_chunks) & (chunk_damage > 0)
+                    self.apply_damage(hits[chunk_hits], chunk_damage[chunk_hits], weapon.explosion_type,
+                                      np.zeros(np.count_nonzero(chunk_hits), dtype=bool), None, True)
+
+    # Applies regeneration for every turn completed in the volley
+    def update_time(self, fights):
+        old_turns = self.tus[fights] // 100
+        self.tus[fights] += self.volley_time
+        new_turns = self.tus[fights] // 100
+        completed_turns = new_turns - old_turns
+
+        target = self.target
+        if target.core_regen > 0:
+            self.core[fights] = np.minimum(target.core_integrity,
+                                           self.core[fights] + target.core_regen * completed_turns)
+
+        if target.part_regen > 0:
+            integrity = self.integrity[fights]
+            regen = np.minimum(integrity + (target.part_regen * completed_turns)[:, None], target.integrity)
+            self.integrity[fights] = np.where(integrity > 0, regen, 0)
+
+            # Like simulatorCalcs.ts, one destroyed part is restored for every
+            # completed turn that's a multiple of 10, counting from the turn
+            # the volley started on
+            restores = (new_turns + 9) // 10 - (old_turns + 9) // 10
+            for restore in range(restores.max(initial=0)):
+                self.restore_destroyed_part(fights[restores > restore])
+
+    # Restores a random destroyed part to full integrity in each fight that
+    # has one
+    def restore_destroyed_part(self, fights):
+        destroyed = self.integrity[fights] == 0
+        fights = fights[destroyed.any(axis=1)]
+        destroyed = destroyed[destroyed.any(axis=1)]
+        if len(fights) == 0:
+            return
+
+        # The highest random value among the destroyed parts is a uniform pick
+        part_index = np.argmax(self.rng.random(destroyed.shape) * destroyed, axis=1)
+        self.integrity[fights, part_index] = self.target.integrity[part_index]
+
+    # Runs every fight until the bot is killed, returning the number of
+    # volleys and TUs each kill took. Fights that run out of volleys are
+    # returned as -1.
+    def run(self, volley_limit=max_volleys):
+        num_fights = len(self.core)
+        kill_volleys = np.full(num_fights, -1, dtype=np.int64)
+        fights = np.arange(num_fights)
+
+        for volley in range(1, volley_limit + 1):
+            for (i, weapon) in enumerate(self.weapons):
+                # Accuracy updates after the first weapon of the first two
+                # volleys
+                action = min(volley - 1 + (i > 0), len(action_accuracy) - 1)
+                self.fire_weapon(fights, weapon, self.accuracies[i][action])
+
+            if volley == volley_limit:
+                break
+
+            self.update_time(fights)
+
+            killed = self.core[fights] <= 0
+            kill_volleys[fights[killed]] = volley
+            fights = fights[~killed]
+
+            if len(fights) == 0:
+                break
+
+        kill_tus = np.where(kill_volleys > 0, self.tus, -1)
+        return kill_volleys, kill_tus
+
+
+def simulate_combat(target: Target, weapons: list[Weapon], num_fights, rng=None, distance=6,
+                    volley_limit=max_volleys):
+    if rng is None:
+        rng = np.random.default_rng()
+
+    return CombatSimulation(target, weapons, num_fights, rng, distance).run(volley_limit)
+
+
+def main(bot_names, weapon_names, num_fights, seed, distance, volley_limit):
+    items = load_items()
+    bots = load_bots()
+
+    weapons = [get_weapon(items[name]) for name in weapon_names]
+    rng = np.random.default_rng(seed)
+
+    for bot_name in bot_names:
+        target = get_target(bots[bot_name], items)
+        (volleys, tus) = simulate_combat(target, weapons, num_fights, rng, distance, volley_limit)
+
+        killed = volleys > 0
+        if not killed.any():
+            print('{}: no kills in {} volleys'.format(bot_name, volley_limit))
+            continue
+
+        (p50, p90, p99) = np.percentile(volleys[killed], [50, 90, 99])
+        print('{}: {:.2f} volleys ({:.0f} TUs) on average, median {:.0f}, 90% {:.0f}, 99% {:.0f}'.format(
+            bot_name, volleys[killed].mean(), tus[killed].mean(), p50, p90, p99))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='Combat simulator')
+    parser.add_argument('--bots', nargs='+', required=True, help='Bots to fight')
+    parser.add_argument('--weapons', nargs='+', required=True, help='Weapons fired every volley')
+    parser.add_argument('--fights', type=int, default=10000, help='Number of fights to simulate against each bot')
+    parser.add_argument('--seed', type=int, help='Random seed for repeatable results')
+    parser.add_argument('--distance', type=int, default=6, help='Distance to the bot in tiles')
+    parser.add_argument('--max-volleys', type=int, default=max_volleys,
+                        help='Number of volleys after which a fight is given up on')
+    args = parser.parse_args()
+
+    main(args.bots, args.weapons, args.fights, args.seed, args.distance, args.max_volleys)
@@ -0,0 +1,182 @@
+#!/usr/bin/env py
+# Shared reading and column projection for the *_csv_convert scripts
+
+import csv
+import gzip
+import json
+from operator import itemgetter
+import timeit
+
+from profiling import add_profile_args, profiler
+
+csv.register_dialect('cog', 'excel', escapechar='\\')
+
+
+# Escapes quotes line by line as the reader consumes them so an export
+# is never held in memory as a whole
+def fix_quotes(lines, fixes):
+    replacements = [(fix, fix.replace('"', '\\"')) for fix in fixes]
+
+    for line in lines:
+        for (fix, replacement) in replacements:
+            if fix in line:
+                line = line.replace(fix, replacement)
+
+        yield line
+
+
+# Yields the header and then every row of an exported CSV
+def read_csv(input_path, quote_fixes=()):
+    with open(input_path) as f:
+        lines = fix_quotes(f, quote_fixes) if len(quote_fixes) > 0 else f
+        yield from profiler.iter_stage('read', csv.reader(lines, csv.get_dialect('cog')))
+
+
+# Pulls a fixed list of named columns out of each row
+#
+# The column names are resolved against the header once, so turning a row
+# into a dictionary is a single itemgetter call plus a pass over the values.
+# Empty values are replaced by their default or left out entirely.
+class ColumnProjection:
+    def __init__(self, header, names, defaults={}):
+        # Some column lists repeat a name, only the first position matters
+        self.names = tuple(dict.fromkeys(names))
+        indices = tuple(header.index(name) for name in self.names)
+        self.width = max(indices) + 1
+        self.defaults = defaults
+
+        if len(indices) == 1:
+            index = indices[0]
+            self.getter = lambda row: (row[index],)
+        else:
+            self.getter = itemgetter(*indices)
+
+    def get_values(self, row):
+        try:
+            row_values = self.getter(row)
+        except IndexError:
+            # Short row, treat the missing trailing columns as empty
+            row_values = self.getter(row + [''] * (self.width - len(row)))
+
+        values = {}
+        defaults = self.defaults
+        for (name, val) in zip(self.names, row_values):
+            if val != '':
+                values[name] = val
+            elif name in defaults:
+                values[name] = defaults[name]
+
+        return values
+
+
+# Compiles a projection for each named list of columns
+def compile_projections(header, column_lists, defaults={}):
+    return {key: ColumnProjection(header, names, defaults) for (key, names) in column_lists.items()}
+
+
+# Writes text to a file unless the file already holds exactly that text,
+# leaving the modified time of unchanged outputs alone
+def write_if_changed(output_path, text):
+    try:
+        with open(output_path) as f:
+            if f.read() == text:
+                return False
+    except FileNotFoundError:
+        pass
+
+    with open(output_path, 'w') as f:
+        f.write(text)
+
+    return True
+
+
+# Packs a list of records into one shared key table plus a list of value
+# arrays, so keys repeated on every record are only stored once. Missing
+# values are null and trailing nulls are dropped.
+def to_columnar(records):
+    keys = list(dict.fromkeys(key for record in records for key in record))
+
+    rows = []
+    for record in records:
+        row = [record.get(key) for key in keys]
+        while len(row) > 0 and row[-1] is None:
+            row.pop()
+        rows.append(row)
+
+    return {'Keys': keys, 'Rows': rows}
+
+
+# Unpacks the output of to_columnar back into a list of records
+def from_columnar(columnar):
+    keys = columnar['Keys']
+    return [{key: val for (key, val) in zip(keys, row) if val is not None} for row in columnar['Rows']]
+
+
+# Available JSON output formats. Pretty is the checked in format, minified
+# drops all whitespace and columnar is minified with a shared key table.
+OUTPUT_FORMATS = {
+    'pretty': lambda values: json.dumps(values, indent=4),
+    'minified': lambda values: json.dumps(values, separators=(',', ':')),
+    'columnar': lambda values: json.dumps(to_columnar(values), separators=(',', ':')),
+}
+
+
+# Gets the path a converter writes an output to in the given format. The site
+# imports the JSON outputs directly as lists of records, so columnar output
+# goes to a separate file next to them instead of replacing them.
+def get_output_path(output_path, output_format='pretty'):
+    if output_format == 'columnar':
+        return output_path.removesuffix('.json') + '.columnar.json'
+
+    return output_path
+
+
+# Serializes converted values in the given output format and writes them if
+# they changed
+def write_json(values, output_path, output_format='pretty'):
+    with profiler.stage('serialize'):
+        text = OUTPUT_FORMATS[output_format](values)
+
+    with profiler.stage('write'):
+        return write_if_changed(output_path, text)
+
+
+# Reads the records of another converter's output, in any output format
+def read_json(input_path):
+    with profiler.stage('read'):
+        with open(input_path, encoding='utf-8') as f:
+            values = json.load(f)
+
+    if isinstance(values, dict) and 'Keys' in values and 'Rows' in values:
+        return from_columnar(values)
+
+    return values
+
+
+# Prints the serialized size, gzipped size and parse time of each output format
+def print_format_report(values):
+    print('{:<10} {:>12} {:>12} {:>12}'.format('Format', 'Size (KB)', 'Gzip (KB)', 'Parse (ms)'))
+
+    for (output_format, serialize) in OUTPUT_FORMATS.items():
+        text = serialize(values)
+
+        if output_format == 'columnar':
+            parse = lambda: from_columnar(json.loads(text))
+        else:
+            parse = lambda: json.loads(text)
+
+        parse_time = min(timeit.repeat(parse, number=1, repeat=5))
+        size = len(text.encode())
+        gzip_size = len(gzip.compress(text.encode()))
+
+        print('{:<10} {:>12.1f} {:>12.1f} {:>12.2f}'.format(
+            output_format, size / 1024, gzip_size / 1024, parse_time * 1000))
+
+
+# Adds the shared output arguments to a converter's argument parser
+def add_output_args(parser):
+    parser.add_argument('--format', choices=OUTPUT_FORMATS.keys(), default='pretty',
+                        help='JSON output format, columnar output is written to a separate .columnar.json file')
+    parser.add_argument('--report', action='store_true',
+                        help='Print the size and parse time of every output format')
+    add_profile_args(parser)
@@ -0,0 +1,207 @@
+#!/usr/bin/env py
+# Builds a matrix of the expected volleys and turns for every ranged weapon
+# in items.json to kill every bot in bots.json
+#
+# Cells are simulated with combat_sim.py and stored in a NumPy archive along
+# with a hash of every weapon row and bot column. Rebuilding only simulates
+# the cells whose weapon or bot (including the bot's parts) changed since the
+# last build, every cell is seeded from its weapon and bot names so reused
+# and recomputed cells match. The archive is checkpointed as weapon rows
+# finish, so an interrupted build picks up from the rows already simulated.
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+import os
+from os import path
+import time
+
+import numpy as np
+
+from combat_sim import get_bot_parts, get_target, get_weapon, load_bots, load_items, simulate_combat
+
+matrix_path = path.join(path.dirname(path.realpath(__file__)), '.kill_matrix.npz')
+json_output_path = path.join(path.dirname(path.realpath(__file__)), '..', 'src', 'json', 'kill_matrix.json')
+combat_sim_path = path.join(path.dirname(path.realpath(__file__)), 'combat_sim.py')
+
+# Weapon types that can't be fired in the ranged combat model
+melee_types = set(['Impact Weapon', 'Piercing Weapon', 'Slashing Weapon', 'Special Melee Weapon'])
+
+
+def hash_json(*values):
+    return hashlib.sha256(json.dumps(values, sort_keys=True).encode()).hexdigest()
+
+
+def get_weapon_items(items):
+    return [item for item in items.values() if item['Slot'] == 'Weapon' and item['Type'] not in melee_types
+            and ('Damage Type' in item or 'Explosion Type' in item)]
+
+
+# Hashes everything a bot's column depends on, the bot and all of its parts
+def get_bot_hash(bot, items):
+    part_names = sorted(set(get_bot_parts(bot)))
+    return hash_json(bot, [items[part_name] for part_name in part_names])
+
+
+# Hashes the settings and combat code every cell depends on
+def get_model_hash(fights, volley_limit, seed):
+    with open(combat_sim_path, 'rb') as f:
+        return hash_json(fights, volley_limit, seed, hashlib.sha256(f.read()).hexdigest())
+
+
+def get_cell_seed(seed, weapon_name, bot_name):
+    name_hash = hashlib.sha256('{}|{}'.format(weapon_name, bot_name).encode()).digest()
+    return np.random.SeedSequence(seed, spawn_key=(int.from_bytes(name_hash[:8], 'little'),))
+
+
+def load_matrix(model_hash):
+    try:
+        with np.load(matrix_path) as matrix:
+            if str(matrix['model_hash']) != model_hash:
+                return None
+
+            return {key: matrix[key] for key in matrix.files}
+    except FileNotFoundError:
+        return None
+
+
+# Saves the matrix along with which of its cells have been simulated. The
+# archive is written to a temporary file first so an interrupted save never
+# leaves a broken archive behind.
+def save_matrix(model_hash, weapon_names, weapon_hashes, bot_names, bot_hashes, volleys, turns, computed):
+    temp_path = matrix_path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        np.savez_compressed(f, model_hash=model_hash, weapon_names=weapon_names, weapon_hashes=weapon_hashes,
+                            bot_names=bot_names, bot_hashes=bot_hashes, volleys=volleys, turns=turns,
+                            computed=computed)
+
+    os.replace(temp_path, matrix_path)
+
+
+# Simulates one weapon row against the given bots, returning the mean
+# volleys and turns to kill or NaN if the bot never died
+def simulate_row(row):
+    (weapon, targets, fights, volley_limit, seed) = row
+    volleys = np.full(len(targets), np.nan, dtype=np.float32)
+    turns = np.full(len(targets), np.nan, dtype=np.float32)
+
+    for (i, target) in enumerate(targets):
+        rng = np.random.default_rng(get_cell_seed(seed, weapon.name, target.name))
+        (kill_volleys, kill_tus) = simulate_combat(target, [weapon], fights, rng, volley_limit=volley_limit)
+
+        killed = kill_volleys > 0
+        if killed.any():
+            volleys[i] = kill_volleys[killed].mean()
+            turns[i] = kill_tus[killed].mean() / 100
+
+    return volleys, turns
+
+
+def write_json(weapon_names, bot_names, volleys, turns):
+    def to_lists(matrix):
+        return [[None if np.isnan(value) else round(float(value), 2) for value in row] for row in matrix]
+
+    output = {
+        'Weapons': weapon_names,
+        'Bots': bot_names,
+        'Volleys': to_lists(volleys),
+        'Turns': to_lists(turns),
+    }
+
+    with open(json_output_path, 'w', encoding='utf-8') as f:
+        json.dump(output, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def main(processes, fights, volley_limit, seed, force, write_site_json, checkpoint_interval):
+    items = load_items()
+    bots = load_bots()
+
+    weapon_items = get_weapon_items(items)
+    weapon_names = [item['Name'] for item in weapon_items]
+    weapon_hashes = np.array([hash_json(item) for item in weapon_items])
+    bot_names = list(bots)
+    bot_hashes = np.array([get_bot_hash(bot, items) for bot in bots.values()])
+
+    model_hash = get_model_hash(fights, volley_limit, seed)
+    old_matrix = None if force else load_matrix(model_hash)
+
+    volleys = np.full((len(weapon_names), len(bot_names)), np.nan, dtype=np.float32)
+    turns = np.full((len(weapon_names), len(bot_names)), np.nan, dtype=np.float32)
+    computed = np.zeros((len(weapon_names), len(bot_names)), dtype=bool)
+
+    if old_matrix is not None:
+        # Copy over every cell whose weapon and bot are unchanged
+        old_rows = {weapon_hash: i for (i, weapon_hash) in enumerate(old_matrix['weapon_hashes'])}
+        old_columns = {bot_hash: i for (i, bot_hash) in enumerate(old_matrix['bot_hashes'])}
+
+        row_map = [(i, old_rows[weapon_hash]) for (i, weapon_hash) in enumerate(weapon_hashes)
+                   if weapon_hash in old_rows]
+        column_map = [(i, old_columns[bot_hash]) for (i, bot_hash) in enumerate(bot_hashes)
+                      if bot_hash in old_columns]
+
+        if len(row_map) > 0 and len(column_map) > 0:
+            (rows, old_row_indices) = zip(*row_map)
+            (columns, old_column_indices) = zip(*column_map)
+            cells = np.ix_(rows, columns)
+            old_cells = np.ix_(old_row_indices, old_column_indices)
+
+            volleys[cells] = old_matrix['volleys'][old_cells]
+            turns[cells] = old_matrix['turns'][old_cells]
+            # Checkpoints of an interrupted build only have some cells simulated
+            computed[cells] = old_matrix['computed'][old_cells] if 'computed' in old_matrix else True
+
+    targets = [get_target(bot, items) for bot in bots.values()]
+    work = []
+    for (i, item) in enumerate(weapon_items):
+        columns = np.flatnonzero(~computed[i])
+        if len(columns) > 0:
+            work.append((i, columns, (get_weapon(item), [targets[j] for j in columns], fights, volley_limit, seed)))
+
+    print('Simulating {} of {} cells'.format(sum(len(columns) for (_, columns, _) in work), computed.size))
+
+    def save():
+        save_matrix(model_hash, weapon_names, weapon_hashes, bot_names, bot_hashes, volleys, turns, computed)
+
+    # Fill in each row as it finishes, checkpointing every checkpoint_interval
+    # seconds
+    def add_results(results):
+        last_save = time.perf_counter()
+
+        for ((i, columns, _), (row_volleys, row_turns)) in zip(work, results):
+            volleys[i, columns] = row_volleys
+            turns[i, columns] = row_turns
+            computed[i, columns] = True
+
+            if time.perf_counter() - last_save >= checkpoint_interval:
+                save()
+                last_save = time.perf_counter()
+
+    rows = [row for (_, _, row) in work]
+    if processes <= 1:
+        add_results(simulate_row(row) for row in rows)
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            add_results(executor.map(simulate_row, rows))
+
+    save()
+
+    if write_site_json:
+        write_json(weapon_names, bot_names, volleys, turns)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='Kill matrix builder')
+    parser.add_argument('--processes', type=int, default=os.cpu_count(),
+                        help='Number of worker processes, 1 runs everything in this process')
+    parser.add_argument('--fights', type=int, default=500, help='Number of fights simulated for every cell')
+    parser.add_argument('--max-volleys', type=int, default=1000,
+                        help='Number of volleys after which a fight is given up on')
+    parser.add_argument('--seed', type=int, default=0, help='Root random seed of every cell')
+    parser.add_argument('--force', action='store_true', help='Simulate every cell even if it is unchanged')
+    parser.add_argument('--checkpoint-interval', type=float, default=30,
+                        help='Seconds between saves of the partially built matrix')
+    parser.add_argument('--json', action='store_true',
+                        help='Also write the matrix to src/json/kill_matrix.json for the site')
+    args = parser.parse_args()
+
+    main(args.processes, args.fights, args.max_volleys, args.seed, args.force, args.json, args.checkpoint_interval)
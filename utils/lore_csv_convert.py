@@ -1,11 +1,12 @@
 #!/usr/bin/env py
 
-import csv
-import json
-from io import StringIO
+import argparse
 from os import path
 import sys
 
+from csv_convert import ColumnProjection, add_output_args, get_output_path, print_format_report, read_csv, write_json
+from profiling import profiler
+
 input_path = path.join(path.dirname(path.realpath(__file__)), 'lore_export.csv')
 output_path = path.join(path.dirname(path.realpath(__file__)), '..', 'src', 'json', 'lore.json')
 
@@ -290,76 +291,70 @@ additional_content = {
 };
 
 
-def get_value(row, name):
-    val = row[index_lookup[name]]
+def process_csv(input_path, output_path, output_format='pretty'):
+    all_values = []
+    groups = {}
 
-    if val == '':
-        return None
-    else:
-        return val
+    rows = read_csv(input_path)
+    header = next(rows)
 
-index_lookup = {}
-all_values = []
+    # Resolve the columns against the header row once
+    projection = ColumnProjection(header, categories)
 
-with open(input_path) as f:
-    string = f.read()
+    for row in profiler.loop_stage('transform', rows):
+        values = projection.get_values(row)
 
-csv.register_dialect('cog', 'excel', escapechar='\\')
-reader = csv.reader(StringIO(string), csv.get_dialect('cog'))
+        category = values['Category']
+        type = values['Type']
+        del values['Category']
+        del values['Type']
 
-header = next(reader)
+        if type == 'Record':
+            type = 'Records'
 
-# Update the index lookup based on the header row
-for category_name in categories:
-    index_lookup[category_name] = header.index(category_name)
+        group_name = f'{category} {type}'
+        if group_name in groups:
+            group = groups[group_name]
+            group_content = additional_content[group_name]
+        else:
+            group = {'Name': group_name, 'Entries': []}
 
-rowNum = 0
-for row in reader:
-    values = {}
+            if group['Name'] in additional_content:
+                group_content = additional_content[group['Name']]
+                if 'Content' not in group_content:
+                    print('Need to add content for {}'.format(group['Name']))
+                    sys.exit(1)
+                else:
+                    group['Content'] = group_content['Content']
 
-    for category_name in categories:
-        # Get values from rows
-        val = get_value(row, category_name)
-        if val is not None:
-            values[category_name] = val
+                if 'Spoiler' in group_content:
+                    group['Spoiler'] = group_content['Spoiler']
+            else:
+                print('Need to add content for {}'.format(group['Name']))
+                sys.exit(1)
 
-    category = values['Category']
-    type = values['Type']
-    del values['Category']
-    del values['Type']
+            groups[group_name] = group
+            all_values.append(group)
 
-    if type == 'Record':
-        type = 'Records'
-    
-    group_name = f'{category} {type}'
-    try:
-        group = next((g for g in all_values if g['Name'] == group_name))
-        group_content = additional_content[group['Name']]
-    except:
-        group = {'Name': group_name, 'Entries': []}
+        # Add additional per-entry values
+        if 'Entries' in group_content and values['Name/Number'] in group_content['Entries']:
+            values['Spoiler'] = group_content['Entries'][values['Name/Number']]
 
-        if group['Name'] in additional_content:
-            group_content = additional_content[group['Name']]
-            if 'Content' not in group_content:
-                print('Need to add content for {}'.format(group['Name']))
-                sys.exit(1)
-            else:
-                group['Content'] = group_content['Content']
+        group['Entries'].append(values)
 
-            if 'Spoiler' in group_content:
-                group['Spoiler'] = group_content['Spoiler']
-        else:
-            print('Need to add content for {}'.format(group['Name']))
-            sys.exit(1)
+    profiler.count('rows', sum(len(group['Entries']) for group in all_values))
 
-        all_values.append(group)
+    write_json(all_values, get_output_path(output_path, output_format), output_format)
 
-    # Add additional per-entry values
-    if 'Entries' in group_content and values['Name/Number'] in group_content['Entries']:
-        values['Spoiler'] = group_content['Entries'][values['Name/Number']]
+    return all_values
 
-    group['Entries'].append(values)
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='Lore CSV converter')
+    add_output_args(parser)
+    args = parser.parse_args()
+    profiler.start('lore_csv_convert', args.profile)
 
+    values = process_csv(input_path, output_path, args.format)
 
-with open(output_path, 'w') as f:
-    json.dump(all_values, f, indent=4)
+    if args.report:
+        print_format_report(values)
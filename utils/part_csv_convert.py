@@ -1,15 +1,20 @@
 #!/usr/bin/env py
 
-import csv
-import json
-from io import StringIO
+import argparse
+import os
 from os import path
+import re
+
+from csv_convert import (add_output_args, compile_projections, get_output_path, print_format_report, read_csv,
+                         write_if_changed, write_json)
+from profiling import profiler
 
 input_path = path.join(path.dirname(path.realpath(__file__)), 'gallery_export.csv')
 # input_path_b15 = path.join(path.dirname(path.realpath(__file__)), 'gallery_export_b15.csv')
 output_path = path.join(path.dirname(path.realpath(__file__)), '..', 'src', 'json', 'items.json')
 # output_path_b15 = path.join(path.dirname(path.realpath(__file__)), '..', 'src', 'json', 'items_b15.json')
 all_parts_output_path = path.join(path.dirname(path.realpath(__file__)), 'all_parts.txt')
+sharded_output_path = path.join(path.dirname(path.realpath(__file__)), '..', 'src', 'json', 'items')
 # all_parts_output_path_b15 = path.join(path.dirname(path.realpath(__file__)), 'all_parts_b15.txt')
 
 categories = {
@@ -201,6 +206,63 @@ defaults = {
     "Mass": '0'
 }
 
+# Columns written as JSON numbers and booleans instead of the export's
+# strings so the site doesn't have to parse every part on load. Percent
+# columns drop their % sign.
+int_columns = set([
+    'Arc',
+    'Coverage',
+    'Damage Max',
+    'Damage Min',
+    'Delay',
+    'Disruption',
+    'Drag',
+    'Energy Generation',
+    'Energy Storage',
+    'Explosion Damage Max',
+    'Explosion Damage Min',
+    'Explosion Disruption',
+    'Explosion Radius',
+    'Explosion Salvage',
+    'Falloff',
+    'Heat Generation',
+    'Heat/Move',
+    'Integrity',
+    'Mass',
+    'Matter Upkeep',
+    'Mod/Extra',
+    'Penalty',
+    'Projectile Count',
+    'Range',
+    'Recoil',
+    'Salvage',
+    'Shot Energy',
+    'Shot Heat',
+    'Shot Matter',
+    'Size',
+    'Support',
+    'Targeting',
+    'Time/Move',
+])
+
+float_columns = set([
+    'Energy Upkeep',
+    'Energy/Move',
+])
+
+percent_columns = set([
+    'Overload Stability',
+    'Power Stability',
+])
+
+bool_columns = set([
+    'Hackable Schematic',
+    'No Repairs',
+    'Studyable',
+])
+
+critical_regex = re.compile(r'^(\d+)% (\w+)$')
+
 expansions = {
     'Adv.': 'Advanced',
     'Asb.': 'Assembled',
@@ -239,71 +301,114 @@ expansions = {
     'Zio.': 'Zionite',
 }
 
+# Quoted strings in the export that need their quotes escaped to parse properly
+quote_fixes = [
+    '"Lootmaker"',
+    '"Choppy"',
+    '"Deathgrip"',
+    '"Insurrection"',
+    '"Broken".', # This one not technically improperly escaped but the parser has issues with this string for some reason
+]
+
+
+def parse_number(value):
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+
+# Converts the string values of a part to their JSON types, and splits the
+# values that pack several numbers into one string into separate values
+def convert_types(values):
+    for (name, val) in values.items():
+        if name in int_columns:
+            values[name] = int(val)
+        elif name in float_columns:
+            values[name] = parse_number(val)
+        elif name in percent_columns:
+            values[name] = int(val.removesuffix('%'))
+        elif name in bool_columns:
+            values[name] = val == '1'
+
+    # Prototype and alien parts are shown with a * or ** after their rating
+    category = values.pop('Category', 'None')
+    values['Rating'] = int(values['Rating'])
+    values['Rating Category'] = category
+    values['Rating String'] = str(values['Rating']) + {'Prototype': '*', 'Alien': '**'}.get(category, '')
+
+    if 'Chunks' in values:
+        split = values.pop('Chunks').split('-')
+        values['Chunks Min'] = int(split[0])
+        values['Chunks Max'] = int(split[-1])
+
+    if 'Critical' in values:
+        match = critical_regex.match(values['Critical'])
+        if match is not None:
+            values['Critical Chance'] = int(match[1])
+            values['Critical Type'] = match[2]
+
+    if 'Penetration' in values:
+        values['Penetration Chances'] = [100 if chance.strip() == 'Unlimited' else int(chance)
+                                         for chance in values['Penetration'].split('/')]
+
+
+# Gets the shard file name for a part, one shard per slot and category
+def get_shard_name(values):
+    slot = 'other' if values['Slot'] == 'N/A' else values['Slot'].lower()
+
+    if values['Rating Category'] != 'None':
+        return '{}_{}.json'.format(slot, values['Rating Category'].lower())
+    else:
+        return '{}.json'.format(slot)
 
-def get_value(row, name):
-    val = ''
-    try:
-        val = row[index_lookup[name]]
-    except Exception as e:
-        print(e)
 
-    if val == '':
-        if name in defaults:
-            return defaults[name]
-        else:
-            return None
-    else:
-        return val
+# Writes parts split into shards by slot and category, along with a compact
+# manifest listing the shards of each slot and the shard number and index of
+# each part
+def write_shards(all_values, shard_path, output_format):
+    shards = {}
+    manifest = {'Shards': [], 'Slots': {}, 'Parts': {}}
 
+    for values in all_values:
+        shard_name = get_shard_name(values)
 
-def get_slot(row):
-    return get_value(row, 'Slot')
+        if shard_name not in shards:
+            shards[shard_name] = []
+            manifest['Slots'].setdefault(values['Slot'], []).append(len(manifest['Shards']))
+            manifest['Shards'].append(shard_name)
 
-index_lookup = {}
-all_values = []
+        shards[shard_name].append(values)
+        manifest['Parts'][values['Name']] = [manifest['Shards'].index(shard_name), values['Index']]
 
-def process_csv(input_path, output_path, all_parts_output_path):
-    index_lookup.clear()
-    all_values.clear()
+    os.makedirs(shard_path, exist_ok=True)
 
-    with open(input_path) as f:
-        # Escape a few quotes to properly parse
-        string = f.read() \
-            .replace('"Lootmaker"', '\\"Lootmaker\\"') \
-            .replace('"Choppy"', '\\"Choppy\\"') \
-            .replace('"Deathgrip"', '\\"Deathgrip\\"') \
-            .replace('"Insurrection"', '\\"Insurrection\\"') \
-            .replace('"Broken".', '\\"Broken\\".') #This one not technically improperly escaped but the parser has issues with this string for some reason
+    # Remove shards from previous runs that no longer have any parts
+    for file_name in os.listdir(shard_path):
+        if file_name.endswith('.json') and file_name != 'manifest.json' and file_name not in shards:
+            os.remove(path.join(shard_path, file_name))
 
-    csv.register_dialect('cog', 'excel', escapechar='\\')
-    reader = csv.reader(StringIO(string), csv.get_dialect('cog'))
+    for (shard_name, shard_values) in shards.items():
+        write_json(shard_values, path.join(shard_path, shard_name), output_format)
 
-    header = next(reader)
+    write_json(manifest, path.join(shard_path, 'manifest.json'), 'minified')
 
-    # Update the index lookup based on the header row
-    for category in categories.values():
-        for name in category:
-            index_lookup[name] = header.index(name)
 
-    rowNum = 0
-    for row in reader:
-        slot = get_slot(row)
+def process_csv(input_path, output_path, all_parts_output_path, output_format='pretty', shard_path=None):
+    all_values = []
 
-        if slot in slot_categories:
-            names = slot_categories[slot]
-            values = {}
+    rows = read_csv(input_path, quote_fixes)
+    header = next(rows)
 
-            for name in names:
-                val = get_value(row, name)
-                if val is not None:
-                    values[name] = val
+    # Resolve the columns of each slot against the header row once
+    slot_index = header.index('Slot')
+    slot_projections = compile_projections(header, slot_categories, defaults)
 
-            if 'Category' in values:
-                if values['Category'] == 'Prototype':
-                    values['Rating'] = values['Rating'] + '*'
+    rowNum = 0
+    for row in profiler.loop_stage('transform', rows):
+        slot = row[slot_index]
 
-                if values['Category'] == 'Alien':
-                    values['Rating'] = values['Rating'] + '**'
+        if slot in slot_projections:
+            values = slot_projections[slot].get_values(row)
+            convert_types(values)
 
             values['Index'] = rowNum
             rowNum += 1
@@ -318,11 +423,29 @@ def process_csv(input_path, output_path, all_parts_output_path):
 
             all_values.append(values)
 
-    with open(output_path, 'w') as f:
-        json.dump(all_values, f, indent=4)
+    profiler.count('rows', len(all_values))
+
+    write_json(all_values, get_output_path(output_path, output_format), output_format)
+    with profiler.stage('write'):
+        write_if_changed(all_parts_output_path, '\n'.join([x['Name'] for x in all_values]))
+
+    if shard_path is not None:
+        write_shards(all_values, shard_path, output_format)
+
+    return all_values
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='Part CSV converter')
+    add_output_args(parser)
+    parser.add_argument('--sharded', action='store_true',
+                        help='Also write parts split into per slot and category shards with a manifest')
+    args = parser.parse_args()
+    profiler.start('part_csv_convert', args.profile)
+
+    values = process_csv(input_path, output_path, all_parts_output_path, args.format,
+                         sharded_output_path if args.sharded else None)
+    # process_csv(input_path_b15, output_path_b15, all_parts_output_path_b15)
 
-    with open (all_parts_output_path, 'w') as f:
-        f.writelines('\n'.join([x['Name'] for x in all_values]))
+    if args.report:
+        print_format_report(values)
 
-process_csv(input_path, output_path, all_parts_output_path)
-# process_csv(input_path_b15, output_path_b15, all_parts_output_path_b15)
\ No newline at end of file
@@ -0,0 +1,229 @@
+#!/usr/bin/env py
+# Shared stage timing and memory instrumentation for the utils scripts
+#
+# Scripts wrap their read, parse, transform, serialize and write stages in
+# profiler.stage() (or iter_stage() and loop_stage() for streamed rows) and
+# count the rows or pages they handle. Profiling is off unless the script is
+# run with --profile or the COG_PROFILE environment variable is set, in which
+# case a report is printed (or written as JSON) when the script exits. Turned
+# off, stages and counts cost next to nothing.
+#
+# For each stage this records the wall time, the traced Python allocation
+# peak from tracemalloc and the process peak RSS by the end of the stage.
+# Peak RSS never goes down, so it shows which stage first pushed memory to
+# its high water mark. Peak RSS comes from the resource module, which only
+# exists on Unix, so it's left out on Windows and the traced peak is the
+# number to compare across platforms. Stages entered more than once (like a stage wrapped
+# around every row) are summed. Only work done in the profiled process is
+# recorded, worker processes are not.
+import atexit
+from contextlib import contextmanager, nullcontext
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Environment variable that turns on profiling without changing arguments.
+# Set it to 1 to print a table or to a path to write JSON to.
+profile_env_var = 'COG_PROFILE'
+
+
+class StageStats:
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0
+        self.traced_peak = 0
+        self.peak_rss_kb = None
+
+    def to_json(self):
+        return {
+            'Calls': self.calls,
+            'Seconds': round(self.seconds, 6),
+            'Traced Peak KB': self.traced_peak // 1024,
+            'Peak RSS KB': self.peak_rss_kb,
+        }
+
+
+# Gets the peak RSS of this process, or None where it isn't available
+def get_peak_rss_kb():
+    if resource is None:
+        return None
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss // 1024 if sys.platform == 'darwin' else peak_rss
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.name = None
+        self.output = None
+        self.start_time = 0
+        self.stages = {}
+        self.counts = {}
+        self.traced_peak = 0
+
+        # Stats, start time and traced peak of the stages currently running,
+        # innermost last
+        self.running_stages = []
+
+    # Turns profiling on if requested by the --profile argument or the
+    # environment, reporting once the script exits
+    def start(self, name, output=None):
+        output = output or os.environ.get(profile_env_var) or None
+        if output is None or self.enabled:
+            return
+
+        self.enabled = True
+        self.name = name
+        self.output = None if output in ('1', '-') else output
+        self.start_time = time.perf_counter()
+
+        tracemalloc.start()
+        atexit.register(self.report)
+
+    # Records the time and memory of a stage of work
+    def stage(self, name):
+        if not self.enabled:
+            return nullcontext()
+
+        return self.run_stage(name)
+
+    @contextmanager
+    def run_stage(self, name):
+        self.begin_stage(name)
+        try:
+            yield
+        finally:
+            self.end_stage()
+
+    # Starts a stage that runs until the matching end_stage(), for top level
+    # script code that isn't in a function or block
+    def begin_stage(self, name):
+        if not self.enabled:
+            return
+
+        # An outer stage's peak has to include everything allocated before
+        # this stage resets the tracemalloc peak
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        self.traced_peak = max(self.traced_peak, traced_peak)
+        if len(self.running_stages) > 0:
+            self.running_stages[-1][2] = max(self.running_stages[-1][2], traced_peak)
+
+        tracemalloc.reset_peak()
+        self.running_stages.append([self.stages.setdefault(name, StageStats()), time.perf_counter(), 0])
+
+    def end_stage(self):
+        if not self.enabled:
+            return
+
+        (stats, start, peak) = self.running_stages.pop()
+        stats.seconds += time.perf_counter() - start
+        stats.calls += 1
+
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        stats.traced_peak = max(stats.traced_peak, peak)
+        peak_rss_kb = get_peak_rss_kb()
+        if peak_rss_kb is not None:
+            stats.peak_rss_kb = max(stats.peak_rss_kb or 0, peak_rss_kb)
+
+        if len(self.running_stages) > 0:
+            self.running_stages[-1][2] = max(self.running_stages[-1][2], peak)
+
+    # Attributes the time spent producing each item of an iterable, like rows
+    # read from a CSV, to a stage
+    def iter_stage(self, name, iterable):
+        if not self.enabled:
+            return iterable
+
+        return self.run_iter_stage(name, iterable)
+
+    def run_iter_stage(self, name, iterable):
+        iterator = iter(iterable)
+
+        while True:
+            with self.run_stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+
+            yield item
+
+    # Attributes the time spent handling each item of an iterable, the body
+    # of the loop consuming it, to a stage
+    def loop_stage(self, name, iterable):
+        if not self.enabled:
+            return iterable
+
+        return self.run_loop_stage(name, iterable)
+
+    def run_loop_stage(self, name, iterable):
+        for item in iterable:
+            with self.run_stage(name):
+                yield item
+
+    # Counts items processed, like rows or pages
+    def count(self, name, number=1):
+        if self.enabled:
+            self.counts[name] = self.counts.get(name, 0) + number
+
+    def to_json(self):
+        return {
+            'Script': self.name,
+            'Seconds': round(time.perf_counter() - self.start_time, 6),
+            'Traced Peak KB': max(self.traced_peak, tracemalloc.get_traced_memory()[1]) // 1024,
+            'Peak RSS KB': get_peak_rss_kb(),
+            'Stages': {name: stats.to_json() for (name, stats) in self.stages.items()},
+            'Counts': self.counts,
+        }
+
+    def report(self):
+        if self.output is not None:
+            with open(self.output, 'w') as f:
+                json.dump(self.to_json(), f, indent=4)
+
+            return
+
+        print_report(self.to_json())
+
+
+def format_rss(peak_rss_kb):
+    return '-' if peak_rss_kb is None else '{:.1f}'.format(peak_rss_kb / 1024)
+
+
+def print_report(report):
+    print(file=sys.stderr)
+    print('Profile of {}'.format(report['Script']), file=sys.stderr)
+    print('{:<12} {:>8} {:>10} {:>12} {:>12}'.format('Stage', 'Calls', 'Time (s)', 'Traced (MB)', 'RSS (MB)'),
+          file=sys.stderr)
+
+    for (name, stats) in report['Stages'].items():
+        print('{:<12} {:>8} {:>10.3f} {:>12.1f} {:>12}'.format(
+            name, stats['Calls'], stats['Seconds'], stats['Traced Peak KB'] / 1024, format_rss(stats['Peak RSS KB'])),
+            file=sys.stderr)
+
+    print('{:<12} {:>8} {:>10.3f} {:>12.1f} {:>12}'.format(
+        'Total', '', report['Seconds'], report['Traced Peak KB'] / 1024, format_rss(report['Peak RSS KB'])),
+        file=sys.stderr)
+
+    for (name, number) in report['Counts'].items():
+        print('{}: {}'.format(name.capitalize(), number), file=sys.stderr)
+
+
+# Profiler shared by every module of a script
+profiler = Profiler()
+
+
+# Adds the --profile argument to a script's argument parser
+def add_profile_args(parser):
+    parser.add_argument('--profile', nargs='?', const='-', metavar='JSON_PATH',
+                        help='Report the time and memory of each stage on exit, or write the report as JSON to '
+                             'the given path. Also enabled by setting {}.'.format(profile_env_var))
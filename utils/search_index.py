@@ -0,0 +1,140 @@
+#!/usr/bin/env py
+# Builds a full-text search index over the wiki, lore, items and bots
+#
+# Documents are numbered from least to most spoilery so searching at a given
+# spoiler level only needs the documents below that level's cutoff, which is
+# a prefix of every posting list. Terms are split into blocks by their first
+# characters and each block is written to its own file so clients only load
+# the blocks their query needs. Block files are named after the hex of their
+# prefix, since a raw prefix could be a reserved file name on Windows (con,
+# nul) or collide with index.json.
+import argparse
+from collections import Counter, defaultdict
+import json
+import os
+from os import path
+import re
+
+from wiki_common import (get_category_spoiler, get_page_spoiler, iter_pages, json_dir, load_json, load_wiki,
+                         spoiler_levels, split_spoiler_text)
+
+output_path = path.join(json_dir, 'search')
+
+token_regex = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    return token_regex.findall(text.lower())
+
+
+# Gets the more spoilery of two spoiler levels
+def max_spoiler(level_1, level_2):
+    return spoiler_levels[max(spoiler_levels.index(level_1), spoiler_levels.index(level_2))]
+
+
+# Yields every document as a source, name, spoiler level and text
+def get_documents():
+    item_categories = load_json('item_categories.json')
+    bot_extra_data = load_json('bot_extra_data.json')
+
+    for (list_name, page_name, page) in iter_pages(load_wiki()):
+        if 'Content' not in page:
+            continue
+
+        page_spoiler = get_page_spoiler(list_name, page, item_categories, bot_extra_data)
+
+        # Text inside of spoiler tags is only searchable at that spoiler level
+        for (spoiler, text) in split_spoiler_text(page['Content'], page_spoiler).items():
+            yield 'Wiki', page_name, spoiler, text
+
+    for group in load_json('lore.json'):
+        group_spoiler = group.get('Spoiler', 'None')
+        for entry in group['Entries']:
+            spoiler = max_spoiler(group_spoiler, entry.get('Spoiler', 'None'))
+            yield 'Lore', '{}|{}'.format(group['Name'], entry['Name/Number']), spoiler, entry.get('Content', '')
+
+    for item in load_json('items.json'):
+        if 'Description' in item:
+            spoiler = get_category_spoiler(item_categories.get(item['Name'], []))
+            yield 'Item', item['Name'], spoiler, item['Description']
+
+    for bot in load_json('bots.json'):
+        if 'Analysis' in bot:
+            spoiler = get_category_spoiler(bot_extra_data.get(bot['Name'], {}).get('Categories', []))
+            yield 'Bot', bot['Name'], spoiler, bot['Analysis']
+
+
+# Builds the index, returning the document table, the cutoff document ID of
+# each spoiler level and the posting lists of each term. Each posting list
+# alternates document IDs and term frequencies, ordered by document ID.
+def build_index():
+    documents = sorted(get_documents(), key=lambda document: spoiler_levels.index(document[2]))
+
+    doc_table = []
+    cutoffs = {}
+    postings = defaultdict(list)
+
+    for (doc_id, (source, name, spoiler, text)) in enumerate(documents):
+        doc_table.append([source, name])
+        cutoffs[spoiler] = doc_id + 1
+
+        for (term, frequency) in sorted(Counter(tokenize(text)).items()):
+            postings[term].extend([doc_id, frequency])
+
+    # Levels without any documents of their own include everything below them
+    previous_cutoff = 0
+    for level in spoiler_levels:
+        previous_cutoff = cutoffs.setdefault(level, previous_cutoff)
+
+    return doc_table, cutoffs, postings
+
+
+# Splits terms into blocks by their first prefix_length characters
+def get_blocks(postings, prefix_length):
+    blocks = defaultdict(dict)
+    for term in sorted(postings):
+        blocks[term[:prefix_length]][term] = postings[term]
+
+    return blocks
+
+
+def get_block_file_name(prefix):
+    return 'block_{}.json'.format(prefix.encode().hex())
+
+
+def main(prefix_length):
+    doc_table, cutoffs, postings = build_index()
+    blocks = get_blocks(postings, prefix_length)
+    block_file_names = {prefix: get_block_file_name(prefix) for prefix in sorted(blocks)}
+
+    os.makedirs(output_path, exist_ok=True)
+
+    # Remove blocks from previous runs that no longer have any terms
+    for file_name in os.listdir(output_path):
+        if file_name != 'index.json' and file_name not in block_file_names.values():
+            os.remove(path.join(output_path, file_name))
+
+    index = {
+        'Prefix Length': prefix_length,
+        'Documents': doc_table,
+        'Spoiler Cutoffs': cutoffs,
+        'Blocks': block_file_names,
+    }
+
+    with open(path.join(output_path, 'index.json'), 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+
+    for (prefix, block) in blocks.items():
+        with open(path.join(output_path, block_file_names[prefix]), 'w', encoding='utf-8') as f:
+            json.dump(block, f, separators=(',', ':'))
+
+    print('Indexed {} terms in {} documents across {} blocks'.format(len(postings), len(doc_table), len(blocks)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='Search index builder')
+    parser.add_argument('--prefix-length', type=int, default=2,
+                        help='Number of leading characters of a term used to pick its block')
+    args = parser.parse_args()
+
+    main(args.prefix_length)
@@ -1,17 +1,32 @@
 from argparse import ArgumentParser
-from collections import namedtuple
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import hashlib
+from io import BytesIO
+import json
 import logging
 from os import path
 from PIL import Image
-import shutil
+import time
 import zipfile
 
+from csv_convert import write_if_changed
+from profiling import add_profile_args, profiler
+
 OUTPUT_PATH = path.abspath(path.join(path.dirname(path.realpath(__file__)), '..', 'src', 'public', 'game_sprites'))
+CACHE_PATH = path.join(path.dirname(path.realpath(__file__)), '.sprite_cache.json')
+
+# Location of the fonts inside of the resources archive
+FONTS_ARCHIVE_DIR = 'data/fonts'
 
 FontFile = namedtuple('FontFile', ['filename', 'tile_width', 'tile_height'])
 FontSection = namedtuple('FontSection', ['column', 'row', 'width', 'height'])
 Sprite = namedtuple('Sprite', ['column', 'row', 'size', 'name'])
 
+# Width in tiles of the sprite atlases
+ATLAS_COLUMNS = 16
+
 # Define all known fonts
 FONTS = [
     FontFile('cogmind12x12_terminus.png', 12, 12),
@@ -148,86 +163,292 @@ SPRITES = [
 ]
 
 
-# Extracts a .x file (actually a .zip) to the given path
-def extract_resources(zipped_x_path, resources_path):
-    if path.exists(resources_path):
-        logging.info('Resources path %s already exists, deleting now', resources_path)
-        shutil.rmtree(resources_path)
+# Reads a font image straight out of the resources .x file (actually a .zip)
+# without extracting anything else. Cached so each worker process only
+# decodes a font once.
+@lru_cache(maxsize=None)
+def load_font_image(zipped_x_path, filename):
+    with zipfile.ZipFile(zipped_x_path) as zip_file:
+        data = zip_file.read('{}/{}'.format(FONTS_ARCHIVE_DIR, filename))
 
-    try:
-        zip_file = zipfile.ZipFile(zipped_x_path)
-        zip_file.extractall(resources_path)
-        logging.info('Resources extracted to %s', resources_path)
-    except Exception as e:
-        logging.error('Failed to extract %s resources: %s', zipped_x_path, e)
+    font_image = Image.open(BytesIO(data))
+    font_image.load()
+    return font_image
 
 
-# Processes a single font
-def process_font(font, fonts_path):
-    image_path = path.join(fonts_path, font.filename)
-    font_image: Image.Image = Image.open(image_path)
+# Opens a font image and checks it divides evenly into tiles
+def open_font(font, resources_path):
+    font_image: Image.Image = load_font_image(resources_path, font.filename)
 
     assert font_image.height % font.tile_height == 0
     assert font_image.width % font.tile_width == 0
 
-    for sprite in SPRITES:
-        if sprite.size == 1:
-            # For a 1x1, just crop the image and save
-            left = sprite.column * font.tile_width
-            top = sprite.row * font.tile_height
-            right = left + font.tile_width
-            bottom = top + font.tile_height
-            sprite_image = font_image.copy().crop((left, top, right, bottom))
+    return font_image
+
+
+# Gets the image of a single sprite from a font image
+def get_sprite_image(font, font_image, sprite):
+    if sprite.size == 1:
+        # For a 1x1, just crop the image
+        left = sprite.column * font.tile_width
+        top = sprite.row * font.tile_height
+        right = left + font.tile_width
+        bottom = top + font.tile_height
+        return font_image.crop((left, top, right, bottom))
+
+    # For a 2x2 or 3x3, need to create a new image and then
+    # copy the individual pieces of the sprite on top
+    sprite_image = Image.new('RGBA', (font.tile_width * sprite.size, font.tile_height * sprite.size),
+                             (255, 255, 255, 255))
+
+    column = sprite.column
+    row = sprite.row
+
+    for i in range(sprite.size * sprite.size):
+        font_left = column * font.tile_width
+        font_top = row * font.tile_height
+        font_right = font_left + font.tile_width
+        font_bottom = font_top + font.tile_height
+
+        sprite_left = (i % sprite.size) * font.tile_width
+        sprite_top = (i // sprite.size) * font.tile_height
+
+        piece_image = font_image.crop((font_left, font_top, font_right, font_bottom))
+        sprite_image.paste(piece_image, (sprite_left, sprite_top))
+
+        if (column + 1) * font.tile_width == font_image.width:
+            column = 0
+            row += 1
         else:
-            # For a 2x2 or 3x3, need to create a new image and then
-            # copy the individual pieces of the sprite on top
-            sprite_image = Image.new('RGBA', (font.tile_width * sprite.size, font.tile_height * sprite.size),
-                                     (255, 255, 255, 255))
+            column += 1
+
+    return sprite_image
+
+
+# Zooms a 24x24 based image to 48x48
+def zoom_image(image):
+    return image.resize((image.width * 2, image.height * 2), resample=Image.NEAREST)
 
-            column = sprite.column
-            row = sprite.row
 
-            for i in range(sprite.size * sprite.size):
-                font_left = column * font.tile_width
-                font_top = row * font.tile_height
-                font_right = font_left + font.tile_width
-                font_bottom = font_top + font.tile_height
+# Hashes the pixels of an image
+def get_image_hash(image):
+    hash = hashlib.sha256('{} {}x{}'.format(image.mode, image.width, image.height).encode())
+    hash.update(image.tobytes())
+    return hash.hexdigest()
 
-                sprite_left = (i % sprite.size) * font.tile_width
-                sprite_top = (i // sprite.size) * font.tile_height
 
-                piece_image = font_image.copy().crop((font_left, font_top, font_right, font_bottom))
-                sprite_image.paste(piece_image, (sprite_left, sprite_top))
+# Checks whether an output file already holds an image with the given hash
+def is_cached(file_name, image_hash, cache):
+    return cache.get(file_name) == image_hash and path.exists(path.join(OUTPUT_PATH, file_name))
 
-                if (column + 1) * font.tile_width == font_image.width:
-                    column = 0
-                    row += 1
-                else:
-                    column += 1
 
-        sprite_image.save(path.join(OUTPUT_PATH, '{}_{}.png'.format(sprite.name, font.tile_height)))
+# Processes a subset of sprites for a single font. Sprites whose source pixels
+# hash the same as in the cache are not re-encoded or rewritten. Returns the
+# time taken, the hash of every output and the number of files written.
+def process_sprites(font, resources_path, sprites, cache=None):
+    start_time = time.perf_counter()
+    cache = cache or {}
+
+    with profiler.stage('read'):
+        font_image = open_font(font, resources_path)
+
+    hashes = {}
+    written = 0
+
+    for sprite in sprites:
+        with profiler.stage('transform'):
+            sprite_image = get_sprite_image(font, font_image, sprite)
+            image_hash = get_image_hash(sprite_image)
+
+        file_name = '{}_{}.png'.format(sprite.name, font.tile_height)
+        hashes[file_name] = image_hash
+        if not is_cached(file_name, image_hash, cache):
+            with profiler.stage('write'):
+                sprite_image.save(path.join(OUTPUT_PATH, file_name))
+            written += 1
 
         if font.tile_width == 24:
             # Create zoomed 48x48 tile as well
-            sprite_image = sprite_image.resize((sprite_image.width * 2, sprite_image.height * 2),
-                                               resample=Image.NEAREST)
-            sprite_image.save(path.join(OUTPUT_PATH, '{}_{}.png'.format(sprite.name, font.tile_height * 2)))
+            file_name = '{}_{}.png'.format(sprite.name, font.tile_height * 2)
+            hashes[file_name] = image_hash
+            if not is_cached(file_name, image_hash, cache):
+                with profiler.stage('write'):
+                    zoom_image(sprite_image).save(path.join(OUTPUT_PATH, file_name))
+                written += 1
+
+    profiler.count('sprites', len(sprites))
+
+    return time.perf_counter() - start_time, hashes, written
+
+
+# Lays out every distinct sprite in an atlas that is ATLAS_COLUMNS tiles wide,
+# returning the tile position of each sprite and the atlas height in tiles.
+# Sprites are packed largest first into shelves as tall as their first sprite.
+def get_atlas_layout():
+    unique_sprites = list(dict.fromkeys((sprite.column, sprite.row, sprite.size) for sprite in SPRITES))
+    unique_sprites.sort(key=lambda key: -key[2])
+
+    positions = {}
+    x = 0
+    y = 0
+    shelf_height = 0
+    for key in unique_sprites:
+        size = key[2]
+        if x + size > ATLAS_COLUMNS:
+            x = 0
+            y += shelf_height
+            shelf_height = 0
+
+        positions[key] = (x, y)
+        x += size
+        shelf_height = max(shelf_height, size)
+
+    return positions, y + shelf_height
+
+
+# Writes an atlas image along with JSON and CSS maps of each sprite's
+# position in it, skipping any of them that are unchanged
+def write_atlas(atlas_image, image_hash, positions, tile_size, cache):
+    atlas_name = 'atlas_{}'.format(tile_size)
+    written = 0
+    if not is_cached(atlas_name + '.png', image_hash, cache):
+        atlas_image.save(path.join(OUTPUT_PATH, atlas_name + '.png'))
+        written = 1
+
+    coordinates = {}
+    css_lines = ['.sprite-{} {{ background-image: url("{}.png"); }}'.format(tile_size, atlas_name)]
+    for sprite in SPRITES:
+        (x, y) = positions[(sprite.column, sprite.row, sprite.size)]
+        rect = [x * tile_size, y * tile_size, sprite.size * tile_size, sprite.size * tile_size]
+        coordinates[sprite.name] = rect
+        css_lines.append(
+            '.sprite-{}[data-sprite="{}"] {{ background-position: -{}px -{}px; width: {}px; height: {}px; }}'
+            .format(tile_size, sprite.name, *rect))
+
+    write_if_changed(path.join(OUTPUT_PATH, atlas_name + '.json'), json.dumps(coordinates, indent=4))
+    write_if_changed(path.join(OUTPUT_PATH, atlas_name + '.css'), '\n'.join(css_lines) + '\n')
+
+    return {atlas_name + '.png': image_hash}, written
+
+
+# Packs every sprite of a font into a single atlas. Returns the time taken, the
+# hash of every atlas image and the number of atlas images written.
+def process_atlas(font, resources_path, cache=None):
+    start_time = time.perf_counter()
+    cache = cache or {}
+
+    with profiler.stage('read'):
+        font_image = open_font(font, resources_path)
+
+    with profiler.stage('transform'):
+        positions, height = get_atlas_layout()
+
+        atlas_image = Image.new('RGBA', (ATLAS_COLUMNS * font.tile_width, height * font.tile_height), (0, 0, 0, 0))
+        for (column, row, size), (x, y) in positions.items():
+            sprite_image = get_sprite_image(font, font_image, Sprite(column, row, size, None))
+            atlas_image.paste(sprite_image, (x * font.tile_width, y * font.tile_height))
+
+        image_hash = get_image_hash(atlas_image)
+
+    profiler.count('sprites', len(positions))
+
+    with profiler.stage('write'):
+        hashes, written = write_atlas(atlas_image, image_hash, positions, font.tile_height, cache)
+
+    if font.tile_width == 24:
+        # Create zoomed 48x48 atlas as well, it's derived from the same pixels
+        # so the normal atlas hash is reused
+        zoomed_name = 'atlas_{}.png'.format(font.tile_height * 2)
+        zoomed_image = None if is_cached(zoomed_name, image_hash, cache) else zoom_image(atlas_image)
+
+        with profiler.stage('write'):
+            zoomed_hashes, zoomed_written = write_atlas(zoomed_image, image_hash, positions, font.tile_height * 2,
+                                                        cache)
+        hashes.update(zoomed_hashes)
+        written += zoomed_written
+
+    return time.perf_counter() - start_time, hashes, written
+
+
+# Processes a single font
+def process_font(font, resources_path, cache=None):
+    return process_sprites(font, resources_path, SPRITES, cache)
+
+
+# Splits the sprites into chunks of at most chunk_size sprites
+def chunk_sprites(chunk_size):
+    return [SPRITES[i:i + chunk_size] for i in range(0, len(SPRITES), chunk_size)]
+
+
+# Processes all fonts, optionally spreading fonts and chunks of sprites within
+# each font across a pool of worker processes. In atlas mode each font is
+# packed into a single atlas instead of individual sprite images. Returns the
+# time taken and number of files written per font along with the new cache.
+def process_fonts(resources_path, processes, chunk_size, atlas=False, cache=None):
+    cache = cache or {}
+    font_times = defaultdict(float)
+    font_written = defaultdict(int)
+    new_cache = {}
+
+    def add_result(font, result):
+        (seconds, hashes, written) = result
+        font_times[font.filename] += seconds
+        font_written[font.filename] += written
+        new_cache.update(hashes)
+
+    if processes <= 1:
+        for font in FONTS:
+            logging.info('Processing font %s', font.filename)
+            if atlas:
+                add_result(font, process_atlas(font, resources_path, cache))
+            else:
+                add_result(font, process_font(font, resources_path, cache))
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = []
+            for font in FONTS:
+                if atlas:
+                    futures.append((font, executor.submit(process_atlas, font, resources_path, cache)))
+                    continue
+
+                for sprites in chunk_sprites(chunk_size):
+                    futures.append((font, executor.submit(process_sprites, font, resources_path, sprites, cache)))
+
+            for (font, future) in futures:
+                add_result(font, future.result())
+
+    return font_times, font_written, new_cache
+
+
+def log_timings(font_times, font_written, total_time):
+    logging.info('%-30s %10s %10s', 'Font', 'Time (s)', 'Written')
+    for font in FONTS:
+        logging.info('%-30s %10.2f %10d', font.filename, font_times[font.filename], font_written[font.filename])
+    logging.info('%-30s %10.2f', 'Total (wall)', total_time)
+
+
+def load_cache():
+    try:
+        with open(CACHE_PATH) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
 
 
 # Entry point
-def main(cogmind_dir):
-    temp_dir = path.join(cogmind_dir, 'temp')
+def main(cogmind_dir, processes=1, chunk_size=32, atlas=False, force=False):
     cogmind_resources_path = path.join(cogmind_dir, 'cogmind.x')
-    cogmind_resources_dir = path.join(temp_dir, 'cogmind_resources')
-    fonts_path = path.join(cogmind_resources_dir, 'data', 'fonts')
 
-    extract_resources(cogmind_resources_path, cogmind_resources_dir)
+    cache = {} if force else load_cache()
 
-    for font in FONTS:
-        logging.info('Processing font %s', font.filename)
-        process_font(font, fonts_path)
+    start_time = time.perf_counter()
+    font_times, font_written, new_cache = process_fonts(cogmind_resources_path, processes, chunk_size, atlas, cache)
+    log_timings(font_times, font_written, time.perf_counter() - start_time)
 
-    shutil.rmtree(temp_dir)
+    # Keep the entries of the mode that didn't run
+    cache.update(new_cache)
+    with profiler.stage('write'), open(CACHE_PATH, 'w') as f:
+        json.dump(cache, f, indent=4, sort_keys=True)
 
 
 if __name__ == '__main__':
@@ -236,6 +457,17 @@ if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('cogmind_dir', help='Root Cogmind directory. If installed via Steam, this is something like '
                                             'C:/Program Files (x86)/Steam/steamapps/common/Cogmind')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='Number of worker processes to extract sprites with, 1 extracts serially')
+    parser.add_argument('--chunk-size', type=int, default=32,
+                        help='Number of sprites of a font each worker processes at a time')
+    parser.add_argument('--atlas', action='store_true',
+                        help='Pack the sprites of each tile size into a single atlas with JSON and CSS coordinate maps')
+
+    parser.add_argument('--force', action='store_true',
+                        help='Rewrite every image even if its pixels are unchanged since the last run')
+    add_profile_args(parser)
 
     args = parser.parse_args()
-    main(args.cogmind_dir)
+    profiler.start('sprite_extract', args.profile)
+    main(args.cogmind_dir, args.processes, args.chunk_size, args.atlas, args.force)
@@ -0,0 +1,286 @@
+#!/usr/bin/env py
+# Generates scaled up copies of the exports, wiki and combat logs
+#
+# The real exports are small enough to hide quadratic behavior, so this
+# builds inputs at a multiple of their size for benchmarking. Each scale
+# repeats every real row once per copy with a " Mk<copy>" suffix on its name
+# so names stay unique, and shuffles the rows so nothing relies on the
+# export order. Headers come from the converters' own column tables. Output
+# mirrors the repository layout (utils/ and src/json/) so the scripts can be
+# copied next to it and run unmodified.
+import argparse
+import csv
+import io
+import json
+import os
+from os import path
+import random
+
+import bot_csv_convert
+from csv_convert import read_csv
+import lore_csv_convert
+import part_csv_convert
+from wiki_common import load_json, load_wiki, page_list_types, unescape
+
+scales = [1, 10, 100]
+
+# Wiki page fields that hold the names of other pages
+wiki_name_fields = ['Bots', 'Groups', 'Parts', 'Subpages', 'Supergroups']
+
+# Same columns and layout as update_wiki_csv_from_json.py
+wiki_csv_fields = ['Name', 'Page Type', 'Content', 'Spoiler', 'Bots', 'Part Category',
+                   'Parts', 'Groups', 'Supergroups', 'Subpages', 'Target']
+
+
+def get_copy_name(name, copy):
+    return name if copy == 0 else '{} Mk{}'.format(name, copy + 1)
+
+
+def flatten_header(names):
+    return list(dict.fromkeys(names))
+
+
+def get_gallery_header():
+    return flatten_header(['Collected'] + [name for names in part_csv_convert.categories.values() for name in names])
+
+
+def get_robots_header():
+    return flatten_header(bot_csv_convert.categories)
+
+
+def get_lore_header():
+    return flatten_header(lore_csv_convert.categories)
+
+
+# Reads an export into dictionaries of column name to value
+def read_export(input_path, quote_fixes=()):
+    rows = read_csv(input_path, quote_fixes)
+    header = next(rows)
+    return [dict(zip(header, row)) for row in rows]
+
+
+# Writes rows in the export format. The exports leave the quotes of a few
+# strings unescaped, which the converters fix up when reading, so those are
+# written unescaped too.
+def write_csv(output_path, header, rows, quote_fixes=()):
+    text = io.StringIO(newline='')
+    writer = csv.writer(text, csv.get_dialect('cog'), quoting=csv.QUOTE_ALL)
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow([row.get(name, '') for name in header])
+
+    text = text.getvalue()
+    for fix in quote_fixes:
+        text = text.replace(fix.replace('"', '""'), fix)
+
+    with open(output_path, 'w', newline='') as f:
+        f.write(text)
+
+
+# Repeats every row once per copy, renaming the given column of each copy
+def scale_rows(rows, scale, name_column, rng):
+    scaled_rows = []
+    for copy in range(scale):
+        for row in rows:
+            scaled_row = dict(row)
+            scaled_row[name_column] = get_copy_name(row[name_column], copy)
+            scaled_rows.append(scaled_row)
+
+    rng.shuffle(scaled_rows)
+    return scaled_rows
+
+
+def generate_gallery_export(output_path, scale, rng):
+    rows = read_export(part_csv_convert.input_path, part_csv_convert.quote_fixes)
+    write_csv(output_path, get_gallery_header(), scale_rows(rows, scale, 'Name', rng), part_csv_convert.quote_fixes)
+
+
+def generate_robots_export(output_path, scale, rng):
+    # Bots that are renamed by the converter need a replacement for every
+    # duplicate and copies of skipped bots would no longer be skipped, only
+    # copy those that are neither
+    single_names = set(bot_csv_convert.name_replacements) | bot_csv_convert.skip_bots
+    rows = [row for row in read_export(bot_csv_convert.input_path) if row['Name'] not in single_names]
+    scaled_rows = scale_rows(rows, scale, 'Name', rng)
+    scaled_rows += [row for row in read_export(bot_csv_convert.input_path) if row['Name'] in single_names]
+    write_csv(output_path, get_robots_header(), scaled_rows)
+
+
+def generate_lore_export(output_path, scale, rng):
+    rows = read_export(lore_csv_convert.input_path)
+    write_csv(output_path, get_lore_header(), scale_rows(rows, scale, 'Name/Number', rng))
+
+
+# Copies every wiki page once per copy. Copies link to the matching copy of
+# every page they name so groups and redirects stay consistent.
+def generate_wiki(scale):
+    wiki = load_wiki()
+    scaled_wiki = {}
+
+    for list_name in page_list_types:
+        pages = []
+        for copy in range(scale):
+            for page in wiki[list_name]:
+                scaled_page = dict(page)
+                scaled_page['Name'] = get_copy_name(page['Name'], copy)
+
+                for field in wiki_name_fields:
+                    if field in page:
+                        scaled_page[field] = [get_copy_name(name, copy) for name in page[field]]
+
+                if 'Target' in page:
+                    scaled_page['Target'] = get_copy_name(page['Target'], copy)
+
+                pages.append(scaled_page)
+
+        pages.sort(key=lambda page: page['Name'])
+        scaled_wiki[list_name] = pages
+
+    return scaled_wiki
+
+
+def write_wiki(output_path, wiki):
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(unescape(json.dumps(wiki, ensure_ascii=False, indent=1)))
+
+
+# Writes the wiki in the spreadsheet layout. A fraction of the pages get an
+# edit so syncing the CSV back into the JSON has something to do.
+def write_wiki_csv(output_path, wiki, rng, edit_fraction=0.05):
+    csv.register_dialect('wiki', 'excel', lineterminator='\n')
+
+    rows = []
+    for (list_name, page_type) in page_list_types.items():
+        for page in wiki[list_name]:
+            row = {'Name': page['Name'], 'Page Type': page_type}
+            for (key, val) in page.items():
+                if key in wiki_csv_fields and key not in row:
+                    row[key] = ','.join(val) if isinstance(val, list) else val.replace('\\"', '"')
+
+            if 'Content' in row and rng.random() < edit_fraction:
+                row['Content'] += ' Edited.'
+
+            rows.append(row)
+
+    rows.sort(key=lambda row: row['Name'])
+
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        f.write('\ufeff')
+        writer = csv.DictWriter(f, wiki_csv_fields, quoting=csv.QUOTE_ALL, dialect='wiki')
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+# Weapons and parts used in combat logs, along with the log names of bots.
+# Only bots with a short name are used since those show up in logs as is.
+class CombatLogModel:
+    def __init__(self):
+        items = {item['Name']: item for item in load_json('items.json')}
+        self.weapons = [name for (name, item) in items.items() if item['Slot'] == 'Weapon' and 'Damage Type' in item
+                        and 'Projectile Count' in item]
+        weapon_names = set(self.weapons)
+        self.cogmind_parts = [name for (name, item) in items.items() if item['Slot'] != 'N/A']
+        self.bots = []
+
+        for bot in load_json('bots.json'):
+            if 'Short Name' not in bot:
+                continue
+
+            parts = [part for part in bot.get('Components', []) + bot.get('Armament', []) if isinstance(part, str)]
+            weapons = [part for part in bot.get('Armament', []) if isinstance(part, str) and part in weapon_names]
+            if len(parts) > 0 and len(weapons) > 0:
+                self.bots.append((bot['Short Name'], parts, weapons))
+
+
+# Writes one Cogmind combat log in the game's log format. Cogmind fights a
+# series of bots, trading shots until each one dies, the same mix of attacks
+# as the entries in combatFakeData.ts.
+def write_combat_log(output_path, model: CombatLogModel, rng, turns):
+    lines = []
+    cogmind_weapons = rng.sample(model.weapons, 4)
+    cogmind_parts = rng.sample(model.cogmind_parts, 12)
+    (bot_name, bot_parts, bot_weapons) = rng.choice(model.bots)
+    bot_integrity = 100
+
+    for turn in range(1, turns + 1):
+        prefix = '{:05d}_'.format(turn)
+
+        # Cogmind's volley
+        accuracy = rng.randint(40, 100)
+        lines.append('{} Base Hit%: 60{:+d}m={}'.format(prefix, accuracy - 60, accuracy))
+
+        for weapon in rng.sample(cogmind_weapons, rng.randint(1, len(cogmind_weapons))):
+            projectiles = rng.choice([1, 1, 1, 2, 3])
+            hits = sum(rng.randint(1, 100) <= accuracy for _ in range(projectiles))
+            result = 'Hit' if hits > 0 else 'Miss'
+
+            if projectiles == 1:
+                lines.append('{}  {} ({}%) {}'.format(prefix, weapon, accuracy, result))
+            else:
+                lines.append('{}  {} ({}%) {}/{} {}'.format(prefix, weapon, accuracy, hits, projectiles, result))
+
+            for _ in range(hits):
+                damage = rng.randint(5, 40)
+                if rng.random() < 0.3:
+                    bot_integrity -= damage
+                    lines.append('{}   {} core damaged: {}'.format(prefix, bot_name, damage))
+
+                    if bot_integrity <= 0:
+                        lines.append('{}    {} destroyed'.format(prefix, bot_name))
+                        (bot_name, bot_parts, bot_weapons) = rng.choice(model.bots)
+                        bot_integrity = 100
+                        break
+                elif rng.random() < 0.1:
+                    lines.append('{}   {} {} destroyed (Crit: Destroy)'.format(prefix, bot_name, rng.choice(bot_parts)))
+                else:
+                    lines.append('{}   {} {} damaged: {}'.format(prefix, bot_name, rng.choice(bot_parts), damage))
+
+        # The bot's return fire
+        accuracy = rng.randint(40, 90)
+        hit = rng.randint(1, 100) <= accuracy
+        lines.append('{}  {}: {} ({}%) {}'.format(prefix, bot_name, rng.choice(bot_weapons), accuracy,
+                                                  'Hit' if hit else 'Miss'))
+        if hit:
+            part = 'Core' if rng.random() < 0.2 else rng.choice(cogmind_parts)
+            lines.append('{}   {} damaged: {}'.format(prefix, part, rng.randint(5, 40)))
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+
+
+# Generates every input at the given scale under root, laid out like the
+# repository
+def generate_tree(root, scale, seed=0, logs=0, log_turns=200):
+    rng = random.Random(seed)
+    utils_dir = path.join(root, 'utils')
+    json_dir = path.join(root, 'src', 'json')
+    os.makedirs(utils_dir, exist_ok=True)
+    os.makedirs(json_dir, exist_ok=True)
+
+    generate_gallery_export(path.join(utils_dir, 'gallery_export.csv'), scale, rng)
+    generate_robots_export(path.join(utils_dir, 'robots_export.csv'), scale, rng)
+    generate_lore_export(path.join(utils_dir, 'lore_export.csv'), scale, rng)
+
+    wiki = generate_wiki(scale)
+    write_wiki(path.join(json_dir, 'wiki.json'), wiki)
+    write_wiki_csv(path.join(utils_dir, 'wiki.csv'), wiki, rng)
+
+    if logs > 0:
+        model = CombatLogModel()
+        log_dir = path.join(root, 'logs')
+        os.makedirs(log_dir, exist_ok=True)
+
+        for i in range(logs):
+            write_combat_log(path.join(log_dir, '{}.txt'.format(i)), model, rng, log_turns)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='Synthetic data generator')
+    parser.add_argument('output', help='Directory to write the utils/, src/json/ and logs/ layout to')
+    parser.add_argument('--scale', type=int, default=1, help='Multiple of the real export and wiki sizes')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for row order and generated content')
+    parser.add_argument('--logs', type=int, default=0, help='Number of combat logs to generate')
+    parser.add_argument('--log-turns', type=int, default=200, help='Number of turns in each combat log')
+    args = parser.parse_args()
+
+    generate_tree(args.output, args.scale, args.seed, args.logs, args.log_turns)
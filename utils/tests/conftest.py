@@ -0,0 +1,6 @@
+# Lets the tests import the scripts in utils/ by module name, the same way
+# the scripts import each other when run from that directory
+import sys
+from os import path
+
+sys.path.insert(0, path.join(path.dirname(path.realpath(__file__)), '..'))
@@ -0,0 +1,81 @@
+# Tests for the part lists and indexes built by bot_csv_convert
+import pytest
+
+from bot_csv_convert import get_option_chances, get_part_carriers, get_parts
+
+
+def test_get_parts_expands_repeated_parts():
+    assert get_parts(['Ion Engine', '2x Lgt. Assault Rifle']) == \
+        ['Ion Engine', 'Lgt. Assault Rifle', 'Lgt. Assault Rifle']
+
+
+def test_get_parts_option_chances():
+    assert get_parts(['Lgt. Assault Rifle (60%) OR 2x Assault Rifle (30%) OR None']) == [[
+        {'name': 'Lgt. Assault Rifle', 'chance': 60},
+        {'name': 'Assault Rifle', 'number': 2, 'chance': 30},
+        {'name': 'None'},
+    ]]
+
+
+def test_get_parts_options_without_chances():
+    assert get_parts(['Ion Engine OR 2x Hover Unit']) == [[
+        {'name': 'Ion Engine'},
+        {'name': 'Hover Unit', 'number': 2},
+    ]]
+
+
+def test_option_chances_as_stated():
+    assert get_option_chances([{'name': 'A', 'chance': 75}, {'name': 'None', 'chance': 25}]) == [0.75, 0.25]
+
+
+def test_option_chances_split_the_rest_evenly():
+    chances = get_option_chances([{'name': 'A', 'chance': 40}, {'name': 'B'}, {'name': 'None'}])
+    assert chances == pytest.approx([0.4, 0.3, 0.3])
+
+
+def test_option_chances_without_any_stated():
+    assert get_option_chances([{'name': 'A'}, {'name': 'B'}, {'name': 'C'}, {'name': 'None'}]) == \
+        [0.25, 0.25, 0.25, 0.25]
+
+
+def test_option_chances_never_negative():
+    assert get_option_chances([{'name': 'A', 'chance': 80}, {'name': 'B', 'chance': 30}, {'name': 'None'}]) == \
+        [0.8, 0.3, 0]
+
+
+def test_part_carriers_in_bot_name_order():
+    carriers = get_part_carriers([
+        {'Name': 'Swarmer', 'Armament': ['Lgt. Assault Rifle']},
+        {'Name': 'Grunt', 'Armament': ['Lgt. Assault Rifle'], 'Components': ['Ion Engine', 'Ion Engine']},
+    ])
+    assert carriers == {
+        'Lgt. Assault Rifle': [
+            {'Bot': 'Grunt', 'Number': 1, 'Optional': False},
+            {'Bot': 'Swarmer', 'Number': 1, 'Optional': False},
+        ],
+        'Ion Engine': [{'Bot': 'Grunt', 'Number': 2, 'Optional': False}],
+    }
+
+
+def test_part_carriers_optional_parts():
+    carriers = get_part_carriers([{'Name': 'Grunt', 'Armament': get_parts([
+        'Lgt. Assault Rifle OR 2x Assault Rifle (20%) OR Assault Rifle OR None',
+    ])}])
+    assert carriers == {
+        'Lgt. Assault Rifle': [{'Bot': 'Grunt', 'Number': 1, 'Optional': True}],
+        'Assault Rifle': [{'Bot': 'Grunt', 'Number': 2, 'Optional': True}],
+    }
+
+
+def test_part_carriers_fixed_and_optional_part():
+    # One entry for the bot, counting both the fixed part and the most the
+    # option groups can add, and not optional since it's always carried
+    carriers = get_part_carriers([{'Name': 'Grunt', 'Armament': get_parts([
+        'Lgt. Assault Rifle',
+        '2x Lgt. Assault Rifle OR None',
+        'Lgt. Assault Rifle OR Assault Rifle',
+    ])}])
+    assert carriers == {
+        'Lgt. Assault Rifle': [{'Bot': 'Grunt', 'Number': 4, 'Optional': False}],
+        'Assault Rifle': [{'Bot': 'Grunt', 'Number': 1, 'Optional': True}],
+    }
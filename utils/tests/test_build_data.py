@@ -0,0 +1,86 @@
+# Tests for the converter cache in build_data, using a stand in converter
+# writing to a temporary directory
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import build_data
+
+
+@pytest.fixture
+def build(tmp_path, monkeypatch):
+    input_path = tmp_path / 'input.csv'
+    input_path.write_text('Name\nIon Engine\n')
+    module_path = tmp_path / 'converter.py'
+    module_path.write_text('')
+    module = SimpleNamespace(__file__=str(module_path), categories={'Engine': 'Propulsion'})
+    runs = []
+
+    def run(options):
+        runs.append(options)
+        (tmp_path / 'output.{}.json'.format(options['format'])).write_text('[]')
+
+    converter = build_data.Converter(
+        'test',
+        module,
+        ['categories'],
+        ['format'],
+        lambda options: [str(input_path)],
+        lambda options: [str(tmp_path / 'output.{}.json'.format(options['format']))],
+        run,
+    )
+
+    monkeypatch.setattr(build_data, 'cache_path', str(tmp_path / '.build_cache.json'))
+    monkeypatch.setattr(build_data, 'CONVERTERS', [converter])
+
+    def build(force=False, only=None, output_format='pretty', sharded=False):
+        count = len(runs)
+        build_data.main(force, only, {'format': output_format, 'sharded': sharded}, False)
+        return len(runs) > count
+
+    return SimpleNamespace(build=build, tmp_path=tmp_path, input_path=input_path, module=module)
+
+
+def test_cache_miss_then_hit(build):
+    assert build.build()
+    assert not build.build()
+
+    with open(build.tmp_path / '.build_cache.json') as f:
+        assert list(json.load(f)) == ['test']
+
+
+def test_changed_input_misses(build):
+    build.build()
+    build.input_path.write_text('Name\nHover Unit\n')
+    assert build.build()
+    assert not build.build()
+
+
+def test_changed_config_table_misses(build):
+    build.build()
+    build.module.categories = {'Engine': 'Power'}
+    assert build.build()
+
+
+def test_hashed_option_misses(build):
+    build.build()
+    assert build.build(output_format='columnar')
+    assert build.build(output_format='pretty')
+
+
+def test_unhashed_option_hits(build):
+    build.build()
+    assert not build.build(sharded=True)
+
+
+def test_missing_output_misses(build):
+    build.build()
+    (build.tmp_path / 'output.pretty.json').unlink()
+    assert build.build()
+
+
+def test_force_and_only(build):
+    build.build()
+    assert build.build(force=True)
+    assert not build.build(force=True, only=['other'])
@@ -0,0 +1,47 @@
+# Tests that combat_batch results only depend on the seed and batch settings
+import json
+
+import numpy as np
+import pytest
+
+import combat_batch
+
+bot_names = ['Drone', 'Advanced Drone']
+weapon_names = ['Lgt. Assault Rifle']
+
+
+def run_main(tmp_path, processes, seed=1234, batch_size=250):
+    output_path = tmp_path / 'batch_{}_{}_{}.json'.format(processes, seed, batch_size)
+    combat_batch.main(bot_names, weapon_names, seed, processes, batch_size, 2, 1000, 2000, 0.01, 95, 1000,
+                      str(output_path))
+
+    with open(output_path) as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize('processes', [2, 3])
+def test_same_results_for_any_process_count(tmp_path, processes):
+    assert run_main(tmp_path, processes) == run_main(tmp_path, 1)
+
+
+def test_results_depend_on_the_seed(tmp_path):
+    results = run_main(tmp_path, 1)
+    assert results['Seed'] == 1234
+    assert list(results['Bots']) == bot_names
+    assert all(bot['Fights'] >= 1000 for bot in results['Bots'].values())
+    assert run_main(tmp_path, 1, seed=4321)['Bots'] != results['Bots']
+
+
+def test_merged_batches_match_one_batch():
+    volleys = np.array([3, 5, -1, 5, 8, 2])
+    tus = volleys * 200
+    whole = combat_batch.KillStats.from_fights(volleys, tus)
+
+    merged = combat_batch.KillStats()
+    for i in range(0, len(volleys), 2):
+        merged.merge(combat_batch.KillStats.from_fights(volleys[i:i + 2], tus[i:i + 2]))
+
+    assert merged.to_json(95) == whole.to_json(95)
+    assert whole.fights == 6
+    assert whole.failures == 1
+    assert whole.mean_volleys == 4.6
@@ -0,0 +1,84 @@
+# Checks combat_log_analyzer against parseCombatLog in combatLogParser.ts
+#
+# fixtures/combat_logs.json holds the logs and expected entries from
+# src/ts/__tests__/combatLogParserTestData.ts, with fields the TS leaves
+# undefined dropped.
+import json
+from os import path
+
+import pytest
+
+from combat_log_analyzer import LogParser, LogStats, analyze_log, get_names, read_log_lines
+
+fixture_path = path.join(path.dirname(path.realpath(__file__)), 'fixtures', 'combat_logs.json')
+
+with open(fixture_path) as f:
+    cases = json.load(f)
+
+
+# Converts a Python entry to the field names parseCombatLog uses
+def to_ts_entry(entry):
+    return {
+        'turn': entry['Turn'],
+        'sourceEntity': entry['Source'],
+        'sourceWeapon': entry['Weapon'],
+        'weaponAccuracy': entry['Accuracy'],
+        'sneakAttack': entry['Sneak Attack'],
+        'projectilesHit': entry['Projectiles Hit'],
+        'projectilesTotal': entry['Projectiles Total'],
+        'damageEntries': [{
+            'damagedEntity': damage['Entity'],
+            'damagedPart': damage['Part'],
+            'criticalHitType': damage['Critical'],
+            'damageDealt': damage['Damage'],
+            'damageOverflow': damage['Overflow'],
+            'targetDestroyed': damage['Destroyed'],
+        } for damage in entry['Damage']],
+    }
+
+
+# Fills in the fields the TS left undefined so they compare equal to None
+def fill_undefined(ts_entry):
+    return {
+        'weaponAccuracy': None,
+        **ts_entry,
+        'damageEntries': [{'criticalHitType': None, 'damageDealt': None, **damage}
+                          for damage in ts_entry['damageEntries']],
+    }
+
+
+def parse(log):
+    return list(LogParser(get_names(), read_log_lines(log.split('\n'))).parse_entries())
+
+
+@pytest.mark.parametrize('case', cases, ids=[case['Name'] for case in cases])
+def test_matches_parse_combat_log(case):
+    assert [to_ts_entry(entry) for entry in parse(case['Log'])] == \
+        [fill_undefined(entry) for entry in case['Entries']]
+
+
+def test_invalid_log_has_no_entries():
+    case = next(case for case in cases if case['Name'] == 'invalidData')
+    assert parse(case['Log']) == []
+
+
+def test_analyze_log_counts_entries(tmp_path):
+    log_path = tmp_path / 'log.txt'
+    expected = LogStats()
+    expected.logs = len(cases)
+
+    for case in cases:
+        for entry in parse(case['Log']):
+            expected.add_entry(entry, get_names())
+
+    # Each log analyzed on its own then merged gives the same totals
+    stats = LogStats()
+    for case in cases:
+        log_path.write_text(case['Log'], encoding='utf-8')
+        stats.merge(analyze_log(str(log_path)))
+
+    kills = sum(1 for case in cases for entry in case['Entries'] for damage in entry['damageEntries']
+                if damage['targetDestroyed'] and damage['damagedPart'] == 'Core'
+                and damage['damagedEntity'] != 'Cogmind')
+    assert stats.to_json() == expected.to_json()
+    assert sum(stats.counters['Kills'].values()) == kills
@@ -0,0 +1,106 @@
+# Tests combat_sim on small fixed scenarios against the results of
+# simulateCombat in simulatorCalcs.ts
+#
+# The scenarios use guided weapons with a fixed damage against bots without
+# parts, so every fight is the same and the expected volleys and TUs can be
+# worked out from the TS by hand.
+import numpy as np
+import pytest
+
+from combat_sim import Target, Weapon, get_accuracies, get_volley_time, simulate_combat
+
+
+def make_weapon(damage, damage_type='Kinetic', delay=0, guided=True, base_accuracy=0, recoil=0):
+    return Weapon(
+        name='Test Weapon', base_accuracy=base_accuracy, recoil=recoil, delay=delay, projectiles=1,
+        damage_min=damage, damage_max=damage, damage_type=damage_type, explosion_min=0, explosion_max=0,
+        explosion_type=None, chunks_min=1, chunks_max=1, critical=0, critical_type=None, guided=guided,
+        overflow=False,
+    )
+
+
+def make_target(core_integrity, resistances={}, core_regen=0, size='Medium', evasion=0):
+    return Target(
+        name='Test Bot', parts=[], integrity=np.zeros(0, dtype=np.int64), coverage=np.zeros(0, dtype=np.int64),
+        sizes=np.zeros(0, dtype=np.int64), protection=np.zeros(0, dtype=bool), core_integrity=core_integrity,
+        core_weight=100, resistances=resistances, immunities=set(), size=size, evasion=evasion,
+        core_regen=core_regen, part_regen=0,
+    )
+
+
+def run(target, weapons, num_fights=50, **kwargs):
+    return simulate_combat(target, weapons, num_fights, np.random.default_rng(0), **kwargs)
+
+
+def test_volley_time():
+    # getRangedVolleyTime: the base time for the weapon count plus every
+    # weapon's delay, at least 25
+    assert get_volley_time([make_weapon(10)]) == 200
+    assert get_volley_time([make_weapon(10, delay=50), make_weapon(10, delay=-25)]) == 325
+    assert get_volley_time([make_weapon(10)] * 8) == 400
+    assert get_volley_time([make_weapon(10, delay=-300)]) == 25
+
+
+def test_accuracy():
+    # updateWeaponsAccuracy: 60% base with the size and distance bonuses,
+    # the recoil of every other weapon and +10% for each action, capped
+    # between 10% and 95%
+    weapons = [make_weapon(10, guided=False, base_accuracy=10, recoil=2),
+               make_weapon(10, guided=False, base_accuracy=0, recoil=5),
+               make_weapon(10)]
+    assert get_accuracies(weapons, make_target(100), 6) == [[75, 75, 75], [68, 68, 68], [100, 100, 100]]
+    assert get_accuracies(weapons, make_target(100, size='Large'), 3) == [[94, 94, 94], [87, 87, 87],
+                                                                          [100, 100, 100]]
+    assert get_accuracies(weapons[:1], make_target(100, size='Huge'), 1)[0] == [95, 95, 95]
+    assert get_accuracies(weapons[:1], make_target(100, size='Tiny', evasion=10), 6)[0] == [40, 40, 40]
+
+
+def test_kill_with_fixed_damage():
+    # 30 damage a volley kills a 100 integrity core on the 4th volley, and
+    # the TUs include the volley that made the kill
+    (volleys, tus) = run(make_target(100), [make_weapon(30)])
+    assert (volleys == 4).all()
+    assert (tus == 800).all()
+
+
+def test_kill_with_two_weapons():
+    # The second weapon doesn't fire once the first kills the bot
+    (volleys, tus) = run(make_target(100), [make_weapon(30, delay=25), make_weapon(20)])
+    assert (volleys == 2).all()
+    assert (tus == 650).all()
+
+
+def test_resistance():
+    # Resisted damage is truncated, 50% of 25 is 12
+    (volleys, tus) = run(make_target(100, {'Kinetic': 50}), [make_weapon(25)])
+    assert (volleys == 9).all()
+    assert (tus == 1800).all()
+
+    # Negative resistances add damage
+    (volleys, _) = run(make_target(100, {'Kinetic': -50}), [make_weapon(25)])
+    assert (volleys == 3).all()
+
+
+def test_core_regen():
+    # 10 integrity a turn is 20 a volley, capped at the core's integrity. The
+    # core ends at 100 - 10n after volley n, so the core's at 0 after its
+    # regen on volley 10.
+    (volleys, tus) = run(make_target(100, core_regen=10), [make_weapon(30)])
+    assert (volleys == 10).all()
+    assert (tus == 2000).all()
+
+
+def test_volley_limit():
+    (volleys, tus) = run(make_target(100, core_regen=10), [make_weapon(20)], volley_limit=50)
+    assert (volleys == -1).all()
+    assert (tus == -1).all()
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_seeded_runs_repeat(seed):
+    weapons = [make_weapon(30, guided=False, base_accuracy=0)]
+    target = make_target(300)
+    first = simulate_combat(target, weapons, 200, np.random.default_rng(seed))
+    second = simulate_combat(target, weapons, 200, np.random.default_rng(seed))
+    assert (first[0] == second[0]).all()
+    assert (first[0] >= 10).all()
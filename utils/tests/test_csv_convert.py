@@ -0,0 +1,93 @@
+# Tests for the shared CSV and JSON helpers in csv_convert
+import json
+
+import pytest
+
+from csv_convert import (ColumnProjection, compile_projections, from_columnar, get_output_path, read_json, to_columnar,
+                         write_json)
+
+header = ['Name', 'Type', 'Mass', 'Rating', 'Slot']
+
+
+def test_projection_reads_named_columns():
+    projection = ColumnProjection(header, ['Slot', 'Name'])
+    assert projection.get_values(['Lgt. Assault Rifle', 'Ballistic Gun', '4', '3', 'Weapon']) == \
+        {'Slot': 'Weapon', 'Name': 'Lgt. Assault Rifle'}
+
+
+def test_projection_single_column():
+    projection = ColumnProjection(header, ['Mass'])
+    assert projection.get_values(['Ion Engine', 'Engine', '3', '1', 'Propulsion']) == {'Mass': '3'}
+
+
+def test_projection_drops_empty_values_without_default():
+    projection = ColumnProjection(header, ['Name', 'Mass', 'Rating'])
+    assert projection.get_values(['Ion Engine', 'Engine', '', '1', 'Propulsion']) == \
+        {'Name': 'Ion Engine', 'Rating': '1'}
+
+
+def test_projection_fills_empty_values_with_default():
+    projection = ColumnProjection(header, ['Name', 'Mass', 'Rating'], {'Mass': '0', 'Type': 'Unused'})
+    assert projection.get_values(['Ion Engine', 'Engine', '', '', 'Propulsion']) == \
+        {'Name': 'Ion Engine', 'Mass': '0'}
+
+
+def test_projection_treats_short_rows_as_empty():
+    projection = ColumnProjection(header, ['Name', 'Slot'], {'Slot': 'N/A'})
+    assert projection.get_values(['Ion Engine', 'Engine']) == {'Name': 'Ion Engine', 'Slot': 'N/A'}
+
+
+def test_projection_ignores_repeated_names():
+    projection = ColumnProjection(header, ['Name', 'Mass', 'Name'])
+    assert projection.names == ('Name', 'Mass')
+    assert projection.get_values(['Ion Engine', 'Engine', '3', '1', 'Propulsion']) == \
+        {'Name': 'Ion Engine', 'Mass': '3'}
+
+
+def test_compile_projections_shares_defaults():
+    projections = compile_projections(header, {'Basic': ['Name'], 'Stats': ['Mass', 'Rating']}, {'Mass': '0'})
+    row = ['Ion Engine', 'Engine', '', '1', 'Propulsion']
+    assert projections['Basic'].get_values(row) == {'Name': 'Ion Engine'}
+    assert projections['Stats'].get_values(row) == {'Mass': '0', 'Rating': '1'}
+
+
+records = [
+    {'Name': 'Ion Engine', 'Slot': 'Propulsion', 'Mass': 3},
+    {'Name': 'Lgt. Assault Rifle', 'Slot': 'Weapon', 'Range': 14},
+    {'Name': 'Matter', 'Mass': None},
+    {},
+]
+
+
+def test_to_columnar_shares_keys_and_drops_trailing_nulls():
+    assert to_columnar(records) == {
+        'Keys': ['Name', 'Slot', 'Mass', 'Range'],
+        'Rows': [
+            ['Ion Engine', 'Propulsion', 3],
+            ['Lgt. Assault Rifle', 'Weapon', None, 14],
+            ['Matter'],
+            [],
+        ],
+    }
+
+
+def test_columnar_round_trip():
+    # Null values can't be told apart from missing ones and are dropped
+    expected = [{key: val for (key, val) in record.items() if val is not None} for record in records]
+    assert from_columnar(to_columnar(records)) == expected
+    assert from_columnar(json.loads(json.dumps(to_columnar(records)))) == expected
+
+
+@pytest.mark.parametrize('output_format', ['pretty', 'minified', 'columnar'])
+def test_read_json_reads_every_format(tmp_path, output_format):
+    output_path = get_output_path(str(tmp_path / 'parts.json'), output_format)
+    assert write_json(records[:2], output_path, output_format)
+    assert not write_json(records[:2], output_path, output_format)
+    assert read_json(output_path) == records[:2]
+
+
+def test_get_output_path():
+    assert get_output_path('src/json/parts.json') == 'src/json/parts.json'
+    assert get_output_path('src/json/parts.json', 'pretty') == 'src/json/parts.json'
+    assert get_output_path('src/json/parts.json', 'minified') == 'src/json/parts.json'
+    assert get_output_path('src/json/parts.json', 'columnar') == 'src/json/parts.columnar.json'
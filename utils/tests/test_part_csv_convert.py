@@ -0,0 +1,61 @@
+# Tests for the typed part fields written by part_csv_convert
+from part_csv_convert import convert_types
+
+
+def convert(values):
+    values = {'Rating': '3', **values}
+    convert_types(values)
+    return values
+
+
+def test_int_columns():
+    values = convert({'Coverage': '120', 'Damage Min': '8', 'Damage Max': '18', 'Delay': '-10'})
+    assert values['Coverage'] == 120
+    assert values['Damage Min'] == 8
+    assert values['Damage Max'] == 18
+    assert values['Delay'] == -10
+
+
+def test_float_columns_keep_whole_numbers_as_ints():
+    values = convert({'Energy Upkeep': '1.5', 'Energy/Move': '2.0'})
+    assert values['Energy Upkeep'] == 1.5
+    assert values['Energy/Move'] == 2
+    assert isinstance(values['Energy/Move'], int)
+
+
+def test_percent_columns():
+    values = convert({'Overload Stability': '75%', 'Power Stability': '100%'})
+    assert values['Overload Stability'] == 75
+    assert values['Power Stability'] == 100
+
+
+def test_bool_columns():
+    values = convert({'Hackable Schematic': '1', 'No Repairs': '0', 'Studyable': '1'})
+    assert values['Hackable Schematic'] is True
+    assert values['No Repairs'] is False
+    assert values['Studyable'] is True
+
+
+def test_other_columns_stay_strings():
+    values = convert({'Name': 'Ion Engine', 'Slot': 'Propulsion'})
+    assert values['Name'] == 'Ion Engine'
+    assert values['Slot'] == 'Propulsion'
+
+
+def test_rating_category():
+    assert convert({})['Rating String'] == '3'
+    assert convert({'Category': 'Prototype'})['Rating String'] == '3*'
+
+    values = convert({'Category': 'Alien'})
+    assert values['Rating'] == 3
+    assert values['Rating Category'] == 'Alien'
+    assert values['Rating String'] == '3**'
+    assert 'Category' not in values
+
+
+def test_packed_values_are_split():
+    values = convert({'Chunks': '2-4', 'Critical': '10% Smash', 'Penetration': '80 / 40 / Unlimited'})
+    assert (values['Chunks Min'], values['Chunks Max']) == (2, 4)
+    assert (values['Critical Chance'], values['Critical Type']) == (10, 'Smash')
+    assert values['Penetration Chances'] == [80, 40, 100]
+    assert convert({'Chunks': '3'})['Chunks Max'] == 3
@@ -1,241 +1,100 @@
 #!/usr/bin/env py
 
 import argparse
+from collections import namedtuple
 import csv
 import json
 import sys
 from os import path
 
-wiki_path = path.join(path.dirname(path.realpath(__file__)), '..', 'src', 'json', 'wiki.json')
-csv_path = path.join(path.dirname(path.realpath(__file__)), 'wiki.csv')
-
-# Open/parse files
-with open(wiki_path, encoding='utf-8') as f:
-    wiki_json = json.load(f)
+from profiling import add_profile_args, profiler
+from wiki_common import wiki_path
 
-csv_entries = set()
-with open(csv_path, encoding='utf-8-sig') as f:
-    wiki_csv = {}
-    for row in csv.DictReader(f):
-        wiki_csv[row['Name']] = row
-        csv_entries.add(row['Name'])
+csv_path = path.join(path.dirname(path.realpath(__file__)), 'wiki.csv')
 
+csv_fields = ['Name', 'Page Type', 'Content', 'Spoiler', 'Bots', 'Part Category',
+              'Parts', 'Groups', 'Supergroups', 'Subpages', 'Target']
+
+# Describes how the pages of a wiki JSON list map to CSV rows. Fields are
+# copied as is, array fields are joined with commas.
+PageType = namedtuple('PageType', ['list_name', 'page_type', 'has_content', 'fields', 'array_fields'])
+
+page_types = [
+    PageType('Bots', 'Bot', True, [], []),
+    PageType('Bot Groups', 'Bot Group', True, ['Spoiler'], ['Bots']),
+    PageType('Bot Supergroups', 'Bot Supergroup', True, ['Spoiler'], ['Bots', 'Groups', 'Supergroups']),
+    PageType('Parts', 'Part', True, [], []),
+    PageType('Part Groups', 'Part Group', True, ['Spoiler', 'Part Category'], ['Parts']),
+    PageType('Part Supergroups', 'Part Supergroup', True, ['Spoiler'], ['Parts', 'Groups', 'Supergroups']),
+    PageType('Locations', 'Location', True, ['Spoiler'], []),
+    PageType('Other', 'Other', True, ['Spoiler'], ['Subpages']),
+    PageType('Partial', 'Partial', True, ['Spoiler'], []),
+    PageType('Redirects', 'Redirect', False, ['Spoiler', 'Target'], []),
+]
 
 parser = argparse.ArgumentParser('Wiki CSV from JSON')
 parser.add_argument(
     '--force', 
     help='Force update the CSV, deleting CSV entries that don\'t exist in the JSON', action='store_true')
+add_profile_args(parser)
 
 args = parser.parse_args()
 force = args.force
+profiler.start('update_wiki_csv_from_json', args.profile)
 
-def update_field(field_name, page_name, json_obj):
-    if field_name in json_obj:
-        wiki_csv[page_name][field_name] = json_obj[field_name]
-    elif field_name in wiki_csv[page_name]:
-        wiki_csv[page_name][field_name] = ''
-
-
-def update_field_array(field_name, page_name, json_obj):
-    if field_name in json_obj:
-        wiki_csv[page_name][field_name] = ','.join(json_obj[field_name])
-    elif field_name in wiki_csv[page_name]:
-        wiki_csv[page_name][field_name] = ''
-
-
-# Update CSV from JSON
-for bot_group in wiki_json['Bots']:
-    group_name = bot_group['Name']
-    if group_name in wiki_csv:
-        wiki_csv[group_name]['Page Type'] = 'Bot'
-        wiki_csv[group_name]['Content'] = bot_group['Content']
-        csv_entries.remove(group_name)
-    else:
-        new_bot = {
-            'Name': group_name,
-            'Page Type': 'Bot',
-            'Content': bot_group['Content']
-        }
-        wiki_csv[group_name] = new_bot
+# Open/parse files
+with profiler.stage('read'):
+    with open(wiki_path, encoding='utf-8') as f:
+        wiki_text = f.read()
 
-for bot_group in wiki_json['Bot Groups']:
-    group_name = bot_group['Name']
-    if group_name in wiki_csv:
-        wiki_csv[group_name]['Page Type'] = 'Bot Group'
-        wiki_csv[group_name]['Bots'] = ','.join(bot_group['Bots'])
-        wiki_csv[group_name]['Content'] = bot_group['Content']
-        update_field('Spoiler', group_name, bot_group)
+with profiler.stage('parse'):
+    wiki_json = json.loads(wiki_text)
 
-        csv_entries.remove(group_name)
-    else:
-        new_group = {
-            'Name': group_name,
-            'Page Type': 'Bot Group',
-            'Bots': ','.join(bot_group['Bots']),
-            'Content': bot_group['Content'],
-            'Spoiler': bot_group['Spoiler'] if 'Spoiler' in bot_group else '',
-        }
-        wiki_csv[group_name] = new_group
+del wiki_text
 
-for bot_group in wiki_json['Bot Supergroups']:
-    group_name = bot_group['Name']
-    if group_name in wiki_csv:
-        wiki_csv[group_name]['Page Type'] = 'Bot Supergroup'
-        wiki_csv[group_name]['Content'] = bot_group['Content']
-        update_field('Spoiler', group_name, bot_group)
-        update_field_array('Bots', group_name, bot_group)
-        update_field_array('Groups', group_name, bot_group)
-        update_field_array('Supergroups', group_name, bot_group)
+csv_entries = set()
+with open(csv_path, encoding='utf-8-sig') as f:
+    wiki_csv = {}
+    for row in profiler.iter_stage('read', csv.DictReader(f)):
+        wiki_csv[row['Name']] = row
+        csv_entries.add(row['Name'])
 
-        csv_entries.remove(group_name)
-    else:
-        if 'Content' not in bot_group:
-            print('Supergroup {} missing content'.format(group_name))
-            sys.exit(1)
-        new_group = {
-            'Name': group_name,
-            'Page Type': 'Bot Supergroup',
-            'Bots': ','.join(bot_group['Bots']) if 'Bots' in bot_group else '',
-            'Groups': ','.join(bot_group['Groups']) if 'Groups' in bot_group else '',
-            'Supergroups': ','.join(bot_group['Supergroups']) if 'Supergroups' in bot_group else '',
-            'Content': bot_group['Content'],
-            'Spoiler': bot_group['Spoiler'] if 'Spoiler' in bot_group else '',
-        }
-        wiki_csv[group_name] = new_group
+profiler.count('pages', len(wiki_csv))
 
-for part in wiki_json['Parts']:
-    part_name = part['Name']
-    if part_name in wiki_csv:
-        wiki_csv[part_name]['Page Type'] = 'Part'
-        wiki_csv[part_name]['Content'] = part['Content']
-        csv_entries.remove(part_name)
-    else:
-        new_part = {
-            'Name': part_name,
-            'Page Type': 'Part',
-            'Content': part['Content']
-        }
-        wiki_csv[part_name] = new_part
 
-for part_group in wiki_json['Part Groups']:
-    group_name = part_group['Name']
-    if group_name in wiki_csv:
-        wiki_csv[group_name]['Page Type'] = 'Part Group'
-        wiki_csv[group_name]['Content'] = part_group['Content']
-        update_field('Spoiler', group_name, part_group)
-        update_field_array('Parts', group_name, part_group)
-        update_field('Part Category', group_name, part_group)
+# Updates the CSV row of a page, adding the row if it doesn't exist yet
+def update_row(page_type: PageType, page):
+    page_name = page['Name']
 
-        csv_entries.remove(group_name)
+    if page_name in wiki_csv:
+        row = wiki_csv[page_name]
+        csv_entries.discard(page_name)
     else:
-        if 'Content' not in part_group:
-            print('Group {} missing content'.format(group_name))
-            sys.exit(1)
-        new_group = {
-            'Name': group_name,
-            'Page Type': 'Part Group',
-            'Parts': ','.join(part_group['Parts']) if 'Parts' in part_group else '',
-            'Part Category': part_group['Part Category'] if 'Part Category' in part_group else '',
-            'Content': part_group['Content'],
-            'Spoiler': part_group['Spoiler'] if 'Spoiler' in part_group else '',
-        }
-        wiki_csv[group_name] = new_group
+        row = {'Name': page_name}
+        wiki_csv[page_name] = row
 
-for part_group in wiki_json['Part Supergroups']:
-    group_name = part_group['Name']
-    if group_name in wiki_csv:
-        wiki_csv[group_name]['Page Type'] = 'Part Supergroup'
-        wiki_csv[group_name]['Content'] = part_group['Content']
-        update_field('Spoiler', group_name, part_group)
-        update_field_array('Parts', group_name, part_group)
-        update_field_array('Groups', group_name, part_group)
-        update_field_array('Supergroups', group_name, part_group)
+    row['Page Type'] = page_type.page_type
 
-        csv_entries.remove(group_name)
-    else:
-        if 'Content' not in part_group:
-            print('Supergroup {} missing content'.format(group_name))
+    if page_type.has_content:
+        if 'Content' not in page:
+            print('{} {} missing content'.format(page_type.page_type, page_name))
             sys.exit(1)
-        new_group = {
-            'Name': group_name,
-            'Page Type': 'Part Supergroup',
-            'Parts': ','.join(part_group['Parts']) if 'Parts' in part_group else '',
-            'Groups': ','.join(part_group['Groups']) if 'Groups' in part_group else '',
-            'Supergroups': ','.join(part_group['Supergroups']) if 'Supergroups' in part_group else '',
-            'Content': part_group['Content'],
-            'Spoiler': part_group['Spoiler'] if 'Spoiler' in part_group else '',
-        }
-        wiki_csv[group_name] = new_group
-
-for location in wiki_json['Locations']:
-    location_name = location['Name']
-    if location_name in wiki_csv:
-        wiki_csv[location_name]['Page Type'] = 'Location'
-        wiki_csv[location_name]['Content'] = location['Content']
-        update_field('Spoiler', location_name, location)
-
-        csv_entries.remove(location_name)
-    else:
-        new_location = {
-            'Name': location_name,
-            'Page Type': 'Location',
-            'Content': location['Content'],
-            'Spoiler': location['Spoiler'] if 'Spoiler' in location else '',
-        }
-        wiki_csv[location_name] = new_location
-
-for other in wiki_json['Other']:
-    other_name = other['Name']
-    if other_name in wiki_csv:
-        wiki_csv[other_name]['Page Type'] = 'Other'
-        wiki_csv[other_name]['Content'] = other['Content']
-        update_field('Spoiler', other_name, other)
-        update_field_array('Subpages', other_name, other)
 
-        csv_entries.remove(other_name)
-    else:
-        new_other = {
-            'Name': other_name,
-            'Page Type': 'Other',
-            'Subpages': ','.join(other['Subpages']) if 'Subpages' in other else '',
-            'Content': other['Content'],
-            'Spoiler': other['Spoiler'] if 'Spoiler' in other else '',
-        }
-        wiki_csv[other_name] = new_other
+        row['Content'] = page['Content']
 
-for partial in wiki_json['Partial']:
-    partial_name = partial['Name']
-    if partial_name in wiki_csv:
-        wiki_csv[partial_name]['Page Type'] = 'Partial'
-        wiki_csv[partial_name]['Content'] = partial['Content']
-        update_field('Spoiler', partial_name, partial)
+    for field_name in page_type.fields:
+        row[field_name] = page[field_name] if field_name in page else ''
 
-        csv_entries.remove(partial_name)
-    else:
-        new_partial = {
-            'Name': partial_name,
-            'Page Type': 'Partial',
-            'Content': partial['Content'],
-            'Spoiler': partial['Spoiler'] if 'Spoiler' in partial else '',
-        }
-        wiki_csv[partial_name] = new_partial
+    for field_name in page_type.array_fields:
+        row[field_name] = ','.join(page[field_name]) if field_name in page else ''
 
-for redirect in wiki_json['Redirects']:
-    redirect_name = redirect['Name']
-    if redirect_name in wiki_csv:
-        wiki_csv[redirect_name]['Page Type'] = 'Redirect'
-        update_field('Spoiler', redirect_name, redirect)
-        update_field('Target', redirect_name, redirect)
 
-        csv_entries.remove(redirect_name)
-    else:
-        new_redirect = {
-            'Name': redirect_name,
-            'Page Type': 'Redirect',
-            'Target': redirect['Target'] if 'Target' in redirect else '',
-            'Spoiler': redirect['Spoiler'] if 'Spoiler' in redirect else '',
-        }
-        wiki_csv[redirect_name] = new_redirect
+# Update CSV from JSON
+profiler.begin_stage('transform')
+for page_type in page_types:
+    for page in wiki_json[page_type.list_name]:
+        update_row(page_type, page)
+profiler.end_stage()
 
 if len(csv_entries) > 0:
     print('Found Wiki CSV entries not present in JSON')
@@ -249,30 +108,24 @@ if len(csv_entries) > 0:
         print('Use --force to delete these entries')
         sys.exit(1)
 
-# Write out updated csv
+
+# Escaped quotes in the JSON content would otherwise be written as \"",
+# unescape them so the writer doubles them like every other quote. Rows read
+# from a short or long CSV line can have None or list values, leave those be.
+def unescape_quotes(row):
+    return {key: val.replace('\\"', '"') if isinstance(val, str) else val for (key, val) in row.items()}
+
+
+# Write out updated csv in a single pass. Rows are serialized as they're
+# written so this is all one stage.
 csv.register_dialect('wiki', 'excel', lineterminator='\n')
-with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+with profiler.stage('write'), open(csv_path, 'w', newline='', encoding='utf-8') as f:
     # Note: When importing UTF-8 characters into google drive, the BOM is 
     # required or else character are assumed Latin-1
     f.write('\ufeff')
 
-    writer = csv.DictWriter(
-        f,
-        ['Name', 'Page Type', 'Content', 'Spoiler', 'Bots', 'Part Category',
-         'Parts', 'Groups', 'Supergroups', 'Subpages', 'Target'],
-        quoting=csv.QUOTE_ALL, dialect='wiki')
+    writer = csv.DictWriter(f, csv_fields, quoting=csv.QUOTE_ALL, dialect='wiki')
 
     writer.writeheader()
-    sorted_names = sorted(wiki_csv.keys())
-
-    for name in sorted_names:
-        if wiki_csv[name]['Page Type'] != 'Redirect':
-            wiki_csv[name]['Content'] = wiki_csv[name]['Content']
-            
-        writer.writerow(wiki_csv[name])
-
-with open(csv_path, 'r', encoding='utf-8') as f:
-    text = f.read()
-
-with open(csv_path, 'w', encoding='utf-8') as f:
-    f.write(text.replace('\\""', '""'))
\ No newline at end of file
+    for name in sorted(wiki_csv.keys()):
+        writer.writerow(unescape_quotes(wiki_csv[name]))
@@ -1,45 +1,70 @@
 #!/usr/bin/env py
 # Updates the wiki JSON file from the items/bots JSON, adding missing parts
+import argparse
+from collections import defaultdict
 import json
 from os import path
-import re
 
-wiki_path = path.join(path.dirname(path.realpath(__file__)), '..', 'src', 'json', 'wiki.json')
-parts_path = path.join(path.dirname(path.realpath(__file__)), '..', 'src', 'json', 'items.json')
-bots_path = path.join(path.dirname(path.realpath(__file__)), '..', 'src', 'json', 'bots.json')
+from profiling import add_profile_args, profiler
+from wiki_common import json_dir, unescape, wiki_path
+
+parts_path = path.join(json_dir, 'items.json')
+bots_path = path.join(json_dir, 'bots.json')
+
+parser = argparse.ArgumentParser(prog='Wiki JSON updater')
+parser.add_argument('--orphan-report', help='Write the bots and parts that have no group to this JSON file')
+add_profile_args(parser)
+args = parser.parse_args()
+profiler.start('update_wiki_json', args.profile)
 
 # Open/parse files
-with open(wiki_path, encoding='utf-8') as f:
-    wiki = json.load(f)
+with profiler.stage('read'):
+    with open(wiki_path, encoding='utf-8') as f:
+        wiki_text = f.read()
+
+    with open(parts_path, encoding='utf-8') as f:
+        parts_text = f.read()
+
+    with open (bots_path, encoding='utf-8') as f:
+        bots_text = f.read()
+
+with profiler.stage('parse'):
+    wiki = json.loads(wiki_text)
+    parts = json.loads(parts_text)
+    bots = json.loads(bots_text)
 
-with open(parts_path, encoding='utf-8') as f:
-    parts = json.load(f)
+del wiki_text, parts_text, bots_text
+profiler.count('pages', sum(len(pages) for pages in wiki.values()))
 
-with open (bots_path, encoding='utf-8') as f:
-    bots = json.load(f)
+profiler.begin_stage('transform')
+
+# Index wiki pages by name along with which groups each bot/part is in
+wiki_bots = {bot['Name']: bot for bot in wiki['Bots']}
+wiki_parts = {part['Name']: part for part in wiki['Parts']}
+
+bot_groups = defaultdict(list)
+for bot_group in wiki['Bot Groups']:
+    for bot_name in bot_group['Bots']:
+        bot_groups[bot_name].append(bot_group['Name'])
+
+part_groups = defaultdict(list)
+for part_group in wiki['Part Groups']:
+    for part_name in part_group.get('Parts', []):
+        part_groups[part_name].append(part_group['Name'])
 
 # Update bots
 for bot in bots:
     bot_name = bot['Name']
-    try:
-        bot = next(bot for bot in wiki['Bots'] if bot['Name'] == bot_name)
+    if bot_name in wiki_bots:
+        bot = wiki_bots[bot_name]
 
         if not 'Content' in bot:
             print('Adding empty content for {}'.format(bot_name))
             bot['Content'] = ''
-
-        found_group = False
-        for bot_group in wiki['Bot Groups']:
-            if bot_name in bot_group['Bots']:
-                found_group = True
-                break
-
-        if not found_group:
-            print('Bot {} has no group'.format(bot_name))
-
-    except StopIteration:
+    else:
         bot = {'Name': bot_name, 'Content': ''}
         wiki['Bots'].append(bot)
+        wiki_bots[bot_name] = bot
 
 # Sort bots
 wiki['Bots'] = list(sorted(wiki['Bots'], key=lambda bot: bot['Name']))
@@ -49,30 +74,41 @@ print()
 # Update parts
 for part in parts:
     part_name = part['Name']
-    try:
-        part = next(part for part in wiki['Parts'] if part['Name'] == part_name)
+    if part_name in wiki_parts:
+        part = wiki_parts[part_name]
 
         if not 'Content' in part:
             print('Adding empty content for {}'.format(part_name))
             part['Content'] = ''
-
-        found_group = False
-        for part_group in wiki['Part Groups']:
-            if 'Parts' in part_group:
-                if part_name in part_group['Parts']:
-                    found_group = True
-                    break
-
-    except StopIteration:
+    else:
         part = {'Name': part_name, 'Content': ''}
         wiki['Parts'].append(part)
+        wiki_parts[part_name] = part
 
 # Sort parts
 wiki['Parts'] = list(sorted(wiki['Parts'], key=lambda part: part['Name']))
 
-def unescape(s):
-    return re.sub(r'\\\\u([0-9a-f]{4})', r'\\u\1', s)
+# Check every bot and part for a group after the merge, so pages added by
+# this run are reported too
+orphans = {
+    'Bots': [bot['Name'] for bot in bots if bot['Name'] not in bot_groups],
+    'Parts': [part['Name'] for part in parts if part['Name'] not in part_groups],
+}
+
+for bot_name in orphans['Bots']:
+    print('Bot {} has no group'.format(bot_name))
+
+if len(orphans['Parts']) > 0:
+    print('{} parts have no group'.format(len(orphans['Parts'])))
+
+profiler.end_stage()
+
+if args.orphan_report is not None:
+    with profiler.stage('write'), open(args.orphan_report, 'w', encoding='utf-8') as f:
+        json.dump(orphans, f, indent=4)
+
+with profiler.stage('serialize'):
+    json_str = unescape(json.dumps(wiki, ensure_ascii=False, indent=1))
 
-json_str = unescape(json.dumps(wiki, ensure_ascii=False, indent=1))
-with open(wiki_path, 'w', encoding='utf-8') as f:
-    f.write(json_str)
\ No newline at end of file
+with profiler.stage('write'), open(wiki_path, 'w', encoding='utf-8') as f:
+    f.write(json_str)
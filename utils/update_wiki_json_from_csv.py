@@ -4,31 +4,49 @@ import argparse
 import csv
 import json
 from os import path
-import re
+import sys
+
+from profiling import add_profile_args, profiler
+from wiki_common import page_list_types, unescape, wiki_path
 
-wiki_path = path.join(path.dirname(path.realpath(__file__)),
-                      '..', 'src', 'json', 'wiki.json')
 csv_path = path.join(path.dirname(path.realpath(__file__)), 'wiki.csv')
 
 parser = argparse.ArgumentParser(prog='Wiki JSON from CSV updater')
 parser.add_argument('--write-diffs', action='store_true')
+parser.add_argument('--write-patch', action='store_true',
+                    help='Write the full JSON of only the changed pages to patch.json')
+add_profile_args(parser)
 args = parser.parse_args()
+profiler.start('update_wiki_json_from_csv', args.profile)
+
+# Wiki JSON list that holds each CSV page type
+page_type_lists = {page_type: list_name for (list_name, page_type) in page_list_types.items()}
 
 # Open/parse files
-with open(wiki_path, encoding='utf-8') as f:
-    wiki_json = json.load(f)
+with profiler.stage('read'):
+    with open(wiki_path, encoding='utf-8') as f:
+        wiki_text = f.read()
+
+with profiler.stage('parse'):
+    wiki_json = json.loads(wiki_text)
+
+del wiki_text
 
 with open(csv_path, encoding='utf-8-sig') as f:
     wiki_csv = {}
-    for row in csv.DictReader(f):
+    for row in profiler.iter_stage('read', csv.DictReader(f)):
         row['Content'] = row['Content'].replace('\\n', '\n')
         wiki_csv[row['Name']] = row
 
+profiler.count('pages', len(wiki_csv))
+
+# Index the pages of each list by name
+wiki_index = {list_name: {json_item['Name']: json_item for json_item in wiki_json[list_name]}
+              for list_name in page_type_lists.values()}
+
 updated_pages = []
+patch = {}
 
-def unescape(s):
-    return re.sub(r'\\\\u([0-9a-f]{4})', r'\\u\1', s)
-    
 def update_json_value(json_item, csv_obj, key_name):
     if csv_obj[key_name] == '':
         if key_name in json_item:
@@ -108,44 +126,24 @@ def update_json_from_csv(csv_obj, json_item):
 
 
 # Update JSON from CSV
+profiler.begin_stage('transform')
 for csv_obj in wiki_csv.values():
-    if csv_obj['Page Type'] == 'Bot':
-        json_list = wiki_json['Bots']
-    elif csv_obj['Page Type'] == 'Bot Group':
-        json_list = wiki_json['Bot Groups']
-    elif csv_obj['Page Type'] == 'Bot Supergroup':
-        json_list = wiki_json['Bot Supergroups']
-    elif csv_obj['Page Type'] == 'Part':
-        json_list = wiki_json['Parts']
-    elif csv_obj['Page Type'] == 'Location':
-        json_list = wiki_json['Locations']
-    elif csv_obj['Page Type'] == 'Part Group':
-        json_list = wiki_json['Part Groups']
-    elif csv_obj['Page Type'] == 'Part Supergroup':
-        json_list = wiki_json['Part Supergroups']
-    elif csv_obj['Page Type'] == 'Other':
-        json_list = wiki_json['Other']
-    elif csv_obj['Page Type'] == 'Partial':
-        json_list = wiki_json['Partial']
-    elif csv_obj['Page Type'] == 'Redirect':
-        json_list = wiki_json['Redirects']
-    else:
+    if csv_obj['Page Type'] not in page_type_lists:
         print('Found csv object without a valid type {}'.format(
             csv_obj['Name']))
         continue
 
-    found = False
-    for json_item in json_list:
-        if json_item['Name'] == csv_obj['Name']:
-            # Found existing item, update values
-            updated = update_json_from_csv(csv_obj, json_item)
-            if updated:
-                updated_pages.append(json_item['Name'])
+    list_name = page_type_lists[csv_obj['Page Type']]
+    json_index = wiki_index[list_name]
 
-            found = True
-            break
+    if csv_obj['Name'] in json_index:
+        # Found existing item, update values
+        json_item = json_index[csv_obj['Name']]
+        updated = update_json_from_csv(csv_obj, json_item)
+        if updated:
+            updated_pages.append(json_item['Name'])
+            patch.setdefault(list_name, []).append(json_item)
 
-    if found:
         continue
 
     # Failed to find item, add to end
@@ -158,30 +156,45 @@ for csv_obj in wiki_csv.values():
     json_item = {'Name': csv_obj['Name']}
     update_json_from_csv(csv_obj, json_item)
 
-    json_list.append(json_item)
+    wiki_json[list_name].append(json_item)
+    json_index[json_item['Name']] = json_item
+    patch.setdefault(list_name, []).append(json_item)
+
+profiler.end_stage()
+
+if len(updated_pages) == 0:
+    # Nothing changed so there's nothing to sort or write
+    print('No changes')
+    sys.exit(0)
 
 # Sort all lists
-lists = [wiki_json['Bots'], wiki_json['Bot Groups'], wiki_json['Bot Supergroups'],
-         wiki_json['Parts'], wiki_json['Part Groups'], wiki_json['Part Supergroups'], 
-         wiki_json['Locations'], wiki_json['Other'], wiki_json['Partial'], 
-         wiki_json['Redirects']]
-for l in lists:
-    l.sort(key=lambda x: x['Name'])
+with profiler.stage('transform'):
+    for list_name in page_type_lists.values():
+        wiki_json[list_name].sort(key=lambda x: x['Name'])
 
 # Save JSON
-json_str = unescape(json.dumps(wiki_json, ensure_ascii=False, indent=1))
-with open(wiki_path, 'w', encoding='utf-8') as f:
+with profiler.stage('serialize'):
+    json_str = unescape(json.dumps(wiki_json, ensure_ascii=False, indent=1))
+
+with profiler.stage('write'), open(wiki_path, 'w', encoding='utf-8') as f:
     f.write(json_str)
 
 updated_pages.sort()
 
-if len(updated_pages) > 0:
-    print('Updated the following pages:')
-    for page in updated_pages:
-        print(page)
+print('Updated the following pages:')
+for page in updated_pages:
+    print(page)
+
+if args.write_diffs:
+    with open('diffs.txt', 'w') as f:
+        f.write('\n'.join(updated_pages))
+
+if args.write_patch:
+    for pages in patch.values():
+        pages.sort(key=lambda x: x['Name'])
+
+    with profiler.stage('serialize'):
+        json_str = unescape(json.dumps(patch, ensure_ascii=False, indent=1))
 
-    if args.write_diffs:
-        with open('diffs.txt', 'w') as f:
-            f.write('\n'.join(updated_pages))
-else:
-    print('No changes')
\ No newline at end of file
+    with profiler.stage('write'), open('patch.json', 'w', encoding='utf-8') as f:
+        f.write(json_str)
@@ -0,0 +1,174 @@
+#!/usr/bin/env py
+# Checks the references between the items, bots, categories and wiki JSON
+#
+# Every dataset refers to the others by name without any checking, so a
+# renamed or removed part only shows up as a console message or an error in
+# the browser. This indexes every dataset by name once and checks each
+# reference with a single lookup, so the whole check is one linear pass that
+# is cheap enough to run on every data refresh. Exits with an error if any
+# references are dangling.
+import argparse
+from os import path
+import sys
+import time
+
+from csv_convert import OUTPUT_FORMATS, get_output_path, read_json
+from profiling import add_profile_args, profiler
+from wiki_common import iter_pages, json_dir, load_json, load_wiki
+
+# Page lists that the names in each group field of a wiki page have to be in,
+# the same checks done by WikiPage.tsx. None allows a page of any type.
+group_member_lists = {
+    'Bot Groups': {'Bots': 'Bots'},
+    'Bot Supergroups': {'Bots': 'Bots', 'Groups': 'Bot Groups', 'Supergroups': 'Bot Supergroups'},
+    'Part Groups': {'Parts': 'Parts'},
+    'Part Supergroups': {'Parts': 'Parts', 'Groups': 'Part Groups', 'Supergroups': 'Part Supergroups'},
+    'Other': {'Subpages': None},
+}
+
+
+# Gets the names of every part of a bot loadout, including every choice of
+# its option groups
+def get_loadout_part_names(bot):
+    for part in bot.get('Armament', []) + bot.get('Components', []):
+        if isinstance(part, str):
+            yield part
+        else:
+            for option in part:
+                if option['name'] != 'None':
+                    yield option['name']
+
+
+# Maps the name and alternate names of every page to the list it's in, along
+# with any names used by more than one page
+def build_page_index(wiki):
+    pages = {}
+    duplicates = []
+
+    for (list_name, page_name, page) in iter_pages(wiki):
+        if list_name == 'Redirects':
+            continue
+
+        for name in [page_name] + page.get('Alternate Names', []):
+            if name in pages:
+                duplicates.append(name)
+
+            pages[name] = list_name
+
+    return pages, duplicates
+
+
+def check_bot_parts(bots, items):
+    for bot in bots:
+        for part_name in get_loadout_part_names(bot):
+            if part_name not in items:
+                yield '{}: {}'.format(bot['Name'], part_name)
+
+
+def check_item_categories(items, item_categories):
+    for item_name in items:
+        if item_name not in item_categories:
+            yield item_name
+
+
+def check_bot_extra_data(bots, bot_extra_data):
+    for bot in bots:
+        if bot['Name'] not in bot_extra_data:
+            yield bot['Name']
+
+
+# Part and bot pages are looked up in the part and bot data by name
+def check_wiki_pages(wiki, items, bots):
+    for page in wiki['Parts']:
+        if page['Name'] not in items:
+            yield 'Part page {}'.format(page['Name'])
+
+    for page in wiki['Bots']:
+        if page['Name'] not in bots:
+            yield 'Bot page {}'.format(page['Name'])
+
+
+def check_group_members(wiki, pages):
+    for (list_name, fields) in group_member_lists.items():
+        for page in wiki[list_name]:
+            for (field, member_list_name) in fields.items():
+                for member_name in page.get(field, []):
+                    if member_name not in pages:
+                        yield '{}: {}'.format(page['Name'], member_name)
+                    elif member_list_name is not None and pages[member_name] != member_list_name:
+                        yield '{}: {} is not in {}'.format(page['Name'], member_name, member_list_name)
+
+
+def check_redirects(wiki, pages):
+    for redirect in wiki['Redirects']:
+        target = redirect['Target'].split('#')[0]
+        if target not in pages:
+            yield '{}: {}'.format(redirect['Name'], target)
+
+
+# Runs every check, returning the problems found by each
+def validate(items, bots, item_categories, bot_extra_data, wiki):
+    (pages, duplicates) = build_page_index(wiki)
+
+    return {
+        'Unknown parts in bot loadouts': list(check_bot_parts(bots.values(), items)),
+        'Parts without categories': list(check_item_categories(items, item_categories)),
+        'Bots without extra data': list(check_bot_extra_data(bots.values(), bot_extra_data)),
+        'Wiki pages without data': list(check_wiki_pages(wiki, items, bots)),
+        'Wiki group members without pages': list(check_group_members(wiki, pages)),
+        'Wiki redirects to missing pages': list(check_redirects(wiki, pages)),
+        'Duplicate wiki page names': duplicates,
+    }
+
+
+# Loads every dataset, reading the converter outputs written in the given format
+def load_data(output_format):
+    items_path = get_output_path(path.join(json_dir, 'items.json'), output_format)
+    bots_path = get_output_path(path.join(json_dir, 'bots.json'), output_format)
+    items = {item['Name']: item for item in read_json(items_path)}
+    bots = {bot['Name']: bot for bot in read_json(bots_path)}
+
+    return items, bots, load_json('item_categories.json'), load_json('bot_extra_data.json'), load_wiki()
+
+
+# Prints the problems found by each check, returning the total number
+def print_problems(problems):
+    total = 0
+
+    for (check_name, check_problems) in problems.items():
+        if len(check_problems) == 0:
+            continue
+
+        total += len(check_problems)
+        print('{} ({}):'.format(check_name, len(check_problems)))
+        for problem in check_problems:
+            print('    {}'.format(problem))
+
+    return total
+
+
+def main(output_format='pretty'):
+    start = time.perf_counter()
+
+    with profiler.stage('read'):
+        data = load_data(output_format)
+
+    with profiler.stage('validate'):
+        problems = validate(*data)
+
+    total = print_problems(problems)
+    print('Found {} problems in {:.3f}s'.format(total, time.perf_counter() - start))
+
+    return total
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='Data validator')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS.keys(), default='pretty',
+                        help='Format the converter outputs were written in')
+    add_profile_args(parser)
+    args = parser.parse_args()
+    profiler.start('validate_data', args.profile)
+
+    if main(args.format) > 0:
+        sys.exit(1)
@@ -0,0 +1,199 @@
+#!/usr/bin/env py
+# Shared wiki.json loading and link parsing for the wiki build scripts
+import json
+from os import path
+import re
+
+json_dir = path.join(path.dirname(path.realpath(__file__)), '..', 'src', 'json')
+wiki_path = path.join(json_dir, 'wiki.json')
+
+# Page type of each wiki JSON list
+page_list_types = {
+    'Bots': 'Bot',
+    'Bot Groups': 'Bot Group',
+    'Bot Supergroups': 'Bot Supergroup',
+    'Parts': 'Part',
+    'Part Groups': 'Part Group',
+    'Part Supergroups': 'Part Supergroup',
+    'Locations': 'Location',
+    'Other': 'Other',
+    'Partial': 'Partial',
+    'Redirects': 'Redirect',
+}
+
+# Tags that are handled as actions by wikiParser.tsx, along with the table
+# cell modifiers. Anything else in double brackets is a link.
+action_tags = set([
+    'AllLocations', 'B', 'BotDetails', 'BotGroups', 'CellSpan', 'CellStyle', 'Color', 'Comment', 'Expandable',
+    'FanartGallery', 'GameText', 'Gallery', 'Hacks', 'Heading', 'I', 'Image', 'ItemDetails', 'List', 'Lore',
+    'NonEmptyPages', 'Partial', 'PartGroupTable', 'Spoiler', 'SpoilerExpandable', 'SpoilerHidden', 'Sub',
+    'SubpageSummary', 'Sup', 'Range', 'Redacted', 'RedactedExpandable', 'RedactedHidden', 'Table',
+    'TooltipText',
+])
+
+# Spoiler levels from least to most spoilery, along with the tags that hide
+# content behind each level
+spoiler_levels = ['None', 'Spoiler', 'Redacted']
+spoiler_tags = {
+    'Spoiler': 'Spoiler',
+    'SpoilerExpandable': 'Spoiler',
+    'SpoilerHidden': 'Spoiler',
+    'Redacted': 'Redacted',
+    'RedactedExpandable': 'Redacted',
+    'RedactedHidden': 'Redacted',
+}
+
+# Same regexes used by wikiParser.tsx
+action_regex = re.compile(r'\[\[([^\]:]*)(?::([^\]]*))?\]\]')
+bracket_regex = re.compile(r'([^[])\[([\w/]*)\]')
+comment_regex = re.compile(r'\[\[Comment\]\].*?\[\[/Comment\]\]', re.S)
+partial_regex = re.compile(r'\[\[Partial\]\](.*?)\[\[/Partial\]\]', re.S)
+
+
+def load_wiki():
+    with open(wiki_path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_json(file_name):
+    with open(path.join(json_dir, file_name), encoding='utf-8') as f:
+        return json.load(f)
+
+
+# Gets the spoiler level of a list of item or bot categories
+def get_category_spoiler(categories):
+    if 'Redacted' in categories:
+        return 'Redacted'
+    elif 'Spoiler' in categories:
+        return 'Spoiler'
+
+    return 'None'
+
+
+# Gets the spoiler level of a page. Like WikiPage.tsx, parts and bots take
+# theirs from their categories while every other page sets its own.
+def get_page_spoiler(list_name, page, item_categories, bot_extra_data):
+    if list_name == 'Parts':
+        return get_category_spoiler(item_categories.get(page['Name'], []))
+    elif list_name == 'Bots':
+        return get_category_spoiler(bot_extra_data.get(page['Name'], {}).get('Categories', []))
+
+    return page.get('Spoiler', 'None')
+
+
+# Gets the name a page is referred to by, partials are namespaced
+def get_page_name(list_name, page):
+    if list_name == 'Partial':
+        return 'Partial/' + page['Name']
+
+    return page['Name']
+
+
+# Yields the list name, page name and page of every page in the wiki
+def iter_pages(wiki):
+    for list_name in page_list_types:
+        for page in wiki[list_name]:
+            yield list_name, get_page_name(list_name, page), page
+
+
+# Maps every name a page can be linked by, including alternate names and
+# redirects, to the name of the page itself
+def build_name_index(wiki):
+    names = {}
+
+    for (list_name, page_name, page) in iter_pages(wiki):
+        if list_name == 'Redirects':
+            continue
+
+        names[page_name] = page_name
+        for alternate_name in page.get('Alternate Names', []):
+            names[alternate_name] = page_name
+
+    for redirect in wiki['Redirects']:
+        target = redirect['Target'].split('#')[0]
+        if target in names:
+            names[redirect['Name']] = names[target]
+
+    return names
+
+
+# Gets the raw targets of every wiki link in a page's content, in order.
+# External and site-relative links are skipped, and partial includes are
+# returned as links to their partial page.
+def parse_link_targets(content):
+    content = comment_regex.sub('', content)
+    content = bracket_regex.sub(lambda match: '{}{{{{{}}}}}'.format(match[1], match[2]), content)
+
+    targets = []
+    for match in action_regex.finditer(content):
+        tag = match[1]
+        if tag.startswith('/') or tag in action_tags:
+            continue
+
+        if 'http' in match[0]:
+            continue
+
+        target = tag.replace('{{', '[').replace('}}', ']').split('|')[0]
+        if target.startswith('~/'):
+            continue
+
+        targets.append(target)
+
+    for match in partial_regex.finditer(content):
+        targets.append('Partial/' + match[1])
+
+    return targets
+
+
+# Strips the markup out of a page's content and splits the remaining text by
+# the spoiler level it's shown at. Links are replaced by their displayed text
+# and comments are dropped. Returns a dictionary of spoiler level to text.
+def split_spoiler_text(content, base_level='None'):
+    content = comment_regex.sub('', content)
+
+    texts = {level: [] for level in spoiler_levels}
+    level_stack = [spoiler_levels.index(base_level)]
+    index = 0
+
+    def add_text(text):
+        texts[spoiler_levels[max(level_stack)]].append(text)
+
+    for match in action_regex.finditer(content):
+        add_text(content[index:match.start()])
+        index = match.end()
+
+        tag = match[1]
+        if tag.startswith('/'):
+            if tag[1:] in spoiler_tags and len(level_stack) > 1:
+                level_stack.pop()
+            add_text(' ')
+        elif tag in spoiler_tags:
+            level_stack.append(spoiler_levels.index(spoiler_tags[tag]))
+            add_text(' ')
+        elif tag in action_tags or 'http' in match[0]:
+            add_text(' ')
+        else:
+            # Link, keep the displayed text
+            split = tag.split('|')
+            add_text(split[1] if len(split) > 1 else split[0].split('#')[0])
+
+    add_text(content[index:])
+
+    return {level: ''.join(text) for (level, text) in texts.items() if len(''.join(text).strip()) > 0}
+
+
+# Resolves a raw link target to the page it refers to, or None if there is no
+# such page. Links to a heading resolve to the page holding the heading.
+def resolve_link(target, names):
+    if target in names:
+        return names[target]
+
+    hash_split = target.split('#')
+    if len(hash_split) > 1 and hash_split[0] in names:
+        return names[hash_split[0]]
+
+    return None
+
+
+def unescape(s):
+    return re.sub(r'\\\\u([0-9a-f]{4})', r'\\u\1', s)
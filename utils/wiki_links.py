@@ -0,0 +1,89 @@
+#!/usr/bin/env py
+# Builds the wiki link graph from wiki.json: outgoing links and backlinks for
+# every page along with a report of links to pages that don't exist
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+from os import path
+
+from wiki_common import build_name_index, iter_pages, load_wiki, parse_link_targets, resolve_link
+
+output_path = path.join(path.dirname(path.realpath(__file__)), '..', 'src', 'json', 'wiki_links.json')
+
+
+def parse_page(page):
+    (page_name, content) = page
+    return page_name, parse_link_targets(content)
+
+
+# Parses the links out of every page with content, spread across processes
+def parse_pages(wiki, processes):
+    pages = [(page_name, page['Content']) for (_, page_name, page) in iter_pages(wiki) if 'Content' in page]
+
+    if processes <= 1:
+        return [parse_page(page) for page in pages]
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(parse_page, pages, chunksize=max(1, len(pages) // (processes * 4))))
+
+
+# Builds the link graph. Pages are referred to by their index in the page
+# list, links are deduplicated and redirects resolved to their target page.
+def build_link_graph(wiki, processes):
+    names = build_name_index(wiki)
+
+    page_names = [page_name for (list_name, page_name, _) in iter_pages(wiki) if list_name != 'Redirects']
+    page_indices = {page_name: i for (i, page_name) in enumerate(page_names)}
+
+    links = [[] for _ in page_names]
+    backlinks = [[] for _ in page_names]
+    dead_links = {}
+
+    for (page_name, targets) in parse_pages(wiki, processes):
+        page_index = page_indices[page_name]
+        page_links = {}
+
+        for target in targets:
+            linked_page = resolve_link(target, names)
+
+            if linked_page is None:
+                dead_links.setdefault(page_name, [])
+                if target not in dead_links[page_name]:
+                    dead_links[page_name].append(target)
+            elif linked_page != page_name:
+                page_links[page_indices[linked_page]] = True
+
+        links[page_index] = sorted(page_links)
+        for linked_index in page_links:
+            backlinks[linked_index].append(page_index)
+
+    for page_backlinks in backlinks:
+        page_backlinks.sort()
+
+    return {'Pages': page_names, 'Links': links, 'Backlinks': backlinks, 'Dead Links': dead_links}
+
+
+def main(processes):
+    wiki = load_wiki()
+    graph = build_link_graph(wiki, processes)
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(graph, f, ensure_ascii=False, separators=(',', ':'))
+
+    link_count = sum(len(page_links) for page_links in graph['Links'])
+    print('Wrote {} links between {} pages'.format(link_count, len(graph['Pages'])))
+
+    if len(graph['Dead Links']) > 0:
+        print('Found dead links:')
+        for (page_name, targets) in sorted(graph['Dead Links'].items()):
+            print('{}: {}'.format(page_name, ', '.join(targets)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='Wiki link graph')
+    parser.add_argument('--processes', type=int, default=os.cpu_count(),
+                        help='Number of worker processes to parse pages with, 1 parses serially')
+    args = parser.parse_args()
+
+    main(args.processes)
@@ -0,0 +1,146 @@
+#!/usr/bin/env py
+# Exports wiki.json as a small page index plus shards of page content
+#
+# The index holds every page without its content, along with its type,
+# spoiler level, shard number and a precomputed search preview, so opening
+# a page or hovering a link only needs the index and a single shard.
+import argparse
+import json
+import os
+from os import path
+import re
+
+from wiki_common import get_page_spoiler, iter_pages, json_dir, load_json, load_wiki, page_list_types, spoiler_levels
+
+output_path = path.join(json_dir, 'wiki')
+
+# Same regexes and preview length used by createPreviewContent and
+# WikiSearchPage.tsx
+spoiler_regex = re.compile(r'(\[\[Spoiler\]\])(.*?)(\[\[/Spoiler\]\])', re.S)
+redacted_regex = re.compile(r'(\[\[Redacted\]\])(.*?)(\[\[/Redacted\]\])', re.S)
+image_regex = re.compile(r'\[\[Image\]\](.*?)\[\[/Image\]\]', re.S)
+preview_length = 250
+
+
+def can_show_spoiler(spoiler, spoiler_state):
+    return spoiler_levels.index(spoiler) <= spoiler_levels.index(spoiler_state)
+
+
+# Port of createPreviewContent in wikiParser.tsx
+def create_preview_content(content, spoiler_state):
+    def strip_spoiler_content(content, regex, spoiler):
+        while (match := regex.search(content)) is not None:
+            # Remove spoilers from the preview. If we can show the spoilers
+            # then just remove the tags but display the content. Otherwise
+            # remove the entire interior section.
+            if can_show_spoiler(spoiler, spoiler_state):
+                content = content[:match.start()] + match[2] + content[match.end():]
+            else:
+                content = content[:match.start()] + content[match.end():]
+
+        return content
+
+    content = strip_spoiler_content(content, spoiler_regex, 'Spoiler')
+    content = strip_spoiler_content(content, redacted_regex, 'Redacted')
+    return image_regex.sub('', content, count=1)
+
+
+# Cuts preview content down to the snippet shown for title matches
+def create_preview_snippet(content, spoiler_state):
+    text = create_preview_content(content, spoiler_state)
+    full_text = len(text) <= preview_length
+    last_period = text.rfind('. ')
+
+    if last_period > -1 and last_period <= preview_length:
+        # Found a period, chop the match off there
+        text = text[:last_period + 1]
+    elif len(text) > 0 and not full_text:
+        text = text[:preview_length] + '...'
+
+    return text
+
+
+# Gets the preview of a page at each spoiler level. Only levels whose
+# preview differs from the level below them are included.
+def create_previews(content):
+    previews = {}
+    previous_preview = None
+
+    for spoiler_state in spoiler_levels:
+        preview = create_preview_snippet(content, spoiler_state)
+        if preview != previous_preview:
+            previews[spoiler_state] = preview
+            previous_preview = preview
+
+    return previews
+
+
+# Splits pages into shards of page name to content. Pages are bundled in
+# order until a shard reaches bundle_size bytes of content, a bundle size of
+# 0 puts every page in its own shard.
+def create_shards(pages, bundle_size):
+    shards = [{}]
+    shard_size = 0
+
+    for (page_name, content) in pages:
+        if len(shards[-1]) > 0 and shard_size + len(content.encode()) > bundle_size:
+            shards.append({})
+            shard_size = 0
+
+        shards[-1][page_name] = content
+        shard_size += len(content.encode())
+
+    return shards
+
+
+def main(bundle_size):
+    wiki = load_wiki()
+    item_categories = load_json('item_categories.json')
+    bot_extra_data = load_json('bot_extra_data.json')
+
+    pages = [(page_name, page['Content']) for (_, page_name, page) in iter_pages(wiki) if 'Content' in page]
+    shards = create_shards(pages, bundle_size)
+    page_shards = {page_name: i for (i, shard) in enumerate(shards) for page_name in shard}
+
+    index = []
+    for (list_name, page_name, page) in iter_pages(wiki):
+        entry = {key: val for (key, val) in page.items() if key != 'Content'}
+        entry['Type'] = page_list_types[list_name]
+
+        spoiler = get_page_spoiler(list_name, page, item_categories, bot_extra_data)
+        if spoiler != 'None':
+            entry['Spoiler'] = spoiler
+
+        if page_name in page_shards:
+            entry['Shard'] = page_shards[page_name]
+            entry['Preview'] = create_previews(page['Content'])
+
+        index.append(entry)
+
+    shard_path = path.join(output_path, 'shards')
+    os.makedirs(shard_path, exist_ok=True)
+
+    # Remove shards from previous runs past the new shard count, leaving any
+    # other files in the directory alone
+    for file_name in os.listdir(shard_path):
+        match = re.fullmatch(r'(\d+)\.json', file_name)
+        if match is not None and int(match.group(1)) >= len(shards):
+            os.remove(path.join(shard_path, file_name))
+
+    with open(path.join(output_path, 'index.json'), 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+
+    for (i, shard) in enumerate(shards):
+        with open(path.join(shard_path, '{}.json'.format(i)), 'w', encoding='utf-8') as f:
+            json.dump(shard, f, ensure_ascii=False, separators=(',', ':'))
+
+    print('Wrote {} pages into {} shards'.format(len(pages), len(shards)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='Wiki shard export')
+    parser.add_argument('--bundle-size', type=int, default=16384,
+                        help='Bundle pages into shards of up to this many bytes of content, 0 writes a shard per page')
+    args = parser.parse_args()
+
+    main(args.bundle_size)